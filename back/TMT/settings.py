@@ -139,6 +139,39 @@ DATABASES = {
 }
 
 
+# Cache
+# CACHE_BACKEND: locmem(기본, 프로세스별) | file(단일 서버 여러 워커) | redis | memcached | 백엔드 클래스 경로
+# 무효화용 카탈로그 버전은 DB 에 있으므로 어떤 백엔드든 다른 프로세스의 갱신이 바로 반영됨
+# (locmem 은 워커마다 따로 채울 뿐) - 캐시 항목까지 공유하려면 file/redis/memcached 를 CACHE_LOCATION 과 함께 지정
+
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+    "memcached": "django.core.cache.backends.memcached.PyMemcacheCache",
+}
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem")
+CACHE_DEFAULT_LOCATIONS = {
+    "locmem": "tmt",
+    "file": str(BASE_DIR / ".cache"),
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS.get(CACHE_BACKEND, CACHE_BACKEND),
+        "LOCATION": os.getenv("CACHE_LOCATION", CACHE_DEFAULT_LOCATIONS.get(CACHE_BACKEND, "")),
+        "TIMEOUT": int(os.getenv("CACHE_TIMEOUT", 300)),
+    }
+}
+
+# 엔드포인트별 응답 캐시 TTL(초) - trips/caching.py
+RESPONSE_CACHE_TTLS = {
+    "categories": int(os.getenv("CACHE_TTL_CATEGORIES", 60 * 60)),
+    "regions": int(os.getenv("CACHE_TTL_REGIONS", 60 * 60)),
+    "trip_detail": int(os.getenv("CACHE_TTL_TRIP_DETAIL", 60 * 10)),
+    "trip_list": int(os.getenv("CACHE_TTL_TRIP_LIST", 60)),
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -229,4 +262,13 @@ SOCIALACCOUNT_PROVIDERS = {
     }
 }
 
-SOCIALACCOUNT_ADAPTER = 'users.adapters.CustomSocialAccountAdapter'
\ No newline at end of file
+SOCIALACCOUNT_ADAPTER = 'users.adapters.CustomSocialAccountAdapter'
+
+# 게시글 조회수 지연 기록 (community/hits.py) - 반영 주기(초)와 즉시 반영 기준
+HIT_FLUSH_INTERVAL = int(os.getenv('HIT_FLUSH_INTERVAL', 10))
+HIT_FLUSH_THRESHOLD = int(os.getenv('HIT_FLUSH_THRESHOLD', 1000))
+
+# 플래너 이동 시간 행렬 덮어쓰기용 OSRM table 파일 디렉터리 (planner/travel.py, <region_id>_<city_id>.json)
+PLANNER_TRAVEL_MATRIX_DIR = os.getenv('PLANNER_TRAVEL_MATRIX_DIR', '')
+# 워커 프로세스마다 캐시하는 시군구 이동 시간 행렬의 최대 합계 크기 (바이트, planner/pools.py)
+PLANNER_POOL_CACHE_BYTES = int(os.getenv('PLANNER_POOL_CACHE_BYTES', 64 * 1024 * 1024))
@@ -0,0 +1,94 @@
+import atexit
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Case, F, IntegerField, Value, When
+
+from .models import Article
+
+# --- 게시글 조회수 지연 기록 (write-behind) ---
+# 조회할 때마다 행 전체를 save() 하지 않고, 프로세스 메모리에 게시글별 증가분만 모아 두었다가
+# 백그라운드 스레드가 주기적으로 UPDATE ... SET hits = hits + n 한 번으로 반영한다.
+# (프로세스마다 각자 증가분을 더하므로 여러 워커에서도 누락 없이 합산됨)
+
+FLUSH_INTERVAL = getattr(settings, 'HIT_FLUSH_INTERVAL', 10)  # 초, 0 이면 백그라운드 반영 안 함
+FLUSH_THRESHOLD = getattr(settings, 'HIT_FLUSH_THRESHOLD', 1000)  # 이만큼 쌓이면 주기 전에 반영
+
+
+class HitBuffer:
+    def __init__(self, interval=FLUSH_INTERVAL, threshold=FLUSH_THRESHOLD):
+        self.interval = interval
+        self.threshold = threshold
+        self.counts = {}
+        self.total = 0
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+
+    def record(self, article_id):
+        """조회 1회 기록 (DB 에 쓰지 않으므로 요청이 쓰기 잠금을 기다리지 않음)"""
+        with self.lock:
+            self.counts[article_id] = self.counts.get(article_id, 0) + 1
+            self.total += 1
+            if self.total >= self.threshold:
+                self.wakeup.set()
+        self._ensure_thread()
+
+    def pending(self, article_id):
+        """아직 DB 에 반영되지 않은 조회수"""
+        return self.counts.get(article_id, 0)
+
+    def flush(self):
+        """모아 둔 증가분을 한 번의 UPDATE 로 반영하고 반영한 게시글 수를 반환"""
+        with self.lock:
+            counts, self.counts, self.total = self.counts, {}, 0
+        if not counts:
+            return 0
+
+        increment = Case(
+            *[When(pk=pk, then=Value(n)) for pk, n in counts.items()],
+            default=Value(0), output_field=IntegerField(),
+        )
+        try:
+            Article.objects.filter(pk__in=list(counts)).update(hits=F('hits') + increment)
+        except Exception:
+            # 반영 실패 시 증가분을 되돌려 다음 주기에 다시 시도
+            with self.lock:
+                for pk, n in counts.items():
+                    self.counts[pk] = self.counts.get(pk, 0) + n
+                    self.total += n
+            raise
+        return len(counts)
+
+    def _ensure_thread(self):
+        if not self.interval or (self.thread and self.thread.is_alive()):
+            return
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                return
+            self.thread = threading.Thread(target=self._run, name='article-hit-flusher', daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        while True:
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                pass
+            finally:
+                close_old_connections()
+
+
+hit_buffer = HitBuffer()
+
+
+@atexit.register
+def _flush_on_exit():
+    # 서버 종료 시 남은 증가분 반영 (DB 가 이미 닫혔으면 포기)
+    try:
+        hit_buffer.flush()
+    except Exception:
+        pass
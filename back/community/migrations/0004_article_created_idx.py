@@ -0,0 +1,20 @@
+# Generated by Django 5.2.9 on 2026-10-18 12:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("community", "0003_article_course_article_image"),
+        ("planner", "0002_query_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="article",
+            index=models.Index(fields=["-created_at"], name="article_created_idx"),
+        ),
+    ]
@@ -13,6 +13,12 @@ class Article(models.Model):
 
     like_users = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='like_articles', blank=True)
 
+    class Meta:
+        indexes = [
+            # 게시판 목록 (최신순 커서 페이지네이션, 같은 시각은 id 로 순서 고정)
+            models.Index(fields=['-created_at', '-id'], name='article_created_idx'),
+        ]
+
     def __str__(self):
         return self.title
     
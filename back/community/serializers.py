@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from .models import Article, Comment
-from planner.serializers import CourseSerializer
+from planner.serializers import CourseSerializer, CourseSummarySerializer
 
 # 댓글 조회/생성
 class CommentSerializer(serializers.ModelSerializer):
@@ -11,12 +11,12 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('article', 'user')
 
-# 게시글 목록 조회용
+# 게시글 목록 조회용 (like_count / comment_count 는 article_list 에서 annotate)
 class ArticleListSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source='user.username', read_only=True)
-    like_count = serializers.IntegerField(source='like_users.count', read_only=True)
-    comment_count = serializers.IntegerField(source='comments.count', read_only=True)
-    course = CourseSerializer(read_only=True)
+    like_count = serializers.IntegerField(read_only=True)
+    comment_count = serializers.IntegerField(read_only=True)
+    course = CourseSummarySerializer(read_only=True)
 
     class Meta:
         model = Article
@@ -1,3 +1,97 @@
+from datetime import date, timedelta
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from planner.models import Course, CourseDetail
+from trips.models import Trip
+from users.models import User
+from .hits import hit_buffer
+from .models import Article, Comment
+
+
+class ArticleListQueryCountTest(TestCase):
+    """게시판 목록의 쿼리 수가 페이지 크기와 무관하게 일정한지 확인 (N+1 회귀 방지)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        users = [User.objects.create_user(username=f'user{i}', password='pw') for i in range(3)]
+        trips = [Trip.objects.create(title=f'여행지 {i}') for i in range(3)]
+
+        cls.articles = []
+        for i in range(25):
+            course = Course.objects.create(user=users[0], title=f'코스 {i}', start_date=date.today(), end_date=date.today())
+            CourseDetail.objects.bulk_create(
+                [CourseDetail(course=course, trip=trip, day=1, order=j) for j, trip in enumerate(trips)]
+            )
+            article = Article.objects.create(user=users[i % 3], title=f'글 {i}', content='내용', course=course)
+            article.like_users.set(users[:i % 3])
+            Comment.objects.bulk_create([Comment(article=article, user=users[0], content='댓글')] * (i % 4))
+            cls.articles.append(article)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = APIClient().get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.json()
+
+    def test_constant_queries_per_page(self):
+        small, _ = self.count_queries('/api/community/articles/?page_size=5')
+        large, data = self.count_queries('/api/community/articles/?page_size=20')
+        self.assertEqual(small, large)
+
+        expected = {a.id: (a.like_users.count(), a.comments.count()) for a in self.articles}
+        for item in data['results']:
+            self.assertEqual((item['like_count'], item['comment_count']), expected[item['id']])
+            self.assertEqual(item['course']['title'][:2], '코스')
+
+    def test_cursor_walks_all_articles(self):
+        # 일괄 생성처럼 created_at 이 같은 글이 페이지 경계에 걸쳐 있어도 빠지거나 겹치지 않아야 함
+        base = timezone.now()
+        for i, article in enumerate(self.articles):
+            Article.objects.filter(pk=article.pk).update(created_at=base + timedelta(minutes=i // 7))
+
+        for page_size in (3, 10):
+            seen = []
+            url = f'/api/community/articles/?page_size={page_size}'
+            while url:
+                _, data = self.count_queries(url)
+                seen += [item['id'] for item in data['results']]
+                url = data['next']
+            self.assertEqual(seen, [a.id for a in reversed(self.articles)])
+
+
+class ArticleHitCounterTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='writer', password='pw')
+        cls.article = Article.objects.create(user=user, title='글', content='내용')
+
+    def setUp(self):
+        # 백그라운드 스레드 없이 flush 를 직접 호출해 확인
+        self.interval = hit_buffer.interval
+        hit_buffer.interval = 0
+        hit_buffer.flush()
+
+    def tearDown(self):
+        hit_buffer.interval = self.interval
+
+    def test_hits_are_buffered_then_flushed_in_one_update(self):
+        updated_at = self.article.updated_at
+        for expected in (1, 2, 3):
+            data = APIClient().get(f'/api/community/articles/{self.article.id}/').json()
+            self.assertEqual(data['hits'], expected)
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.hits, 0)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(hit_buffer.flush(), 1)
+        self.assertEqual(len(ctx.captured_queries), 1)
 
-# Create your tests here.
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.hits, 3)
+        self.assertEqual(self.article.updated_at, updated_at)
@@ -2,17 +2,35 @@ from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework import status
+from rest_framework.pagination import CursorPagination
 from django.shortcuts import get_object_or_404, get_list_or_404
-from django.db.models import Q
+from django.db.models import Q, Count, OuterRef, Subquery, IntegerField
+from django.db.models.functions import Coalesce
 from .models import Article, Comment
+from .hits import hit_buffer
 from .serializers import ArticleListSerializer, ArticleDetailSerializer, CommentSerializer, ArticleCreateSerializer
 
+class ArticleCursorPagination(CursorPagination):
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 50
+    # created_at 이 같은 글이 페이지 경계에서 빠지거나 겹치지 않도록 id 로 순서를 고정
+    ordering = ('-created_at', '-id')
+
+def count_subquery(queryset):
+    """게시글별 개수 (행을 곱하는 JOIN + GROUP BY 대신, 페이지에 나온 행에만 계산)"""
+    counts = queryset.values('article_id').annotate(n=Count('*')).values('n')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
 # 게시글 목록 조회 & 생성 
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticatedOrReadOnly])    # 로그인 하지 않아도 조회는 가능
 def article_list(request):
     if request.method == 'GET':
-        articles = Article.objects.all().order_by('-created_at')
+        articles = Article.objects.select_related('user', 'course').annotate(
+            like_count=count_subquery(Article.like_users.through.objects.filter(article_id=OuterRef('pk'))),
+            comment_count=count_subquery(Comment.objects.filter(article_id=OuterRef('pk'))),
+        )
 
         search_keyword = request.GET.get('search', '')     # 검색어 (없으면 빈 문자열)
         search_condition = request.GET.get('condition', 'title_content')   # 검색 조건 (기본값: 제목+내용)
@@ -33,8 +51,10 @@ def article_list(request):
                     Q(content__icontains=search_keyword)
                 )
 
-        serializer = ArticleListSerializer(articles, many=True)
-        return Response(serializer.data)
+        paginator = ArticleCursorPagination()
+        page = paginator.paginate_queryset(articles, request)
+        serializer = ArticleListSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     elif request.method == 'POST':
         serializer = ArticleCreateSerializer(data=request.data)
@@ -49,9 +69,9 @@ def article_detail(request, article_pk):
     article = get_object_or_404(Article, pk=article_pk)
 
     if request.method == 'GET':
-        # 조회수 기능 구현
-        article.hits += 1
-        article.save()
+        # 조회수 기능 구현 (메모리에 모았다가 백그라운드에서 한 번에 반영, community/hits.py)
+        hit_buffer.record(article.pk)
+        article.hits += hit_buffer.pending(article.pk)
 
         serializer = ArticleDetailSerializer(article)
         return Response(serializer.data)
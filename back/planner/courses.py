@@ -0,0 +1,34 @@
+from django.db.models import Prefetch
+
+from trips.models import Trip
+from .models import Course, CourseDetail
+
+# --- 코스 저장/조회 공통 ---
+# 일정 항목의 여행지 id 를 한 번에 검증해 일괄 저장하고,
+# 저장된 코스는 상세/여행지까지 prefetch 해서 직렬화 시 항목별 쿼리가 없도록 한다.
+
+COURSE_DETAILS_PREFETCH = Prefetch(
+    'details',
+    queryset=CourseDetail.objects.select_related('trip__region', 'trip__city', 'trip__category'),
+)
+
+
+def add_details(course, entries):
+    """entries: (trip_id, day, order) 목록 - 존재하는 여행지만 저장하고 저장한 상세 목록 반환"""
+    entries = [(trip_id, day, order) for trip_id, day, order in entries if trip_id is not None]
+    existing = Trip.objects.only('id').in_bulk({trip_id for trip_id, _, _ in entries})
+    details = [
+        CourseDetail(course=course, trip_id=trip_id, day=day, order=order)
+        for trip_id, day, order in entries
+        if trip_id in existing
+    ]
+    return CourseDetail.objects.bulk_create(details)
+
+
+def with_details(queryset):
+    return queryset.prefetch_related(COURSE_DETAILS_PREFETCH)
+
+
+def load_course(course):
+    """저장 직후 응답용으로 상세/여행지를 한 번에 다시 조회"""
+    return with_details(Course.objects.all()).get(pk=course.pk)
@@ -0,0 +1,94 @@
+import random
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from trips.models import Trip
+from planner.pools import Place, city_pools
+from planner.routing import cost, optimize_day
+from planner.views import AIPlannerView
+
+class Command(BaseCommand):
+    help = 'Compare travel minutes of greedy planner days against the route optimizer'
+
+    # python manage.py benchmark_routes [--city=ID ...] [--runs=20] [--days=3] [--seed=0]
+
+    def add_arguments(self, parser):
+        parser.add_argument('--city', type=int, action='append', help='City id to plan in (repeatable, defaults to the 5 largest)')
+        parser.add_argument('--runs', type=int, default=20, help='Plans to generate per city')
+        parser.add_argument('--days', type=int, default=3, help='Trip length in days')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for reproducible plans')
+
+    def handle(self, *args, **options):
+        cities = options['city'] or list(
+            Trip.objects.filter(status='active', city__isnull=False)
+            .values('city_id').annotate(n=Count('id')).order_by('-n').values_list('city_id', flat=True)[:5]
+        )
+        if not cities:
+            raise CommandError('No cities with active trips')
+
+        totals = {'days': 0, 'greedy': 0, 'optimized': 0, 'late_before': 0, 'late_after': 0, 'seconds': 0.0}
+        for city_id in cities:
+            region_id = Trip.objects.filter(city_id=city_id).values_list('region_id', flat=True).first()
+            city = {'days': 0, 'greedy': 0, 'optimized': 0}
+            for run in range(options['runs']):
+                random.seed(options['seed'] + run)
+                for stops, start, start_minute, end, travel in self.greedy_days(region_id, city_id, options['days']):
+                    before = cost(stops, travel, start, start_minute, end)
+                    started = time.perf_counter()
+                    route = optimize_day(stops, travel, start, start_minute, end)
+                    totals['seconds'] += time.perf_counter() - started
+                    after = cost(route, travel, start, start_minute, end)
+
+                    city['days'] += 1
+                    city['greedy'] += before[1]
+                    city['optimized'] += after[1]
+                    totals['late_before'] += before[0]
+                    totals['late_after'] += after[0]
+
+            if city['days']:
+                self.stdout.write(
+                    f"  city {city_id}: {city['days']} days, "
+                    f"{city['greedy']} -> {city['optimized']} min ({self.saved(city)})"
+                )
+            for key in ('days', 'greedy', 'optimized'):
+                totals[key] += city[key]
+
+        if not totals['days']:
+            raise CommandError('No plans could be generated for the selected cities')
+        self.stdout.write(self.style.SUCCESS(
+            f"✨ 이동 시간 {totals['greedy']}분 -> {totals['optimized']}분 ({self.saved(totals)}), "
+            f"늦은 도착 {totals['late_before']}분 -> {totals['late_after']}분, "
+            f"하루 평균 {totals['seconds'] / totals['days'] * 1000:.1f}ms"
+        ))
+
+    def saved(self, stats):
+        saved = stats['greedy'] - stats['optimized']
+        return f"{saved}분 절약, {saved / stats['greedy'] * 100 if stats['greedy'] else 0:.1f}%"
+
+    def greedy_days(self, region_id, city_id, duration):
+        """최적화 없이 만든 일정의 날짜별 (Stop 목록, 출발지, 출발 시각, 도착지, 이동 시간 제공자)"""
+        view = AIPlannerView()
+        view.optimize_routes = False
+        base_pools, view.travel = city_pools(region_id, city_id, lambda: Place.load(
+            Trip.objects.filter(region_id=region_id, city_id=city_id, status='active')
+        ))
+        pools = view._classify_and_score_places(base_pools, set())
+        if not pools['attractions']:
+            return []
+
+        start_date = date.today()
+        anchors = view._select_anchors(pools['attractions'], duration)
+        accommodation = view._select_best_accommodation(anchors, pools['accommodations'])
+        view.user_loc = anchors[0]
+        plan = list(view._iter_schedule(
+            anchors, accommodation, pools, start_date, duration, 0,
+            used_ids=set(a.id for a in anchors),
+        ))
+        days = []
+        for day_idx, day in enumerate(plan):
+            day_date = date.fromisoformat(day['date'])
+            stops, start, start_minute, end = view._day_route(day['schedule'], day_idx, day_date, accommodation)
+            days.append((stops, start, start_minute, end, view.travel))
+        return days
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.9 on 2026-10-18 12:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("planner", "0001_initial"),
+        ("trips", "0024_query_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="course",
+            index=models.Index(
+                fields=["user", "-created_at"], name="course_user_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="coursedetail",
+            index=models.Index(
+                fields=["course", "day", "order"], name="coursedetail_order_idx"
+            ),
+        ),
+    ]
@@ -9,6 +9,12 @@ class Course(models.Model):
     end_date = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # 내 코스 목록 (최신순)
+            models.Index(fields=['user', '-created_at'], name='course_user_created_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -22,4 +28,8 @@ class CourseDetail(models.Model):
     # visit_time = models.TimeField(null=True, blank=True)
 
     class Meta:
-        ordering = ['day', 'order']
\ No newline at end of file
+        ordering = ['day', 'order']
+        indexes = [
+            # 코스 상세 (일차, 순서대로)
+            models.Index(fields=['course', 'day', 'order'], name='coursedetail_order_idx'),
+        ]
\ No newline at end of file
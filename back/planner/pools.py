@@ -0,0 +1,241 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from django.conf import settings
+
+from trips.caching import catalog_version
+from trips.geo import distances_km
+from .travel import city_travel_times
+
+# --- 플래너 후보군 행렬 ---
+# 후보 장소들의 좌표/기본 점수/요일별 영업 여부를 NumPy 배열로 만들어 두고
+# 일정 슬롯마다 "전체 후보 점수 계산 -> 상위 k 개 선택"을 벡터 연산 한 번으로 처리한다.
+# 분류와 기본 점수/좌표 배열은 (지역, 시군구, 카탈로그 버전) 별로 프로세스 메모리에 캐시하고,
+# 요청마다 찜 가중치와 무작위 노이즈만 더해 다시 정렬한다. (같은 조건 "다시 생성" 시 DB 조회 없음)
+
+KOREAN_DAYS = ["월", "화", "수", "목", "금", "토", "일"]
+WEEKDAY_KEYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]  # operating_info["weekly"] 키
+DAY_MINUTES = 24 * 60
+
+# "매월 첫째 월요일", "둘째, 넷째 주 일요일" 같은 월 단위 휴무 구절
+MONTHLY_REST_RE = re.compile(r'(?:(?:첫|둘|셋|넷|다섯)째|마지막|[1-5]\s*째)[^월화수목금토일]{0,12}[월화수목금토일]요일')
+WEEKLY_REST_RE = re.compile(r'([월화수목금토일])요일|매주\s*([월화수목금토일])')
+NO_DISTANCE = 99999  # 좌표가 없는 장소 간 거리 (km)
+
+RESTAURANT_CATEGORY_ID = 8
+ACCOMMODATION_CATEGORY_ID = 6
+WISH_BONUS = 150
+
+POOL_TTL = 60 * 10        # 좋아요 수 변화는 버전을 올리지 않으므로 시간으로도 만료
+# 캐시 크기는 도시 수가 아니라 이동 시간 행렬 바이트(n*n*2) 합계로 제한 (3천 곳이면 도시 하나에 약 18MB)
+DEFAULT_POOL_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class Place:
+    """점수 계산용 경량 장소 정보 (Trip 인스턴스는 일정이 확정된 뒤 한 번에 조회)"""
+    __slots__ = ('id', 'mapx', 'mapy', 'category_id', 'recommendation_score', 'like_count', 'rest_date', 'operating_info')
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    @classmethod
+    def load(cls, queryset):
+        return [cls(*row) for row in queryset.values_list(*cls.__slots__)]
+
+
+def place_score(trip, wish_ids):
+    """기본 점수 + 찜 가중치 + 대중성(좋아요) 점수"""
+    base = trip.recommendation_score if trip.recommendation_score else 50
+    wish_bonus = WISH_BONUS if trip.id in wish_ids else 0
+    popularity_bonus = min(trip.like_count * 2, 60)
+    return base + wish_bonus + popularity_bonus
+
+
+def to_minutes(value):
+    """"HH:MM" -> 자정부터의 분 (형식이 다르면 None)"""
+    try:
+        hour, minute = str(value).split(':')[:2]
+        return int(hour) * 60 + int(minute)
+    except (TypeError, ValueError):
+        return None
+
+
+def opening_minutes(place, weekday):
+    """operating_info 의 해당 요일(월=0) (여는 시각, 닫는 시각) 분 단위, 모르면 None"""
+    weekly = (getattr(place, 'operating_info', None) or {}).get('weekly') or {}
+    hours = weekly.get(WEEKDAY_KEYS[weekday]) or {}
+    open_minute, close_minute = to_minutes(hours.get('open')), to_minutes(hours.get('close'))
+    if open_minute is None or close_minute is None or close_minute <= open_minute:
+        return None
+    return open_minute, close_minute
+
+
+def weekly_rest_days(rest_date):
+    """operating_info 가 없을 때 휴무일 문자열에서 '매주' 쉬는 요일(월=0) 집합 (매월 n째 주 휴무는 제외)"""
+    text = MONTHLY_REST_RE.sub('', rest_date or '')
+    if not text or '무휴' in text:
+        return set()
+    return {KOREAN_DAYS.index(day or short) for day, short in WEEKLY_REST_RE.findall(text)}
+
+
+def compile_hours(place):
+    """
+    (영업 요일 비트마스크, 요일별 여는 시각[7], 닫는 시각[7]) - 분 단위, 시간을 모르면 하루 종일.
+    operating_info 의 weekly 를 우선 쓰고, 없으면 rest_date 의 매주 휴무만 반영한다.
+    """
+    weekly = (getattr(place, 'operating_info', None) or {}).get('weekly')
+    rest_days = set() if weekly else weekly_rest_days(getattr(place, 'rest_date', None))
+    bits, opens, closes = 0, [0] * 7, [DAY_MINUTES] * 7
+    for weekday, key in enumerate(WEEKDAY_KEYS):
+        closed = (weekly.get(key) or {}).get('is_closed') if weekly else weekday in rest_days
+        if not closed:
+            bits |= 1 << weekday
+        hours = opening_minutes(place, weekday)
+        if hours:
+            opens[weekday], closes[weekday] = hours
+    return bits, opens, closes
+
+
+class CandidatePool:
+    def __init__(self, trips, wish_ids=(), positions=None):
+        self.trips = list(trips)
+        self.positions = positions  # 시군구 이동 시간 행렬에서의 행/열 번호
+        self.index = {trip.id: i for i, trip in enumerate(self.trips)}
+
+        n = len(self.trips)
+        self.ids = np.fromiter((t.id for t in self.trips), dtype=np.int64, count=n)
+        self.x = np.fromiter((float(t.mapx or 0) for t in self.trips), dtype=np.float64, count=n)
+        self.y = np.fromiter((float(t.mapy or 0) for t in self.trips), dtype=np.float64, count=n)
+        self.has_location = (self.x != 0) & (self.y != 0)
+        self.category_ids = np.fromiter((t.category_id or -1 for t in self.trips), dtype=np.int64, count=n)
+        self.scores = np.fromiter((place_score(t, wish_ids) for t in self.trips), dtype=np.float64, count=n)
+        # 영업 요일 비트마스크(비트 d = 요일 d 영업)와 open/close_minutes[요일, 장소]
+        hours = [compile_hours(t) for t in self.trips]
+        self.open_days = np.fromiter((bits for bits, _, _ in hours), dtype=np.uint8, count=n)
+        self.open_minutes = np.array([opens for _, opens, _ in hours], dtype=np.int16).reshape(n, 7).T.copy()
+        self.close_minutes = np.array([closes for _, _, closes in hours], dtype=np.int16).reshape(n, 7).T.copy()
+
+    def personalized(self, wish_ids, noise=0):
+        """찜 가중치를 더하고 (점수 + 노이즈) 내림차순으로 다시 정렬한 새 후보군 (원본은 그대로)"""
+        n = len(self.trips)
+        scores = self.scores + np.isin(self.ids, list(wish_ids)) * WISH_BONUS
+        order = np.argsort(-(scores + np.random.uniform(-noise, noise, n)), kind='stable')
+
+        pool = object.__new__(CandidatePool)
+        pool.trips = [self.trips[i] for i in order]
+        pool.index = {trip.id: i for i, trip in enumerate(pool.trips)}
+        pool.ids = self.ids[order]
+        pool.x = self.x[order]
+        pool.y = self.y[order]
+        pool.has_location = self.has_location[order]
+        pool.category_ids = self.category_ids[order]
+        pool.scores = scores[order]
+        pool.open_days = self.open_days[order]
+        pool.open_minutes = self.open_minutes[:, order]
+        pool.close_minutes = self.close_minutes[:, order]
+        pool.positions = None if self.positions is None else self.positions[order]
+        return pool
+
+    def __len__(self):
+        return len(self.trips)
+
+    def __bool__(self):
+        return bool(self.trips)
+
+    def distances_from(self, place):
+        """place 에서 모든 후보까지의 대권 거리 배열 (km, 좌표가 없으면 NO_DISTANCE)"""
+        px, py = getattr(place, 'mapx', None), getattr(place, 'mapy', None)
+        if not (px and py):
+            return np.full(len(self.trips), NO_DISTANCE, dtype=np.float64)
+        dist = distances_km(float(py), float(px), self.y, self.x)
+        return np.where(self.has_location, dist, NO_DISTANCE)
+
+    def available(self, used_ids, weekday, exclude_id=None):
+        """아직 사용하지 않았고 해당 요일에 영업하는 후보 마스크"""
+        mask = ((self.open_days >> weekday) & 1).astype(bool)
+        used = [self.index[pk] for pk in used_ids if pk in self.index]
+        if exclude_id in self.index:
+            used.append(self.index[exclude_id])
+        mask[used] = False
+        return mask
+
+    def open_at(self, weekday, arrival, stay, earliest=0):
+        """arrival(분, 후보별 배열 가능)에 도착해 stay 분 머문 뒤 닫기 전에 나올 수 있는 후보 마스크 (열기 전이면 기다림)"""
+        start = np.maximum(np.maximum(arrival, earliest), self.open_minutes[weekday])
+        return start + stay <= self.close_minutes[weekday]
+
+    def top_k(self, scores, mask, k):
+        """mask 안에서 점수 상위 k 개의 인덱스 (점수 내림차순)"""
+        candidates = np.flatnonzero(mask)
+        if len(candidates) == 0:
+            return candidates
+        k = min(k, len(candidates))
+        masked = scores[candidates]
+        top = np.argpartition(-masked, k - 1)[:k]
+        top = top[np.argsort(-masked[top], kind='stable')]
+        return candidates[top]
+
+
+def classify_places(places):
+    """
+    카테고리로 관광지/식당/숙소를 나눠 (찜 가중치 없는) 기본 후보군 생성.
+    (후보군, 이동 시간 행렬 순서의 장소 목록) 을 반환하며, 각 후보군의 positions 가 그 순서를 가리킨다.
+    """
+    groups = {'attractions': [], 'restaurants': [], 'accommodations': []}
+    for place in places:
+        if place.category_id == RESTAURANT_CATEGORY_ID:
+            groups['restaurants'].append(place)
+        elif place.category_id == ACCOMMODATION_CATEGORY_ID:
+            groups['accommodations'].append(place)
+        else:
+            groups['attractions'].append(place)
+
+    pools, ordered = {}, []
+    for key, group in groups.items():
+        pools[key] = CandidatePool(group, positions=np.arange(len(ordered), len(ordered) + len(group)))
+        ordered += group
+    return pools, ordered
+
+
+_city_pools = OrderedDict()  # (region_id, city_id, 버전) -> (생성 시각, 기본 후보군, 이동 시간, 행렬 바이트)
+_city_pools_lock = threading.Lock()
+
+
+def pool_cache_bytes():
+    return getattr(settings, 'PLANNER_POOL_CACHE_BYTES', DEFAULT_POOL_CACHE_BYTES)
+
+
+def cached_pool_bytes():
+    with _city_pools_lock:
+        return sum(entry[3] for entry in _city_pools.values())
+
+
+def city_pools(region_id, city_id, load):
+    """시군구의 (기본 후보군, 이동 시간 제공자) - 캐시, 없으면 load() 로 Place 목록을 읽어 생성"""
+    key = (region_id, city_id, catalog_version())
+    now = time.monotonic()
+    with _city_pools_lock:
+        entry = _city_pools.get(key)
+        if entry and now - entry[0] < POOL_TTL:
+            _city_pools.move_to_end(key)
+            return entry[1], entry[2]
+
+    pools, ordered = classify_places(load())
+    travel_times = city_travel_times(region_id, city_id, ordered)
+    with _city_pools_lock:
+        _city_pools[key] = (now, pools, travel_times, travel_times.matrix.nbytes)
+        _city_pools.move_to_end(key)
+        # 오래 안 쓴 도시부터 내보냄 (방금 만든 도시는 한도보다 커도 남김)
+        total = sum(entry[3] for entry in _city_pools.values())
+        while total > pool_cache_bytes() and len(_city_pools) > 1:
+            total -= _city_pools.popitem(last=False)[1][3]
+    return pools, travel_times
+
+
+def clear_city_pools():
+    with _city_pools_lock:
+        _city_pools.clear()
@@ -0,0 +1,109 @@
+import time
+
+# --- 하루 일정 동선 최적화 ---
+# 하루에 고른 방문지(관광지/식당)의 순서만 바꿔 총 이동 시간을 줄인다.
+# 최근접 삽입으로 초기 경로를 만들고 2-opt(구간 뒤집기) / or-opt(구간 옮기기)로 개선하며,
+# 운영 시간과 식사 시간대(time window)를 넘기는 순서는 이동 시간보다 먼저 비교해 피한다.
+# 입력 순서(기존 탐욕 결과)보다 나빠지지 않으며, 시간 예산을 넘기면 그때까지의 최선을 반환한다.
+
+ROUTE_TIME_BUDGET = 0.02  # 초 (하루 일정 하나당)
+
+
+class Stop:
+    """방문지 하나 - window 는 (가장 이른 시작, 가장 늦은 도착) 분 단위, None 이면 제약 없음"""
+    __slots__ = ('place', 'stay', 'window', 'item')
+
+    def __init__(self, place, stay, window=None, item=None):
+        self.place = place
+        self.stay = stay
+        self.window = window
+        self.item = item
+
+
+def evaluate(stops, travel, start_place, start_minute, end_place=None):
+    """
+    순서대로 방문할 때의 (늦은 도착 합계, 총 이동 시간, 방문별 시작 시각 목록, 끝 도착 시각).
+    일찍 도착하면 window 시작까지 기다린다.
+    """
+    now, late, moving = start_minute, 0, 0
+    starts = []
+    previous = start_place
+    for stop in stops:
+        if previous is not None:
+            move = travel.minutes(previous, stop.place)
+            moving += move
+            now += move
+        if stop.window:
+            earliest, latest = stop.window
+            late += max(0, now - latest)
+            now = max(now, earliest)
+        starts.append(now)
+        now += stop.stay
+        previous = stop.place
+    if end_place is not None and previous is not None:
+        move = travel.minutes(previous, end_place)
+        moving += move
+        now += move
+    return late, moving, starts, now
+
+
+def cost(stops, travel, start_place, start_minute, end_place=None):
+    late, moving, _, _ = evaluate(stops, travel, start_place, start_minute, end_place)
+    return late, moving
+
+
+def nearest_insertion(stops, travel, start_place, start_minute, end_place=None):
+    """출발지에서 가까운 방문지부터 하나씩, 비용이 가장 적게 느는 위치에 끼워 넣음"""
+    route, remaining = [], list(stops)
+    while remaining:
+        visited = [stop.place for stop in route] + [p for p in (start_place,) if p is not None]
+        if visited:
+            stop = min(remaining, key=lambda s: min(travel.minutes(v, s.place) for v in visited))
+        else:
+            stop = remaining[0]
+        remaining.remove(stop)
+        route = min(
+            (route[:i] + [stop] + route[i:] for i in range(len(route) + 1)),
+            key=lambda candidate: cost(candidate, travel, start_place, start_minute, end_place),
+        )
+    return route
+
+
+def neighbours(route):
+    """2-opt 와 or-opt(길이 1~3 구간 이동) 이웃 경로"""
+    n = len(route)
+    for i in range(n - 1):
+        for j in range(i + 2, n + 1):
+            yield route[:i] + route[i:j][::-1] + route[j:]
+    for length in range(1, min(3, n - 1) + 1):
+        for i in range(n - length + 1):
+            segment, rest = route[i:i + length], route[:i] + route[i + length:]
+            for j in range(len(rest) + 1):
+                if j != i:
+                    yield rest[:j] + segment + rest[j:]
+
+
+def optimize_day(stops, travel, start_place, start_minute, end_place=None, budget=ROUTE_TIME_BUDGET):
+    """stops 의 방문 순서를 최적화한 목록 (기존 순서보다 나쁘면 기존 순서 그대로)"""
+    if len(stops) < 2:
+        return list(stops)
+    deadline = time.perf_counter() + budget
+    evaluate_cost = lambda route: cost(route, travel, start_place, start_minute, end_place)
+
+    best, best_cost = list(stops), evaluate_cost(stops)
+    route = nearest_insertion(stops, travel, start_place, start_minute, end_place)
+    if evaluate_cost(route) < best_cost:
+        best, best_cost = route, evaluate_cost(route)
+
+    # 첫 개선(first improvement) 방식으로 더 나아지지 않을 때까지 반복
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for route in neighbours(best):
+            route_cost = evaluate_cost(route)
+            if route_cost < best_cost:
+                best, best_cost, improved = route, route_cost, True
+                break
+            if time.perf_counter() >= deadline:
+                break
+    return best
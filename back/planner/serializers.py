@@ -25,6 +25,12 @@ class CourseDetailSerializer(serializers.ModelSerializer):
         model = CourseDetail
         fields = ['day', 'order', 'trip']
 
+# 게시판 목록용 (일정 상세 없이 코스 정보만)
+class CourseSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Course
+        fields = ['id', 'title', 'region', 'start_date', 'end_date', 'created_at']
+
 class CourseSerializer(serializers.ModelSerializer):
     details = CourseDetailSerializer(many=True, read_only=True) 
 
@@ -1,3 +1,335 @@
-from django.test import TestCase
+import json
+import tempfile
+from unittest import mock
+from datetime import date, timedelta
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from trips.models import Trip, Region, City, Category, Wishlist
+from users.models import User
+from .models import Course
+from .views import AIPlannerView
+from .pools import CandidatePool, Place, cached_pool_bytes, city_pools, classify_places, clear_city_pools
+from .routing import Stop, cost, optimize_day
+from .travel import MatrixTravelTime, city_travel_times, profile_for
+
+
+class CourseSaveQueryCountTest(TestCase):
+    """코스 저장 쿼리 수가 일정 길이와 무관하게 일정한지 확인"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='planner', password='pw')
+        cls.trips = [Trip.objects.create(title=f'여행지 {i}') for i in range(20)]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def plan(self, days):
+        return {
+            'title': '코스',
+            'start_date': date.today().isoformat(),
+            'end_date': date.today().isoformat(),
+            'plan': [
+                {'day': day, 'schedule': [
+                    {'type': 'move', 'data': None},
+                    *[{'type': 'spot', 'data': {'id': trip.id}} for trip in self.trips[(day - 1) * 4:day * 4]],
+                    {'type': 'meal', 'data': {'id': 999999}},  # 없는 여행지는 건너뜀
+                ]}
+                for day in range(1, days + 1)
+            ],
+        }
+
+    def post(self, url, body):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(url, body, format='json')
+        self.assertEqual(response.status_code, 201)
+        return len(ctx.captured_queries), response.json()
+
+    def test_save_plan_in_constant_queries(self):
+        short, _ = self.post('/api/planner/save/', self.plan(1))
+        long, data = self.post('/api/planner/save/', self.plan(5))
+        self.assertEqual(short, long)
+
+        self.assertEqual([d['trip']['id'] for d in data['details']], [trip.id for trip in self.trips])
+        self.assertEqual(Course.objects.get(pk=data['id']).details.count(), 20)
+
+    def test_course_create_and_update_in_constant_queries(self):
+        short, _ = self.post('/api/trips/courses/', {
+            'title': '코스', 'start_date': date.today(), 'end_date': date.today(),
+            'trip_ids': [self.trips[0].id],
+        })
+        long, data = self.post('/api/trips/courses/', {
+            'title': '코스', 'start_date': date.today(), 'end_date': date.today(),
+            'trip_ids': [trip.id for trip in self.trips] + [999999],
+        })
+        self.assertEqual(short, long)
+        self.assertEqual(len(data['details']), 20)
+
+        def patch(trip_ids):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.patch(f"/api/trips/courses/{data['id']}/", {'trip_ids': trip_ids}, format='json')
+            self.assertEqual(response.status_code, 200)
+            return len(ctx.captured_queries), response.json()
+
+        many, _ = patch([trip.id for trip in self.trips])
+        few, updated = patch([self.trips[3].id, self.trips[1].id])
+        self.assertEqual(many, few)
+        self.assertEqual([d['trip']['id'] for d in updated['details']], [self.trips[3].id, self.trips[1].id])
+
+    def test_saved_plan_accepts_string_ids(self):
+        trip = self.trips[0]
+        plan = [{'day': 1, 'schedule': [
+            {'type': 'spot', 'trip_id': str(trip.id)},
+            {'type': 'meal', 'data': {'id': str(trip.id)}},
+        ]}]
+        response = self.client.post('/api/planner/save/', {'title': '코스', 'plan': plan}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([d['trip']['id'] for d in response.json()['details']], [trip.id, trip.id])
+
+        plan[0]['schedule'].append({'type': 'spot', 'trip_id': 'abc'})
+        count = Course.objects.count()
+        response = self.client.post('/api/planner/save/', {'title': '코스', 'plan': plan}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Course.objects.count(), count)
+
+
+class PlannerPoolCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.region = Region.objects.create(name='서울', slug='seoul')
+        cls.city = City.objects.create(region=cls.region, name='강남구', external_code='1_1')
+        category = Category.objects.create(name='관광지')
+        cls.trips = [
+            Trip.objects.create(
+                title=f'여행지 {i}', region=cls.region, city=cls.city, category=category,
+                mapy=37.5 + i * 0.002, mapx=127.0 + i * 0.002, recommendation_score=i,
+            )
+            for i in range(12)
+        ]
+        cls.user = User.objects.create_user(username='planner', password='pw')
+        Wishlist.objects.create(user=cls.user, trip=cls.trips[0])
+
+    def setUp(self):
+        clear_city_pools()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def generate(self):
+        body = {
+            'start_date': date.today(), 'end_date': date.today(), 'num_people': 2,
+            'region_id': self.region.id, 'city_id': self.city.id,
+            'current_mapx': 127.0, 'current_mapy': 37.5,
+        }
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/api/planner/generate/', body, format='json')
+        self.assertEqual(response.status_code, 200)
+        return ctx.captured_queries
+
+    def test_regenerate_reuses_city_pool(self):
+        first = self.generate()
+        second = self.generate()
+        self.assertEqual(len(second), 3)  # 카탈로그 버전 + 찜 목록 + 일정에 들어간 여행지만 조회
+        self.assertLess(len(second), len(first))
+
+        # 저장으로 카탈로그가 바뀌면 다시 읽음
+        self.trips[1].save()
+        self.assertEqual(len(self.generate()), len(first))
+
+    def test_cache_is_bounded_by_matrix_bytes(self):
+        def load(n):
+            return lambda: [Place(i, 127.0 + i * 0.01, 37.5, 1, 0, 0, '', None) for i in range(n)]
+
+        loads = []
+        with override_settings(PLANNER_POOL_CACHE_BYTES=450):  # 10곳 행렬(200바이트) 두 개까지
+            for city_id in (1, 2, 1, 3):
+                city_pools(self.region.id, city_id, lambda: loads.append(city_id) or load(10)())
+            self.assertEqual(cached_pool_bytes(), 400)
+            self.assertEqual(loads, [1, 2, 3])  # 1은 다시 쓰여 최근 것이 되고, 2가 밀려남
+
+            city_pools(self.region.id, 1, lambda: loads.append(1) or load(10)())
+            self.assertEqual(loads, [1, 2, 3])
+
+            city_pools(self.region.id, 4, load(20))  # 한도보다 큰 도시는 혼자 남음
+            self.assertEqual(cached_pool_bytes(), 800)
+
+    def test_personalized_adds_wish_bonus_and_keeps_base(self):
+        base = classify_places(Place.load(Trip.objects.all()))[0]['attractions']
+        pool = base.personalized({self.trips[0].id})
+
+        self.assertEqual(pool.trips[0].id, self.trips[0].id)
+        self.assertEqual(pool.scores[0], base.scores[base.index[self.trips[0].id]] + 150)
+        self.assertEqual(pool.ids.tolist(), [trip.id for trip in pool.trips])
+
+
+class PlanResponseTest(TestCase):
+    """일정 응답은 trip_id 참조 + 중복 없는 trips 사전, 스트리밍이면 하루 한 줄(NDJSON)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        region = Region.objects.create(name='서울', slug='seoul')
+        city = City.objects.create(region=region, name='종로구', external_code='1_2')
+        categories = {pk: Category.objects.create(pk=pk, name=name) for pk, name in ((1, '관광지'), (6, '숙박'), (8, '음식점'))}
+        for pk, count in ((1, 12), (6, 2), (8, 6)):
+            for i in range(count):
+                Trip.objects.create(
+                    title=f'{categories[pk].name} {i}', region=region, city=city, category=categories[pk],
+                    mapy=37.5 + i * 0.002, mapx=127.0 + pk * 0.001, recommendation_score=i,
+                )
+        cls.body = {
+            'start_date': date.today(), 'end_date': date.today() + timedelta(days=2), 'num_people': 2,
+            'region_id': region.id, 'city_id': city.id, 'current_mapx': 127.0, 'current_mapy': 37.5,
+        }
+        cls.user = User.objects.create_user(username='planner', password='pw')
+
+    def setUp(self):
+        clear_city_pools()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_trips_are_referenced_by_id(self):
+        data = self.client.post('/api/planner/generate/', self.body, format='json').json()
+        items = [item for day in data['plan'] for item in day['schedule']]
+
+        self.assertEqual(len(data['plan']), 3)
+        self.assertTrue(all('data' not in item and 'place' not in item for item in items))
+        self.assertEqual(set(data['trips']), {str(item['trip_id']) for item in items})
+        self.assertIn(str(data['recommended_accommodation_id']), data['trips'])
+        self.assertGreater(len(items), len(data['trips']))  # 숙소는 여러 번 나와도 한 번만 담김
+
+    def test_stream_sends_one_line_per_day(self):
+        response = self.client.post('/api/planner/generate/?stream=1', self.body, format='json')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+
+        self.assertEqual([line['type'] for line in lines], ['summary', 'day', 'day', 'day', 'end'])
+        sent = [trip_id for line in lines for trip_id in line.get('trips', {})]
+        self.assertEqual(len(sent), len(set(sent)))
+        for line in lines[1:-1]:
+            for item in line['day']['schedule']:
+                self.assertIn(str(item['trip_id']), sent)
+
+    def test_stream_reports_failure_after_first_day(self):
+        original = AIPlannerView._optimize_day
+        calls = []
+
+        def fail_on_second_day(view, day_items, *args):
+            calls.append(1)
+            if len(calls) == 2:
+                raise RuntimeError('boom')
+            return original(view, day_items, *args)
+
+        with mock.patch.object(AIPlannerView, '_optimize_day', fail_on_second_day), self.assertLogs('planner.views', 'ERROR'):
+            response = self.client.post('/api/planner/generate/?stream=1', self.body, format='json')
+            lines = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([line['type'] for line in lines], ['summary', 'day', 'error'])
+
+    def test_saved_plan_accepts_trip_ids(self):
+        data = self.client.post('/api/planner/generate/', self.body, format='json').json()
+        response = self.client.post('/api/planner/save/', {'title': '코스', 'plan': data['plan']}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            [d['trip']['id'] for d in response.json()['details']],
+            [item['trip_id'] for day in data['plan'] for item in day['schedule']],
+        )
+
+
+class TravelTimeTest(TestCase):
+    def place(self, pk, lat, lon):
+        return Place(pk, lon, lat, None, 0, 0, '')
+
+    def test_matrix_uses_great_circle_distance(self):
+        origin = self.place(1, 37.5, 127.0)
+        east = self.place(2, 37.5, 127.0 + 1 / 88.2)    # 경도 방향 약 1km
+        north = self.place(3, 37.5 + 1 / 111.2, 127.0)  # 위도 방향 약 1km
+        nowhere = self.place(4, 0, 0)
+        travel = MatrixTravelTime([origin, east, north, nowhere], profile_for('seoul'))
+
+        self.assertEqual(travel.minutes(origin, east), travel.minutes(origin, north))
+        self.assertEqual(travel.minutes(origin, east), 4)  # 1km x 우회 1.3 / 20km/h
+        self.assertEqual(travel.minutes(origin, origin), 0)
+        self.assertEqual(travel.minutes(origin, nowhere), 30)
+        self.assertEqual(travel.matrix.dtype, 'uint16')
+
+    def test_osrm_file_overrides_matrix(self):
+        places = [self.place(10, 37.5, 127.0), self.place(11, 37.6, 127.1)]
+        with tempfile.TemporaryDirectory() as directory:
+            with open(f'{directory}/1_2.json', 'w') as f:
+                json.dump({'ids': [11, 99, 10], 'durations': [[0, 5, 1200], [5, 0, 5], [900, None, 0]]}, f)
+            with override_settings(PLANNER_TRAVEL_MATRIX_DIR=directory):
+                travel = city_travel_times(1, 2, places)
+
+        self.assertEqual(travel.minutes(places[0], places[1]), 15)
+        self.assertEqual(travel.minutes(places[1], places[0]), 20)
+
+
+class LineTravelTime:
+    """직선 위 좌표 차이를 그대로 이동 시간(분)으로 쓰는 가짜 제공자"""
+
+    def minutes(self, origin, dest):
+        return abs(origin.mapx - dest.mapx)
+
+
+class RouteOptimizerTest(TestCase):
+    def place(self, pk, x):
+        return Place(pk, x, 37.5, None, 0, 0, '', None)
+
+    def test_zigzag_day_is_untangled(self):
+        start = self.place(0, 0)
+        stops = [Stop(self.place(pk, x), 30) for pk, x in ((1, 40), (2, 10), (3, 30), (4, 20))]
+        travel = LineTravelTime()
+
+        route = optimize_day(stops, travel, start, 9 * 60)
+        self.assertEqual([stop.place.id for stop in route], [2, 4, 3, 1])
+        self.assertLess(cost(route, travel, start, 9 * 60), cost(stops, travel, start, 9 * 60))
+
+    def test_time_windows_outrank_travel(self):
+        start = self.place(0, 0)
+        near = [Stop(self.place(pk, 5), 150) for pk in (1, 2)]
+        lunch = Stop(self.place(3, 50), 60, window=(12 * 60, 14 * 60))
+        travel = LineTravelTime()
+
+        # 가까운 곳을 먼저 다 돌면 점심 도착이 14시를 넘김 -> 이동이 늘더라도 점심을 앞당김
+        self.assertGreater(cost([*near, lunch], travel, start, 9 * 60)[0], 0)
+        route = optimize_day([*near, lunch], travel, start, 9 * 60)
+        self.assertEqual(cost(route, travel, start, 9 * 60)[0], 0)
+        self.assertNotEqual(route[-1].place.id, 3)
+
+
+class OpeningHoursTest(TestCase):
+    def place(self, pk, rest_date='', operating_info=None):
+        return Place(pk, 127.0, 37.5, None, 0, 0, rest_date, operating_info)
+
+    def weekly(self, open_time, close_time, closed=()):
+        return {'weekly': {
+            day: {'open': open_time, 'close': close_time, 'is_closed': day in closed}
+            for day in ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+        }}
+
+    def test_weekday_bitmask(self):
+        pool = CandidatePool([
+            self.place(1, rest_date='일요일'),
+            self.place(2, rest_date='매월 첫째 월요일'),
+            self.place(3, rest_date='매주 월요일', operating_info=self.weekly(None, None, closed=('Tue',))),
+        ])
+        monday, tuesday, sunday = 0, 1, 6
+        self.assertEqual(pool.available(set(), monday).tolist(), [True, True, True])
+        self.assertEqual(pool.available(set(), tuesday).tolist(), [True, True, False])
+        self.assertEqual(pool.available(set(), sunday).tolist(), [False, True, True])
+
+    def test_open_at_arrival_time(self):
+        pool = CandidatePool([
+            self.place(1, operating_info=self.weekly('10:00', '17:00')),
+            self.place(2, operating_info=self.weekly('17:00', '22:00')),
+            self.place(3),
+        ])
+        self.assertEqual(pool.open_at(0, 9 * 60, 90).tolist(), [True, True, True])     # 문을 열 때까지 기다림
+        self.assertEqual(pool.open_at(0, 16 * 60, 90).tolist(), [False, True, True])   # 머무는 중에 닫음
+        self.assertEqual(pool.open_at(0, 21 * 60, 90).tolist(), [False, False, True])
+        self.assertEqual(pool.open_at(0, 11 * 60, 60, earliest=18 * 60).tolist(), [False, True, True])
@@ -0,0 +1,155 @@
+import json
+import os
+from collections import namedtuple
+
+import numpy as np
+from django.conf import settings
+
+from trips.geo import haversine_rad
+from trips.models import Region
+
+# --- 장소 간 이동 시간 ---
+# 시군구 후보군을 불러올 때 후보 전체의 이동 시간(분) 행렬을 한 번 계산해 두고,
+# 일정 생성 중에는 행렬 조회(O(1))나 행 슬라이스로 이동 시간을 얻는다.
+# 기본값은 대권 거리 x 우회 계수를 지역별 속도 프로파일로 환산한 값이며,
+# PLANNER_TRAVEL_MATRIX_DIR 에 OSRM table 형식 파일이 있으면 그 값으로 덮어쓴다.
+
+# 근거리(short_km 이하)는 시내 속도, 그 이상은 장거리 속도로 달린다고 보고 계산
+SpeedProfile = namedtuple('SpeedProfile', ['city_kmh', 'highway_kmh', 'short_km', 'detour'])
+
+DEFAULT_PROFILE = SpeedProfile(city_kmh=30, highway_kmh=70, short_km=10, detour=1.3)
+SPEED_PROFILES = {  # Region.slug 기준
+    'seoul': SpeedProfile(20, 50, 10, 1.3),
+    'busan': SpeedProfile(22, 55, 10, 1.35),
+    'incheon': SpeedProfile(25, 60, 10, 1.3),
+    'daegu': SpeedProfile(25, 60, 10, 1.3),
+    'gwangju': SpeedProfile(25, 60, 10, 1.3),
+    'daejeon': SpeedProfile(25, 60, 10, 1.3),
+    'ulsan': SpeedProfile(28, 65, 10, 1.3),
+    'gangwon': SpeedProfile(35, 70, 10, 1.45),
+    'jeju': SpeedProfile(35, 60, 10, 1.3),
+}
+
+NO_ROUTE = np.iinfo(np.uint16).max  # 좌표가 없어 계산할 수 없는 경로 (점수 계산 시 사실상 제외)
+UNKNOWN_MINUTES = 30                # 일정 시간 계산에 쓰는 좌표 없는 구간의 이동 시간
+MATRIX_BLOCK_ROWS = 256
+
+
+def profile_for(region_slug):
+    return SPEED_PROFILES.get(region_slug, DEFAULT_PROFILE)
+
+
+def coords(places):
+    """(위도 radian 배열, 경도 radian 배열, 좌표 유무 마스크)"""
+    lat = np.array([float(getattr(p, 'mapy', None) or 0) for p in places], dtype=np.float64)
+    lon = np.array([float(getattr(p, 'mapx', None) or 0) for p in places], dtype=np.float64)
+    valid = (lat != 0) & (lon != 0)
+    return np.radians(lat), np.radians(lon), valid
+
+
+def drive_minutes(km, profile):
+    """직선 거리(km) -> 예상 이동 시간(분)"""
+    road = km * profile.detour
+    short = np.minimum(road, profile.short_km)
+    return (short / profile.city_kmh + (road - short) / profile.highway_kmh) * 60
+
+
+class TravelTimeProvider:
+    """장소 간 이동 시간(분) 인터페이스"""
+
+    def minutes(self, origin, dest):
+        """origin -> dest 이동 시간 (정수 분)"""
+        raise NotImplementedError
+
+    def minutes_to(self, origin, pool):
+        """origin 에서 pool 의 모든 후보까지의 이동 시간 배열 (좌표가 없으면 NO_ROUTE)"""
+        raise NotImplementedError
+
+
+class HaversineTravelTime(TravelTimeProvider):
+    """행렬 없이 좌표로 바로 계산 (현재 위치처럼 후보군 밖의 지점용)"""
+
+    def __init__(self, profile=DEFAULT_PROFILE):
+        self.profile = profile
+
+    def row(self, origin, places):
+        lat, lon, valid = coords(places)
+        o_lat, o_lon, o_valid = coords([origin])
+        if not o_valid[0]:
+            return np.full(len(places), NO_ROUTE, dtype=np.float64)
+        minutes = np.rint(drive_minutes(haversine_rad(o_lat[0], o_lon[0], lat, lon), self.profile))
+        return np.where(valid, np.minimum(minutes, NO_ROUTE - 1), NO_ROUTE)
+
+    def minutes(self, origin, dest):
+        value = int(self.row(origin, [dest])[0])
+        return UNKNOWN_MINUTES if value == NO_ROUTE else value
+
+    def minutes_to(self, origin, pool):
+        return self.row(origin, pool.trips)
+
+
+class MatrixTravelTime(HaversineTravelTime):
+    """시군구 후보 전체의 이동 시간 행렬 (uint16 분 단위, 후보 n 개면 n*n*2 바이트)"""
+
+    def __init__(self, places, profile=DEFAULT_PROFILE, overrides=None):
+        super().__init__(profile)
+        self.index = {place.id: i for i, place in enumerate(places)}
+
+        lat, lon, valid = coords(places)
+        n = len(places)
+        matrix = np.empty((n, n), dtype=np.uint16)
+        for start in range(0, n, MATRIX_BLOCK_ROWS):
+            # 행 블록 단위로 계산해 float64 중간 배열 크기를 제한
+            rows = slice(start, start + MATRIX_BLOCK_ROWS)
+            km = haversine_rad(lat[rows, None], lon[rows, None], lat[None, :], lon[None, :])
+            matrix[rows] = np.minimum(np.rint(drive_minutes(km, profile)), NO_ROUTE - 1)
+        matrix[~valid, :] = NO_ROUTE
+        matrix[:, ~valid] = NO_ROUTE
+        np.fill_diagonal(matrix, 0)
+        self.matrix = matrix
+
+        if overrides:
+            self.apply_overrides(*overrides)
+
+    def apply_overrides(self, ids, durations):
+        """OSRM table 응답의 durations(초) 로 덮어씀 (null 이나 모르는 id 는 그대로)"""
+        positions = np.array([self.index.get(pk, -1) for pk in ids])
+        known = np.flatnonzero(positions >= 0)
+        table = np.array(durations, dtype=np.float64)[np.ix_(known, known)]
+        rows, cols = positions[known][:, None], positions[known][None, :]
+        current = self.matrix[rows, cols]
+        routed = np.where(np.isnan(table), current, np.minimum(np.rint(table / 60), NO_ROUTE - 1))
+        self.matrix[rows, cols] = routed.astype(np.uint16)
+
+    def minutes(self, origin, dest):
+        i = self.index.get(getattr(origin, 'id', None))
+        j = self.index.get(getattr(dest, 'id', None))
+        if i is None or j is None:
+            return super().minutes(origin, dest)
+        value = int(self.matrix[i, j])
+        return UNKNOWN_MINUTES if value == NO_ROUTE else value
+
+    def minutes_to(self, origin, pool):
+        i = self.index.get(getattr(origin, 'id', None))
+        if i is None or pool.positions is None:
+            return super().minutes_to(origin, pool)
+        return self.matrix[i, pool.positions].astype(np.float64)
+
+
+def load_overrides(region_id, city_id):
+    """PLANNER_TRAVEL_MATRIX_DIR/<region_id>_<city_id>.json - {"ids": [...], "durations": [[초, ...], ...]}"""
+    directory = getattr(settings, 'PLANNER_TRAVEL_MATRIX_DIR', None)
+    if not directory:
+        return None
+    path = os.path.join(directory, f'{region_id}_{city_id}.json')
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    return data['ids'], np.array(data['durations'], dtype=np.float64)  # null -> nan
+
+
+def city_travel_times(region_id, city_id, places):
+    """시군구 후보 전체의 이동 시간 행렬 (지역 속도 프로파일 + 있으면 OSRM 파일)"""
+    slug = Region.objects.filter(pk=region_id).values_list('slug', flat=True).first()
+    return MatrixTravelTime(places, profile_for(slug), overrides=load_overrides(region_id, city_id))
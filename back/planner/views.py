@@ -1,25 +1,52 @@
-import math
+import json
+import logging
 import random 
+import numpy as np
 from datetime import datetime, timedelta
+from django.db import transaction
+from django.http import StreamingHttpResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.decorators import api_view, permission_classes
 
 from trips.models import Trip, Wishlist, Region
-from trips.serializers import TripListSerializer
+from trips.serializers import TripListSerializer, trip_list_context
+from trips.caching import cached_response
 from .serializers import PlannerInputSerializer, CourseSerializer, RegionSerializer
-from .models import Course, CourseDetail
+from .models import Course
+from .courses import add_details, load_course, with_details
+from .pools import Place, city_pools, opening_minutes
+from .routing import Stop, evaluate, optimize_day
+
+logger = logging.getLogger(__name__)
 
 # --- Helper Functions (Static) ---
 
-def calculate_distance(p1, p2):
-    if not (p1.mapx and p1.mapy and p2.mapx and p2.mapy):
-        return 99999
-    return math.sqrt(
-        (float(p1.mapx) - float(p2.mapx))**2 + 
-        (float(p1.mapy) - float(p2.mapy))**2
-    )
+DAY_START_MINUTE = 9 * 60
+LUNCH_WINDOW = (12 * 60, 14 * 60)          # (가장 이른 시작, 가장 늦은 도착)
+DINNER_WINDOW = (18 * 60, 20 * 60 + 30)
+
+class PlanTrips:
+    """
+    요청 하나 동안 쓰는 직렬화된 여행지 캐시.
+    일정 항목은 trip_id 로만 여행지를 가리키고, 여행지 정보는 id -> 직렬화 데이터 사전으로 한 번씩만 보낸다.
+    """
+
+    def __init__(self, context):
+        self.context = context
+        self.data = {}
+
+    def add(self, places):
+        """아직 직렬화하지 않은 장소만 한 번에 조회/직렬화해 {id: 데이터} 로 반환"""
+        new_ids = {place.id for place in places if place is not None} - self.data.keys()
+        if not new_ids:
+            return {}
+        trips = Trip.objects.select_related('region', 'city', 'category').in_bulk(new_ids)
+        added = {pk: TripListSerializer(trip, context=self.context).data for pk, trip in trips.items()}
+        self.data.update(added)
+        return added
+
 
 def get_mapx(trip):
     try:
@@ -27,20 +54,14 @@ def get_mapx(trip):
     except (ValueError, TypeError):
         return 999.0
 
-def calculate_move_time_minutes(dist_coord):
-    km = dist_coord * 111
-    hours = km / 40 
-    return int(hours * 60) 
-
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_region_list(request):
-    regions = Region.objects.prefetch_related('cities').all()
-    serializer = RegionSerializer(regions, many=True)
-    return Response(serializer.data)
+    return cached_response(request, 'regions', 'all', lambda: RegionSerializer(Region.objects.prefetch_related('cities').all(), many=True).data)
 
 class AIPlannerView(APIView):
     permission_classes = [IsAuthenticated]
+    optimize_routes = True  # 하루 방문 순서 동선 최적화 (planner/routing.py)
 
     def post(self, request):
         serializer = PlannerInputSerializer(data=request.data)
@@ -53,76 +74,60 @@ class AIPlannerView(APIView):
         start_date = data['start_date']
         duration = (data['end_date'] - start_date).days + 1
         user_loc = type('UserLoc', (), {'mapx': data['current_mapx'], 'mapy': data['current_mapy']})()
+        self.user_loc = user_loc
 
-        all_places = Trip.objects.filter(
+        # 후보 선정에는 점수 계산용 컬럼만 로드하고, 일정에 들어간 장소만 나중에 Trip 으로 조회
+        # (분류/기본 점수는 시군구별로 캐시되어 같은 조건으로 다시 생성하면 DB 를 읽지 않음)
+        base_pools, self.travel = city_pools(data['region_id'], data['city_id'], lambda: Place.load(Trip.objects.filter(
             region_id=data['region_id'], 
             city_id=data['city_id'],
             status='active'
-        )
-        if not all_places.exists():
+        )))
+        if not any(base_pools.values()):
             return Response({"message": "해당 지역에 데이터가 없습니다."}, status=404)
 
         my_wish_ids = set(Wishlist.objects.filter(user=user).values_list('trip_id', flat=True))
 
-        pools = self._classify_and_score_places(all_places, my_wish_ids)
+        pools = self._classify_and_score_places(base_pools, my_wish_ids)
         
         if not pools['attractions']:
              return Response({"message": "관광지 데이터가 부족합니다."}, status=400)
 
         anchors = self._select_anchors(pools['attractions'], duration)
-        best_accommodation = self._select_best_accommodation(anchors, pools['accommodations'], my_wish_ids)
+        best_accommodation = self._select_best_accommodation(anchors, pools['accommodations'])
 
         travel_time_minutes = self._calc_initial_travel_time(user_loc, anchors[0])
 
-        plan = self._generate_schedule(
-            request, anchors, best_accommodation, pools, 
+        days = self._iter_schedule(
+            anchors, best_accommodation, pools, 
             start_date, duration, travel_time_minutes, 
-            used_ids=set(a.id for a in anchors), 
-            wish_ids=my_wish_ids
+            used_ids=set(a.id for a in anchors)
         )
 
-        return Response({
+        trips = PlanTrips({'request': request, 'liked_trip_ids': my_wish_ids})
+        summary = {
             "duration": duration,
             "travel_time_to_dest": travel_time_minutes,
             "region_id": data['region_id'],
-            "recommended_accommodation": TripListSerializer(best_accommodation, context={'request': request}).data if best_accommodation else None,
-            "plan": plan
-        })
+            "recommended_accommodation_id": best_accommodation.id if best_accommodation else None,
+        }
 
-    # --- Internal Logic Methods ---
+        if self._wants_stream(request):
+            # 하루 일정이 만들어질 때마다 한 줄씩 보내 프런트가 1일차부터 그릴 수 있게 함
+            return StreamingHttpResponse(self._stream_plan(summary, days, best_accommodation, trips), content_type='application/x-ndjson')
 
-    def _classify_and_score_places(self, places, wish_ids):
-        """초기 분류 및 점수 계산 (좋아요 반영 O, 조회수 X)"""
-        pools = {'attractions': [], 'restaurants': [], 'accommodations': []}
+        plan = list(days)
+        trips.add([best_accommodation, *(item.pop('place') for day in plan for item in day['schedule'])])
+        return Response({**summary, "plan": plan, "trips": trips.data})
 
-        for trip in places:
-            base_score = trip.recommendation_score if trip.recommendation_score else 50
-            wish_bonus = 150 if trip.id in wish_ids else 0
-            
-            # 대중성 점수 (좋아요만 반영)
-            raw_popularity = trip.like_count * 2
-            popularity_bonus = min(raw_popularity, 60)
-            
-            noise = random.uniform(-5, 5)
-            final_score = base_score + wish_bonus + popularity_bonus + noise
-            
-            item = {'trip': trip, 'score': final_score}
-            
-            if trip.category_id == 8: 
-                pools['restaurants'].append(item)
-            elif trip.category_id == 6: 
-                pools['accommodations'].append(item)
-            else: 
-                pools['attractions'].append(item)
-
-        for key in pools:
-            pools[key].sort(key=lambda x: x['score'], reverse=True)
-            pools[key] = [x['trip'] for x in pools[key]]
-        
-        return pools
+    # --- Internal Logic Methods ---
+
+    def _classify_and_score_places(self, base_pools, wish_ids):
+        """캐시된 분류/기본 점수 후보군에 찜 가중치와 무작위 노이즈만 더해 요청별 후보군 생성 (좋아요 반영 O, 조회수 X)"""
+        return {key: pool.personalized(wish_ids, noise=5) for key, pool in base_pools.items()}
 
     def _select_anchors(self, attractions, duration):
-        candidates = attractions[:duration * 15]
+        candidates = attractions.trips[:duration * 15]
         anchors = []
         used_ids = set()
 
@@ -131,12 +136,11 @@ class AIPlannerView(APIView):
         used_ids.add(start_node.id)
 
         while len(anchors) < duration:
-            last_anchor = anchors[-1]
-            remaining = [t for t in candidates if t.id not in used_ids]
+            # 후보 배열 앞부분(candidates)만 거리순으로 정렬
+            dist = attractions.distances_from(anchors[-1])[:len(candidates)]
+            remaining = [candidates[i] for i in np.argsort(dist, kind='stable') if candidates[i].id not in used_ids]
             if not remaining: break
             
-            remaining.sort(key=lambda x: calculate_distance(last_anchor, x))
-            
             top_k = remaining[:3]
             next_anchor = random.choice(top_k)
             
@@ -145,44 +149,54 @@ class AIPlannerView(APIView):
             
         return anchors
 
-    def _select_best_accommodation(self, anchors, accommodations, wish_ids):
+    def _select_best_accommodation(self, anchors, accommodations):
         if not accommodations or not anchors: return None
 
         valid_anchors = [a for a in anchors if a.mapx and a.mapy]
-        if not valid_anchors: return accommodations[0]
+        if not valid_anchors: return accommodations.trips[0]
 
         avg_x = sum(float(a.mapx) for a in valid_anchors) / len(valid_anchors)
         avg_y = sum(float(a.mapy) for a in valid_anchors) / len(valid_anchors)
         centroid = type('Centroid', (), {'mapx': avg_x, 'mapy': avg_y})()
 
-        candidates_with_score = []
-        for acc in accommodations:
-            p_base = acc.recommendation_score if acc.recommendation_score else 50
-            p_wish = 150 if acc.id in wish_ids else 0
-            
-            raw_popularity = acc.like_count * 2
-            popularity_bonus = min(raw_popularity, 60)
-            
-            dist = calculate_distance(centroid, acc)
-            distance_penalty = dist * 2500 
-            
-            final = (p_base + p_wish + popularity_bonus) - distance_penalty
-            candidates_with_score.append((acc, final))
-        
-        candidates_with_score.sort(key=lambda x: x[1], reverse=True)
-        
-        top_k_accs = [item[0] for item in candidates_with_score[:3]]
-        return random.choice(top_k_accs) if top_k_accs else None
+        distance_penalty = accommodations.distances_from(centroid) * 22.5  # km 당 (좌표 1도 ≈ 111km 당 2500)
+        final = accommodations.scores - distance_penalty
 
-    def _calc_initial_travel_time(self, user_loc, dest):
-        dist = calculate_distance(user_loc, dest)
-        km = dist * 111
-        speed = 70 if km > 10 else 40
-        return int((km / speed) * 60)
+        top_k = accommodations.top_k(final, np.ones(len(accommodations), dtype=bool), 3)
+        return accommodations.trips[random.choice(top_k)]
 
-    def _generate_schedule(self, request, anchors, accommodation, pools, start_date, duration, travel_time, used_ids, wish_ids):
-        plan = []
-        
+    def _calc_initial_travel_time(self, user_loc, dest):
+        # 현재 위치는 행렬 밖이므로 좌표로 바로 계산 (장거리는 지역 프로파일의 장거리 속도)
+        return self.travel.minutes(user_loc, dest)
+
+    def _wants_stream(self, request):
+        """?stream=1 이나 Accept: application/x-ndjson 이면 일별 NDJSON 스트리밍"""
+        if request.query_params.get('stream') in ('1', 'true'):
+            return True
+        return 'application/x-ndjson' in request.headers.get('Accept', '')
+
+    def _stream_plan(self, summary, days, accommodation, trips):
+        """
+        NDJSON 줄 단위 응답 - 첫 줄은 {"type": "summary", ...}, 이후 하루마다 {"type": "day", "day": {...}, "trips": {...}},
+        마지막 줄은 {"type": "end"}. 상태 코드(200)를 보낸 뒤 실패하면 {"type": "error"} 로 끝내므로
+        프런트는 end 줄을 받아야 완성된 일정으로 본다. 각 줄의 trips 에는 앞선 줄에서 보내지 않은 여행지만 담는다.
+        """
+        def line(data):
+            return json.dumps(data, ensure_ascii=False, default=str) + "\n"
+
+        try:
+            yield line({"type": "summary", **summary, "trips": trips.add([accommodation])})
+            for day in days:
+                added = trips.add([item.pop('place') for item in day['schedule']])
+                yield line({"type": "day", "day": day, "trips": added})
+        except Exception:
+            logger.exception("planner stream failed")
+            yield line({"type": "error", "message": "일정 생성 중 오류가 발생했습니다."})
+            return
+        yield line({"type": "end"})
+
+    def _iter_schedule(self, anchors, accommodation, pools, start_date, duration, travel_time, used_ids):
+        """하루 일정을 하나씩 만들어 내보냄 (항목의 place 는 직렬화 전에 꺼내 씀)"""
         for day_idx, anchor in enumerate(anchors):
             day_items = []
             current_date_obj = start_date + timedelta(days=day_idx)
@@ -197,8 +211,8 @@ class AIPlannerView(APIView):
                 current_time = datetime.combine(current_date_obj, datetime.min.time()).replace(hour=9, minute=0)
 
                 if accommodation:
-                    day_items.append(self._make_item("accommodation", "start", current_time, accommodation, request))
-                    move_min = calculate_move_time_minutes(calculate_distance(accommodation, anchor))
+                    day_items.append(self._make_item("accommodation", "start", current_time, accommodation))
+                    move_min = self.travel.minutes(accommodation, anchor)
                     current_time += timedelta(minutes=move_min)
             
             last_visited = current_place
@@ -206,23 +220,23 @@ class AIPlannerView(APIView):
             # 오전 일정
             lunch_threshold = current_time.replace(hour=11, minute=30)
             if current_time < lunch_threshold:
-                day_items.append(self._make_item("spot", current_time, current_time, anchor, request))
+                day_items.append(self._make_item("spot", current_time, current_time, anchor, stay=90))
                 current_time += timedelta(minutes=90)
                 last_visited = anchor 
                 current_place = anchor
 
                 if current_time < lunch_threshold:
                     am_spot = self._find_best_nearby(
-                        current_place, pools['attractions'], used_ids, wish_ids, 
-                        current_date_obj, last_place=last_visited
+                        current_place, pools['attractions'], used_ids, 
+                        current_time, 60, last_place=last_visited
                     )
                     if am_spot:
-                        move_min = calculate_move_time_minutes(calculate_distance(current_place, am_spot))
+                        move_min = self.travel.minutes(current_place, am_spot)
                         expected_end = current_time + timedelta(minutes=move_min + 60)
                         
                         if expected_end <= current_time.replace(hour=13, minute=0):
                             current_time += timedelta(minutes=move_min)
-                            day_items.append(self._make_item("spot", current_time, current_time, am_spot, request))
+                            day_items.append(self._make_item("spot", current_time, current_time, am_spot, stay=60))
                             used_ids.add(am_spot.id)
                             current_place = am_spot
                             last_visited = am_spot
@@ -232,15 +246,15 @@ class AIPlannerView(APIView):
             lunch_limit = current_time.replace(hour=14, minute=0)
             if current_time < lunch_limit:
                 lunch_spot = self._find_best_nearby(
-                    current_place, pools['restaurants'], used_ids, wish_ids, 
-                    current_date_obj, is_restaurant=True
+                    current_place, pools['restaurants'], used_ids, 
+                    current_time, 60, is_restaurant=True, earliest=LUNCH_WINDOW[0]
                 )
                 if lunch_spot:
-                    move_min = calculate_move_time_minutes(calculate_distance(current_place, lunch_spot))
+                    move_min = self.travel.minutes(current_place, lunch_spot)
                     arrival_at_lunch = current_time + timedelta(minutes=move_min)
                     real_lunch_time = max(arrival_at_lunch, current_time.replace(hour=12, minute=0))
                     
-                    day_items.append(self._make_item("meal", real_lunch_time, real_lunch_time, lunch_spot, request))
+                    day_items.append(self._make_item("meal", real_lunch_time, real_lunch_time, lunch_spot, stay=60))
                     current_place = lunch_spot
                     last_visited = lunch_spot
                     current_time = real_lunch_time + timedelta(minutes=60)
@@ -252,13 +266,13 @@ class AIPlannerView(APIView):
                 for _ in range(2):
                     if current_time.hour >= 18: break
                     pm_spot = self._find_best_nearby(
-                        current_place, pools['attractions'], used_ids, wish_ids, 
-                        current_date_obj, last_place=last_visited
+                        current_place, pools['attractions'], used_ids, 
+                        current_time, 90, last_place=last_visited
                     )
                     if pm_spot:
-                        move_min = calculate_move_time_minutes(calculate_distance(current_place, pm_spot))
+                        move_min = self.travel.minutes(current_place, pm_spot)
                         current_time += timedelta(minutes=move_min)
-                        day_items.append(self._make_item("spot", current_time, current_time, pm_spot, request))
+                        day_items.append(self._make_item("spot", current_time, current_time, pm_spot, stay=90))
                         used_ids.add(pm_spot.id)
                         current_place = pm_spot
                         last_visited = pm_spot
@@ -266,102 +280,114 @@ class AIPlannerView(APIView):
 
                 # 저녁
                 dinner_spot = self._find_best_nearby(
-                    current_place, pools['restaurants'], used_ids, wish_ids, 
-                    current_date_obj, is_restaurant=True
+                    current_place, pools['restaurants'], used_ids, 
+                    current_time, 60, is_restaurant=True, earliest=DINNER_WINDOW[0]
                 )
                 if dinner_spot:
-                    move_min = calculate_move_time_minutes(calculate_distance(current_place, dinner_spot))
+                    move_min = self.travel.minutes(current_place, dinner_spot)
                     arrival_at_dinner = current_time + timedelta(minutes=move_min)
                     real_dinner_time = max(arrival_at_dinner, current_time.replace(hour=18, minute=0))
                     
-                    day_items.append(self._make_item("meal", real_dinner_time, real_dinner_time, dinner_spot, request))
+                    day_items.append(self._make_item("meal", real_dinner_time, real_dinner_time, dinner_spot, stay=60))
                     current_place = dinner_spot
                     current_time = real_dinner_time + timedelta(minutes=60)
 
                 if accommodation:
-                    move_to_acc = calculate_move_time_minutes(calculate_distance(current_place, accommodation))
+                    move_to_acc = self.travel.minutes(current_place, accommodation)
                     arrival_acc = current_time + timedelta(minutes=move_to_acc)
                     status = "check-in" if is_first_day else "return"
-                    day_items.append(self._make_item("accommodation", status, arrival_acc, accommodation, request))
+                    day_items.append(self._make_item("accommodation", status, arrival_acc, accommodation))
 
-            plan.append({
+            if self.optimize_routes:
+                day_items = self._optimize_day(day_items, day_idx, current_date_obj, accommodation)
+
+            yield {
                 "day": day_idx + 1,
                 "date": current_date_obj.strftime("%Y-%m-%d"),
                 "schedule": day_items
-            })
-            
-        return plan
+            }
+
+    def _find_best_nearby(self, current_place, pool, used_ids, current_time, stay, is_restaurant=False, last_place=None, earliest=None):
+        # 식당은 used_ids 에 넣지 않으므로 방금 들른 식당만 제외
+        exclude_id = getattr(current_place, 'id', None) if is_restaurant else None
+        weekday = current_time.weekday()
+        mask = pool.available(used_ids, weekday, exclude_id=exclude_id)
+        if not mask.any():
+            return None
 
-    def _find_best_nearby(self, current_place, pool, used_ids, wish_ids, date, is_restaurant=False, last_place=None):
-        candidates_with_score = []
+        # 도착 예정 시각에 영업 중이고 머무는 동안 닫지 않는 후보만 (earliest 는 식사 시작 시각 등)
+        moves = self.travel.minutes_to(current_place, pool)
+        now = current_time.hour * 60 + current_time.minute
+        mask &= pool.open_at(weekday, now + moves, stay, earliest or 0)
+        if not mask.any():
+            return None
 
-        for potential in pool:
-            if potential.id in used_ids: continue
-            if is_restaurant and potential.id == current_place.id: continue
+        # 이동 1분당 감점 (이동 시간 행렬의 행 하나를 후보 순서로 꺼내 한 번에 계산)
+        penalty_weight = 9 if is_restaurant else 6
+        final_scores = pool.scores - moves * penalty_weight
 
-            if not self._is_open(potential, date):
-                continue 
+        if last_place and not is_restaurant:
+            last_cat = getattr(last_place, 'category_id', None)
+            if last_cat:
+                final_scores = final_scores - np.where(pool.category_ids == last_cat, 80, 0)
 
-            p_base = potential.recommendation_score if potential.recommendation_score else 50
-            p_wish = 150 if potential.id in wish_ids else 0
-            
-            raw_popularity = potential.like_count * 2
-            popularity_bonus = min(raw_popularity, 60)
+        top_k = pool.top_k(final_scores, mask, 5)
+        weights = [10 if i < 3 else 2 for i in range(len(top_k))]
 
-            dist = calculate_distance(current_place, potential)
-            penalty_weight = 3000 if is_restaurant else 2000
-            distance_penalty = dist * penalty_weight
-            
-            variety_penalty = 0
-            if last_place and not is_restaurant: 
-                last_cat = getattr(last_place, 'category_id', None)
-                curr_cat = getattr(potential, 'category_id', None)
-                if last_cat and curr_cat and last_cat == curr_cat:
-                    variety_penalty = 80 
-            
-            final_score = (p_base + p_wish + popularity_bonus) - distance_penalty - variety_penalty
-            
-            candidates_with_score.append((potential, final_score))
-        
-        candidates_with_score.sort(key=lambda x: x[1], reverse=True)
-        
-        if not candidates_with_score:
-            return None
-        
-        top_k = candidates_with_score[:5]
-        
-        weights = []
-        for i in range(len(top_k)):
-            if i < 3: 
-                weights.append(10)
-            else:     
-                weights.append(2)
-        
-        selected_tuple = random.choices(top_k, weights=weights, k=1)[0]
-        
-        return selected_tuple[0]
+        selected = random.choices(top_k, weights=weights, k=1)[0]
+        return pool.trips[selected]
 
-    def _is_open(self, trip, date):
-        if not getattr(trip, 'rest_date', None): 
-            return True 
-        
+    def _day_route(self, day_items, day_idx, date, accommodation):
+        """하루 일정의 (방문지 Stop 목록, 출발지, 출발 시각(분), 도착지)"""
         weekday = date.weekday()
-        korean_days = ["월", "화", "수", "목", "금", "토", "일"]
-        current_day_char = korean_days[weekday] 
-
-        if current_day_char in trip.rest_date:
-            return False 
-        
-        return True 
-
-    def _make_item(self, type_name, status_or_time, time_obj, trip, request):
+        stops = [
+            Stop(item['place'], item['stay'], self._visit_window(item, weekday), item)
+            for item in day_items if item['type'] in ('spot', 'meal')
+        ]
+        start_place = self.user_loc if day_idx == 0 else accommodation
+        returns = any(item['type'] == 'accommodation' and item['status'] != 'start' for item in day_items)
+        return stops, start_place, DAY_START_MINUTE, accommodation if returns else None
+
+    def _visit_window(self, item, weekday):
+        """식사는 점심/저녁 시간대, 관광지는 운영 시간 안에 끝나도록 (분 단위, 모르면 None)"""
+        if item['type'] == 'meal':
+            return LUNCH_WINDOW if item['time'] < '16:00' else DINNER_WINDOW
+        hours = opening_minutes(item['place'], weekday)
+        if hours is None:
+            return None
+        open_minute, close_minute = hours
+        return open_minute, max(open_minute, close_minute - item['stay'])
+
+    def _optimize_day(self, day_items, day_idx, date, accommodation):
+        """방문 순서를 동선 최적화하고 시각을 다시 계산 (숙소 출발/복귀 항목은 양 끝에 그대로)"""
+        stops, start_place, start_minute, end_place = self._day_route(day_items, day_idx, date, accommodation)
+        route = optimize_day(stops, self.travel, start_place, start_minute, end_place)
+        if route == stops:
+            return day_items
+
+        _, _, starts, end_minute = evaluate(route, self.travel, start_place, start_minute, end_place)
+        midnight = datetime.combine(date, datetime.min.time())
+        for stop, minute in zip(route, starts):
+            stop.item['time'] = (midnight + timedelta(minutes=minute)).strftime("%H:%M")
+
+        head = [item for item in day_items if item['type'] == 'accommodation' and item['status'] == 'start']
+        tail = [item for item in day_items if item['type'] == 'accommodation' and item['status'] != 'start']
+        for item in tail:
+            item['time'] = (midnight + timedelta(minutes=end_minute)).strftime("%H:%M")
+        return head + [stop.item for stop in route] + tail
+
+    def _make_item(self, type_name, status_or_time, time_obj, place, stay=None):
         time_str = time_obj.strftime("%H:%M") if hasattr(time_obj, 'strftime') else status_or_time
         
+        # 여행지 정보는 응답의 trips 사전에 한 번만 담고, 항목은 trip_id 로 가리킴 (place 는 응답 전에 제거)
         item = {
             "type": type_name,
             "time": time_str,
-            "data": TripListSerializer(trip, context={'request': request}).data
+            "trip_id": place.id,
+            "place": place
         }
+        if stay:
+            item["stay"] = stay  # 체류 시간(분)
         if type_name == "accommodation":
             item["status"] = status_or_time 
             item["time"] = time_obj.strftime("%H:%M")
@@ -374,38 +400,40 @@ class CourseSaveView(APIView):
         data = request.data
         user = request.user
 
-        course = Course.objects.create(
-            user=user,
-            title=data.get('title', f"{user.username}님의 여행 코스"),
-            region=data.get('region', ''),
-            start_date=data.get('start_date', datetime.today()), # 날짜 형식 주의
-            end_date=data.get('end_date', datetime.today())
-        )
-
-        plans = data.get('plan', [])
-        
-        for day_plan in plans:
+        # 일정 항목(여행지/식당/숙소)의 여행지 id 를 모아 한 번에 검증/저장
+        entries = []
+        for day_plan in data.get('plan', []):
             day = day_plan.get('day')
-            schedule = day_plan.get('schedule', [])
-            
-            for idx, item in enumerate(schedule):
-                # 여행지(spot)나 식당(meal)인 경우에만 저장
+            for idx, item in enumerate(day_plan.get('schedule', [])):
                 if item.get('type') in ['spot', 'meal', 'accommodation']:
-                    trip_data = item.get('data')
-                    if trip_data and 'id' in trip_data:
-                        CourseDetail.objects.create(
-                            course=course,
-                            trip_id=trip_data['id'],
-                            day=day,
-                            order=idx
-                        )
-
-        return Response(CourseSerializer(course).data, status=201)
+                    # 생성 응답의 trip_id 참조와 여행지 정보(data) 둘 다 받음
+                    trip_data = item.get('data') or {}
+                    trip_id = item.get('trip_id', trip_data.get('id'))
+                    if trip_id is None:
+                        continue
+                    # JSON 으로 온 문자열 id("5")도 in_bulk 의 정수 키와 맞도록 변환
+                    try:
+                        entries.append((int(trip_id), day, idx))
+                    except (TypeError, ValueError):
+                        return Response({"message": f"잘못된 여행지 id 입니다: {trip_id}"}, status=400)
+
+        with transaction.atomic():
+            course = Course.objects.create(
+                user=user,
+                title=data.get('title', f"{user.username}님의 여행 코스"),
+                region=data.get('region', ''),
+                start_date=data.get('start_date', datetime.today()), # 날짜 형식 주의
+                end_date=data.get('end_date', datetime.today())
+            )
+            add_details(course, entries)
+
+        course = load_course(course)
+        return Response(CourseSerializer(course, context=trip_list_context(request)).data, status=201)
     
 class MyCourseListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        courses = Course.objects.filter(user=request.user).order_by('-created_at')
-        serializer = CourseSerializer(courses, many=True)
+        courses = with_details(Course.objects.filter(user=request.user)).order_by('-created_at')
+        serializer = CourseSerializer(courses, many=True, context=trip_list_context(request))
         return Response(serializer.data)
\ No newline at end of file
@@ -1,5 +1,10 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class TripsConfig(AppConfig):
     name = "trips"
+
+    def ready(self):
+        from .geo import register_sqlite_functions
+        connection_created.connect(register_sqlite_functions, dispatch_uid='trips.register_sqlite_functions')
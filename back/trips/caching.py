@@ -0,0 +1,99 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from rest_framework.response import Response
+
+# --- 응답 캐시 ---
+# 카탈로그(여행지/지역/카테고리) 기반 응답은 익명 기준으로 직렬화해 캐시하고,
+# 로그인 유저는 캐시된 데이터 위에 is_liked 만 덮어쓴다.
+# 모든 키는 카탈로그 버전을 cache version 으로 쓰므로, Trip 저장이나 import_tourapi 실행 때
+# 버전을 올리면 이전 응답은 읽히지 않고 TTL 로 자연히 정리된다.
+# 버전은 캐시가 아니라 DB 의 한 행(CatalogVersion)에 두어, 캐시가 프로세스별(locmem)이어도
+# 다른 워커나 관리 명령 프로세스에서 올린 버전이 바로 보인다.
+# 캐시 항목에는 저장 시점에 만든 강한 ETag 를 함께 두어, If-None-Match 가 맞으면 직렬화 없이 304 로 응답한다.
+# is_liked 를 덮어쓴 응답은 유저마다 다르므로, 인증이 실리는 헤더(JWT 쿠키 포함)로 Vary 를 건다.
+
+USER_VARY_HEADERS = ('Authorization', 'Cookie')
+
+DEFAULT_TTLS = {
+    'categories': 60 * 60,
+    'regions': 60 * 60,
+    'trip_detail': 60 * 10,
+    'trip_list': 60,  # 좋아요순 정렬이 있어 짧게
+}
+
+
+def ttl(name):
+    return getattr(settings, 'RESPONSE_CACHE_TTLS', {}).get(name, DEFAULT_TTLS[name])
+
+
+def catalog_version():
+    from .models import CatalogVersion
+    version = CatalogVersion.objects.filter(pk=CatalogVersion.SINGLETON_ID).values_list('version', flat=True).first()
+    return version or 1
+
+
+def bump_catalog_version():
+    """카탈로그가 바뀌었음을 알림 - 버전이 붙은 모든 캐시 키가 무효화됨"""
+    from .models import CatalogVersion
+    with transaction.atomic():
+        rows = CatalogVersion.objects.filter(pk=CatalogVersion.SINGLETON_ID)
+        if not rows.update(version=F('version') + 1):
+            # 행이 없으면(지워진 경우) 기본 버전 1 다음부터 시작
+            CatalogVersion.objects.get_or_create(pk=CatalogVersion.SINGLETON_ID, defaults={'version': 2})
+    return catalog_version()
+
+
+def url_key(request):
+    """쿼리스트링(순서 무시)까지 포함한 요청 URL 기준 키"""
+    query = sorted(request.query_params.lists())
+    raw = f"{request.get_host()}{request.path}?{query}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def cached_entry(name, key, build):
+    """name 엔드포인트의 key 응답을 (etag, data) 로 꺼내고, 없으면 build() 로 만들어 저장"""
+    key = f"response:{name}:{key}"
+    version = catalog_version()
+    entry = cache.get(key, version=version)
+    if entry is None:
+        data = build()
+        body = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+        digest = hashlib.sha256(body.encode('utf-8')).hexdigest()[:16]
+        entry = (f'"{name}-v{version}-{digest}"', data)
+        cache.set(key, entry, ttl(name), version=version)
+    return entry
+
+
+def cached_data(name, key, build):
+    return cached_entry(name, key, build)[1]
+
+
+def conditional_response(request, etag, build):
+    """If-None-Match 가 etag 와 같으면 본문 없는 304, 아니면 build() 데이터로 200"""
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = Response(build())
+    response['ETag'] = etag
+    return response
+
+
+def cached_response(request, name, key, build):
+    etag, data = cached_entry(name, key, build)
+    return conditional_response(request, etag, lambda: data)
+
+
+def overlay_liked(items, liked_trip_ids):
+    """캐시된 여행지 목록에 요청 유저의 is_liked 를 덮어씀"""
+    return [{**item, 'is_liked': item['id'] in liked_trip_ids} for item in items]
+
+
+def vary_on_user(response):
+    """요청 유저에 따라 본문/ETag 가 달라지는 응답을 공유 캐시가 섞지 않도록 Vary 지정"""
+    patch_vary_headers(response, USER_VARY_HEADERS)
+    return response
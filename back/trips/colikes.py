@@ -0,0 +1,77 @@
+from collections import Counter
+from django.db import connection, transaction
+from django.db.models import F, Q, Sum
+
+from .models import TripCoLike, Wishlist
+
+# --- 여행지 간 공동 찜(co-like) 테이블 관리 ---
+# (trip, other_trip, count) = 두 여행지를 모두 찜한 유저 수. 찜/찜 취소 시 증분 갱신하고,
+# 전체 재계산은 rebuild() (manage.py rebuild_colikes) 로 수행한다.
+
+REBUILD_SQL = """
+    INSERT INTO trip_co_likes (trip_id, other_trip_id, count)
+    SELECT w1.trip_id, w2.trip_id, COUNT(*)
+    FROM wishlists w1
+    JOIN wishlists w2 ON w1.user_id = w2.user_id AND w1.trip_id <> w2.trip_id
+    GROUP BY w1.trip_id, w2.trip_id
+"""
+
+
+# 유저가 찜한 다른 여행지와의 쌍을 양방향으로 한 문장에서 +1 (동시에 같은 쌍이 생겨도 충돌 시 더하기로 처리)
+LIKE_SQL = """
+    INSERT INTO trip_co_likes (trip_id, other_trip_id, count)
+    SELECT %(trip)s, trip_id, 1 FROM wishlists WHERE user_id = %(user)s AND trip_id <> %(trip)s
+    UNION ALL
+    SELECT trip_id, %(trip)s, 1 FROM wishlists WHERE user_id = %(user)s AND trip_id <> %(trip)s
+    ON CONFLICT(trip_id, other_trip_id) DO UPDATE SET count = count + excluded.count
+"""
+
+
+def _pairs_with_liked(user_id, trip_id):
+    others = Wishlist.objects.filter(user_id=user_id).exclude(trip_id=trip_id).values('trip_id')
+    return TripCoLike.objects.filter(
+        Q(trip_id=trip_id, other_trip_id__in=others) |
+        Q(trip_id__in=others, other_trip_id=trip_id)
+    )
+
+
+def record_like(user_id, trip_id):
+    """찜 추가 직후 호출 - 유저가 이미 찜한 다른 여행지들과의 쌍을 +1"""
+    with connection.cursor() as cursor:
+        cursor.execute(LIKE_SQL, {'trip': trip_id, 'user': user_id})
+
+
+def record_unlike(user_id, trip_id):
+    """찜 취소 직후 호출 - 유저가 찜한 다른 여행지들과의 쌍을 -1"""
+    pairs = _pairs_with_liked(user_id, trip_id)
+    with transaction.atomic():
+        pairs.update(count=F('count') - 1)
+        pairs.filter(count__lte=0).delete()
+
+
+def neighbour_counts(trip_ids):
+    """trip_ids 와 함께 찜된 다른 여행지별 공동 찜 수 합계 (trip_ids 자신은 제외)
+
+    이전 추천 로직은 후보를 찜한 '서로 다른 유저 수'를 셌지만, 여기서는 (내 여행지, 후보) 쌍의
+    공동 찜 수를 더하는 item-item 가중치다. 그래서 내가 찜한 여행지 여러 곳과 함께 찜된 후보일수록
+    점수가 높고, 한 유저가 내 여행지 n 곳과 후보를 모두 찜했다면 그 유저는 n 으로 세어진다.
+    유저 단위로 중복을 없애려면 찜 테이블을 다시 훑어야 하므로, 미리 집계한 쌍 테이블만 읽는 쪽을 택했다.
+    """
+    if not trip_ids:
+        return Counter()
+    rows = (
+        TripCoLike.objects.filter(trip_id__in=trip_ids)
+        .exclude(other_trip_id__in=trip_ids)
+        .values('other_trip_id')
+        .annotate(total=Sum('count'))
+        .values_list('other_trip_id', 'total')
+    )
+    return Counter(dict(rows))
+
+
+def rebuild():
+    with transaction.atomic():
+        TripCoLike.objects.all().delete()
+        with connection.cursor() as cursor:
+            cursor.execute(REBUILD_SQL)
+    return TripCoLike.objects.count()
@@ -0,0 +1,133 @@
+import json
+import re
+import time
+
+# --- Gemini 운영 정보 일괄 가공 ---
+# 여러 여행지의 (이용시간, 휴무일) 을 한 번의 프롬프트로 묶어 보내고
+# 여행지 id 를 키로 하는 JSON 배열로 응답받는다.
+
+DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+SPECIAL_DAYS = ["new_year", "seollal", "chuseok"]
+TIME_RE = re.compile(r'^(\d{1,2}):(\d{2})$')
+
+PROMPT_TEMPLATE = """
+너는 여행지 운영 정보 분석 전문가야.
+아래 [데이터]의 각 항목(id, 이용시간 use_time, 휴무일 rest_date)을 분석해서 가장 정확한 운영 정보를 추출해줘.
+
+[규칙]:
+1. 반드시 JSON 배열로만 응답해. 입력 항목마다 객체 하나씩, "id" 는 입력 값 그대로 사용해.
+2. "open": 시작시간(HH:MM), "close": 종료시간(HH:MM). 알 수 없으면 null.
+3. "closed_days": 휴무 요일 리스트 (Mon, Tue, Wed, Thu, Fri, Sat, Sun). 예: ["Mon"] 또는 ["Sat", "Sun"]
+4. '연중무휴'나 '상시개방'이면 "closed_days": [] 로 해줘.
+5. "special": 명절 휴무가 있으면 리스트로 (new_year, seollal, chuseok), 없으면 [].
+6. 오직 JSON만 출력해.
+
+[데이터]:
+"""
+
+
+class QuotaExceeded(Exception):
+    """모델 API 의 요청 한도 초과 (429 / RESOURCE_EXHAUSTED)"""
+
+
+def is_quota_error(error):
+    code = getattr(error, 'code', None) or getattr(error, 'status_code', None)
+    return code == 429 or 'RESOURCE_EXHAUSTED' in str(error)
+
+
+def build_prompt(trips):
+    items = [{'id': trip.id, 'use_time': trip.use_time or '', 'rest_date': trip.rest_date or ''} for trip in trips]
+    return PROMPT_TEMPLATE + json.dumps(items, ensure_ascii=False)
+
+
+def parse_response(text):
+    """응답 텍스트 -> {trip_id: 결과 dict} (형식이 잘못된 항목은 제외)"""
+    text = text.strip().replace('```json', '').replace('```', '')
+    data = json.loads(text)
+    if isinstance(data, dict):
+        data = data.get('items') or data.get('results') or [data]
+
+    results = {}
+    for entry in data:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            results[int(entry['id'])] = entry
+        except (KeyError, TypeError, ValueError):
+            continue
+    return results
+
+
+def format_time(t_str):
+    """HH:MM 보정 (24:00 등은 23:59), 알 수 없는 값은 None"""
+    match = TIME_RE.match(str(t_str or '').strip())
+    if not match:
+        return None
+    h, m = int(match.group(1)), int(match.group(2))
+    if h >= 24:
+        h, m = 23, 59
+    return f"{h:02d}:{m:02d}"
+
+
+def to_operating_info(result, use_time, rest_date):
+    """AI 결과를 import_tourapi.parse_operating_hours 와 같은 구조로 변환"""
+    open_time = format_time(result.get('open'))
+    close_time = format_time(result.get('close'))
+    closed_days = set(result.get('closed_days') or [])
+    return {
+        "weekly": {
+            day: {
+                "open": open_time, "close": close_time, "break": None, "last_order": None,
+                "is_closed": day in closed_days,
+            }
+            for day in DAYS
+        },
+        "special": [key for key in SPECIAL_DAYS if key in (result.get('special') or [])],
+        "raw": {"use_time": use_time, "rest_date": rest_date},
+        "source": "ai",
+    }
+
+
+class AdaptiveRateLimiter:
+    """AIMD 방식: 성공하면 분당 요청 수를 조금씩 늘리고, 한도 초과면 절반으로 줄인다"""
+
+    def __init__(self, rpm, min_rpm=1, max_rpm=None, step=1, sleep=time.sleep, clock=time.monotonic):
+        self.rpm = float(rpm)
+        self.min_rpm = float(min_rpm)
+        self.max_rpm = float(max_rpm or rpm * 4)
+        self.step = step
+        self.sleep = sleep
+        self.clock = clock
+        self.last = None
+
+    @property
+    def interval(self):
+        return 60.0 / self.rpm
+
+    def wait(self):
+        if self.last is not None:
+            remaining = self.last + self.interval - self.clock()
+            if remaining > 0:
+                self.sleep(remaining)
+        self.last = self.clock()
+
+    def success(self):
+        self.rpm = min(self.max_rpm, self.rpm + self.step)
+
+    def throttled(self):
+        self.rpm = max(self.min_rpm, self.rpm / 2)
+
+
+def enrich_batch(client, model_name, trips):
+    """한 묶음을 모델에 보내 {trip_id: 결과} 반환 (한도 초과는 QuotaExceeded)"""
+    try:
+        response = client.models.generate_content(
+            model=model_name,
+            contents=build_prompt(trips),
+            config={'response_mime_type': 'application/json'},
+        )
+    except Exception as e:
+        if is_quota_error(e):
+            raise QuotaExceeded(str(e)) from e
+        raise
+    return parse_response(response.text)
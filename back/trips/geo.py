@@ -0,0 +1,167 @@
+import math
+
+import numpy as np
+from django.db.models import F, FloatField, Func, Q, Value
+
+# --- 위치 기반 조회용 격자(Grid) 인덱스 ---
+# 위/경도를 GRID_CELL_DEG 크기의 고정 셀로 나누고, 셀 번호를 Trip.geo_cell 에 저장한다.
+# 셀 번호는 (행 * GRID_COLS + 열) 이므로 같은 행의 셀들은 연속된 정수 구간이 된다.
+#
+# --- 거리 계산 ---
+# 모든 거리는 대권(haversine) 거리 km 로 통일한다.
+# 배열 계산은 NumPy(일대다/다대다), DB 쪽은 SQLite 에 등록한 HAVERSINE_KM 함수(HaversineKm 표현식)로 한다.
+
+EARTH_RADIUS_KM = 6371.0088
+GRID_CELL_DEG = 0.05  # 위도 약 5.5km, 경도(한국 기준) 약 4.4km
+GRID_COLS = int(round(360 / GRID_CELL_DEG))
+
+NEARBY_START_RADIUS_KM = 3
+NEARBY_MAX_RADIUS_KM = 1000  # 한반도 전체를 덮는 반경
+
+
+def has_location(lat, lon):
+    """TourAPI 데이터는 좌표가 없으면 0.0 으로 저장되므로 이를 '위치 없음'으로 취급"""
+    return bool(lat) and bool(lon)
+
+
+def grid_cell(lat, lon):
+    if not has_location(lat, lon):
+        return None
+    row = int(math.floor((float(lat) + 90.0) / GRID_CELL_DEG))
+    col = int(math.floor((float(lon) + 180.0) / GRID_CELL_DEG))
+    return row * GRID_COLS + col
+
+
+def bounding_box(lat, lon, radius_km):
+    """중심점 기준 반경 radius_km 를 덮는 (min_lat, max_lat, min_lon, max_lon)"""
+    d_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = max(math.cos(math.radians(lat)), 0.01)
+    d_lon = math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat))
+    return lat - d_lat, lat + d_lat, lon - d_lon, lon + d_lon
+
+
+def grid_cell_ranges(min_lat, max_lat, min_lon, max_lon):
+    """bbox 와 겹치는 셀들을 행 단위 (시작 셀, 끝 셀) 구간 목록으로 반환"""
+    row_start = int(math.floor((min_lat + 90.0) / GRID_CELL_DEG))
+    row_end = int(math.floor((max_lat + 90.0) / GRID_CELL_DEG))
+    col_start = int(math.floor((min_lon + 180.0) / GRID_CELL_DEG))
+    col_end = int(math.floor((max_lon + 180.0) / GRID_CELL_DEG))
+    return [
+        (row * GRID_COLS + col_start, row * GRID_COLS + col_end)
+        for row in range(row_start, row_end + 1)
+    ]
+
+
+def within_radius_q(lat, lon, radius_km):
+    """후보 셀 + bbox 로 1차 필터링하는 Q 객체 (정확한 거리 판정은 haversine 으로 따로)"""
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+
+    cells = Q()
+    for start, end in grid_cell_ranges(min_lat, max_lat, min_lon, max_lon):
+        cells |= Q(geo_cell__range=(start, end))
+
+    return cells & Q(mapy__range=(min_lat, max_lat), mapx__range=(min_lon, max_lon))
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """두 좌표 사이의 대권(great-circle) 거리 (km)"""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    d_lat = p2 - p1
+    d_lon = math.radians(lon2 - lon1)
+    a = math.sin(d_lat / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(d_lon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def haversine_rad(lat1, lon1, lat2, lon2):
+    """radian 좌표 배열 간 대권 거리 km (NumPy 브로드캐스팅)"""
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def distances_km(lat, lon, lats, lons):
+    """한 지점에서 여러 지점까지의 거리 배열 (일대다, 도 단위 입력)"""
+    lats, lons = np.radians(np.asarray(lats, dtype=np.float64)), np.radians(np.asarray(lons, dtype=np.float64))
+    return haversine_rad(math.radians(lat), math.radians(lon), lats, lons)
+
+
+def distance_matrix_km(lats1, lons1, lats2, lons2):
+    """distances[i, j] = (lats1[i], lons1[i]) ~ (lats2[j], lons2[j]) 거리 (다대다, 도 단위 입력)"""
+    lats1, lons1 = np.radians(np.asarray(lats1, dtype=np.float64)), np.radians(np.asarray(lons1, dtype=np.float64))
+    lats2, lons2 = np.radians(np.asarray(lats2, dtype=np.float64)), np.radians(np.asarray(lons2, dtype=np.float64))
+    return haversine_rad(lats1[:, None], lons1[:, None], lats2[None, :], lons2[None, :])
+
+
+def _sqlite_haversine_km(lat1, lon1, lat2, lon2):
+    if None in (lat1, lon1, lat2, lon2):
+        return None
+    return haversine_km(lat1, lon1, lat2, lon2)
+
+
+def register_sqlite_functions(sender, connection, **kwargs):
+    """connection_created 시그널 - SQLite 연결마다 HAVERSINE_KM(lat1, lon1, lat2, lon2) 등록"""
+    if connection.vendor == 'sqlite':
+        connection.connection.create_function('HAVERSINE_KM', 4, _sqlite_haversine_km, deterministic=True)
+
+
+class HaversineKm(Func):
+    """(lat, lon) 에서 Trip 좌표(mapy, mapx)까지의 거리(km) 표현식 - annotate/filter/order_by 용"""
+    function = 'HAVERSINE_KM'
+    output_field = FloatField()
+
+    def __init__(self, lat, lon, lat_field='mapy', lon_field='mapx', **extra):
+        super().__init__(F(lat_field), F(lon_field), Value(float(lat)), Value(float(lon)), **extra)
+
+
+def nearest_trips(queryset, lat, lon, limit):
+    """
+    queryset 중 (lat, lon) 에서 가까운 순으로 limit 개를 반환.
+    반경을 두 배씩 넓혀가며 후보 셀만 조회하고, 각 Trip 에 distance(km) 속성을 붙여준다.
+    """
+    radius = NEARBY_START_RADIUS_KM
+    queryset = queryset.annotate(distance=HaversineKm(lat, lon))
+    while True:
+        # 후보 셀 안에서 반경 판정과 거리순 정렬까지 DB 에서 한 번에
+        inside = list(
+            queryset.filter(within_radius_q(lat, lon, radius), distance__lte=radius)
+            .order_by('distance', 'id')
+            .values_list('distance', 'id')[:limit]
+        )
+        if len(inside) >= limit or radius >= NEARBY_MAX_RADIUS_KM:
+            break
+        radius *= 2
+
+    winners = inside[:limit]
+    trips = queryset.in_bulk([pk for _, pk in winners])
+
+    result = []
+    for dist, pk in winners:
+        trip = trips.get(pk)
+        if trip is None:
+            continue
+        trip.distance = round(dist, 3)
+        result.append(trip)
+    return result
+
+
+class DistanceOrderedTrips:
+    """
+    거리순 목록을 페이지네이션하기 위한 지연 시퀀스.
+    Paginator 가 요청한 페이지 끝까지만 nearest_trips 로 조회한다.
+    """
+
+    def __init__(self, queryset, lat, lon):
+        self.queryset = queryset.exclude(geo_cell__isnull=True)
+        self.lat = lat
+        self.lon = lon
+
+    def count(self):
+        return self.queryset.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            stop = index.stop if index.stop is not None else self.count()
+            return nearest_trips(self.queryset, self.lat, self.lon, stop)[index]
+        return nearest_trips(self.queryset, self.lat, self.lon, index + 1)[index]
@@ -1,14 +1,21 @@
-import time
-import json
 from google import genai
 from django.core.management.base import BaseCommand
-from django.db import models
+from django.db import models, transaction
 from trips.models import Trip
+from trips.enrichment import AdaptiveRateLimiter, QuotaExceeded, enrich_batch, to_operating_info
+from trips.operating_hours import OperatingHoursLookup, hours_key
 from decouple import config
 
+UPDATE_FIELDS = ['operating_info', 'open_time', 'close_time']
+
 class Command(BaseCommand):
     help = 'Enrich trip data with Gemini AI (Extracting precise business hours & Holidays)'
 
+    # python manage.py enrich_with_ai --limit=1000 --batch-size=40 --rpm=5
+
+    # 테스트에서는 가짜 모델 클라이언트를 넣어 실행 (None 이면 Gemini 클라이언트 생성)
+    client = None
+
     def add_arguments(self, parser):
         parser.add_argument(
             '--limit',
@@ -16,100 +23,147 @@ class Command(BaseCommand):
             default=10,
             help='Number of items to process',
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=40,
+            help='Number of items packed into one prompt',
+        )
+        parser.add_argument(
+            '--rpm',
+            type=float,
+            default=5,
+            help='Initial requests per minute (adapts to the quota while running)',
+        )
+        parser.add_argument(
+            '--model',
+            type=str,
+            default='gemini-flash-latest',
+            help='Gemini model name',
+        )
+        parser.add_argument(
+            '--list-models',
+            action='store_true',
+            help='Print the models available to the API key before processing',
+        )
+        parser.add_argument(
+            '--max-retries',
+            type=int,
+            default=5,
+            help='Retries per batch when the quota is exceeded',
+        )
 
-    def format_time(self, t_str):
-        """24:00 등의 잘못된 시간 형식을 23:59로 보정"""
-        if not t_str: return "00:00"
-        if t_str.startswith("24:"): return "23:59"
-        return t_str
+    def create_client(self):
+        api_key = config('GEMINI_API_KEY', default='')
+        if not api_key:
+            return None
+        return genai.Client(api_key=api_key)
 
     def handle(self, *args, **options):
         # 1. Gemini 설정
-        api_key = config('GEMINI_API_KEY')
-        if not api_key:
+        client = self.client or self.create_client()
+        if client is None:
             self.stdout.write(self.style.ERROR('GEMINI_API_KEY NOT FOUND in .env'))
             return
 
-        client = genai.Client(api_key=api_key)
-        
         # [진단] 사용 가능한 모델 목록 출력
-        self.stdout.write("--- 사용 가능한 모델 목록 ---")
-        try:
-            for m in client.models.list():
-                self.stdout.write(f" - {m.name}")
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f"모델 목록을 가져오는 데 실패했습니다: {e}"))
-
-        # 목록에 명백히 존재하는 가장 안정적인 모델 명칭 사용
-        model_name = "gemini-flash-latest" 
-
-        # 2. 가공 대상 선정 (영업시간이 없거나, 휴무일 정보가 아직 분석되지 않은 데이터)
-        # 모든 휴무일 필드가 False인 것을 '아직 분석 안 됨'의 기준으로 삼습니다.
-        target_trips = Trip.objects.filter(
-            use_time__isnull=False
-        ).filter(
-            models.Q(open_time__isnull=True) | 
-            models.Q(is_closed_mon=False, is_closed_tue=False, is_closed_wed=False, 
-                     is_closed_thu=False, is_closed_fri=False, is_closed_sat=False, is_closed_sun=False)
-        ).exclude(use_time='')[:options['limit']]
-
-        if not target_trips.exists():
+        if options['list_models']:
+            self.stdout.write("--- 사용 가능한 모델 목록 ---")
+            try:
+                for m in client.models.list():
+                    self.stdout.write(f" - {m.name}")
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f"모델 목록을 가져오는 데 실패했습니다: {e}"))
+
+        model_name = options['model']
+
+        # 2. 가공 대상 선정 (이용시간이 있고 아직 AI 로 분석하지 않은 데이터)
+        target_trips = list(
+            Trip.objects.exclude(use_time__isnull=True).exclude(use_time='')
+            .filter(models.Q(operating_info__source__isnull=True) | ~models.Q(operating_info__source='ai'))
+            .only('id', 'title', 'use_time', 'rest_date')
+            .order_by('id')[:options['limit']]
+        )
+
+        if not target_trips:
             self.stdout.write(self.style.SUCCESS('가공할 데이터가 없습니다.'))
             return
 
-        self.stdout.write(self.style.WARNING(f'🚀 {target_trips.count()}개의 데이터를 AI로 가공하기 시작합니다...'))
+        batch_size = max(1, options['batch_size'])
+        limiter = AdaptiveRateLimiter(options['rpm'])
+        hours = OperatingHoursLookup()
+        hours.prefetch((trip.use_time, trip.rest_date) for trip in target_trips)
 
+        # 3. 같은 문자열을 AI 로 분석한 결과가 캐시에 있으면 바로 반영, 나머지는 문자열별 대표 하나만 요청
+        cached = []
+        groups = {}
         for trip in target_trips:
-            self.stdout.write(f'--- [{trip.title}] 분석 중 ---')
-            
-            prompt = f"""
-            너는 여행지 운영 정보 분석 전문가야. 
-            아래 [이용시간]과 [휴무일] 정보를 분석해서 가장 정확한 운영 정보를 추출해줘.
-            
-            [이용시간]: {trip.use_time}
-            [휴무일]: {trip.rest_date}
-            
-            [규칙]:
-            1. 반드시 JSON 형식으로만 응답해.
-            2. "open": 시작시간(HH:MM), "close": 종료시간(HH:MM).
-            3. "closed_days": 휴무 요일을 리스트 형태로 포함해. (Mon, Tue, Wed, Thu, Fri, Sat, Sun) 
-               예: ["Mon"] 또는 ["Sat", "Sun"]
-            4. '연중무휴'나 '상시개방'이면 "closed_days": [] 로 해줘.
-            5. 오직 JSON만 출력해.
-            """
+            info = hours.get(trip.use_time, trip.rest_date, source='ai')
+            if info is not None:
+                self.apply(trip, info)
+                cached.append(trip)
+            else:
+                groups.setdefault(hours_key(trip.use_time, trip.rest_date), []).append(trip)
+        Trip.objects.bulk_update(cached, UPDATE_FIELDS)
+        updated = len(cached)
 
-            try:
-                response = client.models.generate_content(
-                    model=model_name,
-                    contents=prompt
-                )
-                
-                # JSON 문자열 추출 (new SDK에서는 response.text 사용)
-                json_str = response.text.strip().replace('```json', '').replace('```', '')
-                data = json.loads(json_str)
-
-                # 데이터 업데이트
-                trip.open_time = self.format_time(data.get('open'))
-                trip.close_time = self.format_time(data.get('close'))
-                
-                # 휴무일 필드 초기화 후 업데이트
-                closed_days = data.get('closed_days', [])
-                trip.is_closed_mon = "Mon" in closed_days
-                trip.is_closed_tue = "Tue" in closed_days
-                trip.is_closed_wed = "Wed" in closed_days
-                trip.is_closed_thu = "Thu" in closed_days
-                trip.is_closed_fri = "Fri" in closed_days
-                trip.is_closed_sat = "Sat" in closed_days
-                trip.is_closed_sun = "Sun" in closed_days
-                
-                trip.save()
-
-                self.stdout.write(self.style.SUCCESS(f"  ✅ 업데이트 완료: {data.get('open')}~{data.get('close')} / 휴무: {closed_days}"))
-                
-                # 무료 티어 한도(분당 5회)를 지키기 위해 15초 대기
-                time.sleep(15)
+        representatives = [group[0] for group in groups.values()]
+        self.stdout.write(self.style.WARNING(
+            f'🚀 {len(target_trips)}개 중 캐시 적용 {len(cached)}개, '
+            f'고유 문자열 {len(representatives)}개를 AI로 가공하기 시작합니다... (묶음당 {batch_size}개)'
+        ))
 
+        for start in range(0, len(representatives), batch_size):
+            batch = representatives[start:start + batch_size]
+            self.stdout.write(f'--- [{start + 1}~{start + len(batch)}] 분석 중 ---')
+
+            results = self.request_batch(client, model_name, batch, limiter, options['max_retries'])
+            if results is None:
+                continue
+
+            # 4. 응답에 포함된 문자열을 쓰는 여행지 전체를 한 번에 업데이트
+            changed = []
+            for representative in batch:
+                result = results.get(representative.id)
+                if result is None:
+                    continue
+                info = to_operating_info(result, representative.use_time, representative.rest_date)
+                hours.put(representative.use_time, representative.rest_date, info, 'ai')
+                for trip in groups[hours_key(representative.use_time, representative.rest_date)]:
+                    self.apply(trip, {**info, "raw": {"use_time": trip.use_time, "rest_date": trip.rest_date}})
+                    changed.append(trip)
+
+            with transaction.atomic():
+                Trip.objects.bulk_update(changed, UPDATE_FIELDS)
+                hours.flush()
+            updated += len(changed)
+            missing = len(batch) - len({hours_key(t.use_time, t.rest_date) for t in changed})
+            self.stdout.write(self.style.SUCCESS(f"  ✅ 업데이트 완료: {len(changed)}개" + (f" (응답 누락 {missing}개)" if missing else "")))
+
+        self.stdout.write(self.style.SUCCESS(f'\n✨ 모든 AI 가공 작업이 완료되었습니다! ({updated}개)'))
+
+    def apply(self, trip, info):
+        trip.operating_info = info
+        first_day_info = next(iter(info['weekly'].values()), {})
+        trip.open_time = first_day_info.get('open')
+        trip.close_time = first_day_info.get('close')
+
+    def request_batch(self, client, model_name, batch, limiter, max_retries):
+        """한도 초과 시 속도를 줄여 재시도, 그 외 에러는 해당 묶음만 건너뜀"""
+        attempts = max_retries + 1  # 첫 요청 + 재시도
+        for attempt in range(attempts):
+            limiter.wait()
+            try:
+                results = enrich_batch(client, model_name, batch)
+            except QuotaExceeded:
+                limiter.throttled()
+                self.stdout.write(self.style.WARNING(f"  ⚠️ 요청 한도 초과. 분당 {limiter.rpm:.1f}회로 낮춰 재시도 ({attempt + 1}/{attempts})"))
+                continue
             except Exception as e:
-                self.stdout.write(self.style.ERROR(f"  ❌ 에러 발생 ({trip.title}): {str(e)}"))
+                self.stdout.write(self.style.ERROR(f"  ❌ 에러 발생: {str(e)}"))
+                return None
+            limiter.success()
+            return results
 
-        self.stdout.write(self.style.SUCCESS('\n✨ 모든 AI 가공 작업이 완료되었습니다!'))
+        self.stdout.write(self.style.ERROR("  ❌ 재시도 횟수를 초과하여 이 묶음을 건너뜁니다."))
+        return None
@@ -0,0 +1,150 @@
+import re
+from datetime import date, timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+from planner.pools import clear_city_pools
+from trips.models import Trip, Wishlist
+from users.models import User
+
+# 행 수가 적은 코드 테이블은 전체 스캔을 허용
+SMALL_TABLES = {'regions', 'cities', 'categories', 'tags'}
+
+SCAN_RE = re.compile(r'^SCAN (\w+)(.*)$')
+
+# 응답/샘플 캐시가 데워져 있으면 SQL 이 실행되지 않아 검사할 것이 없으므로 캐시 없이 재생
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+# (이름, 메서드, 경로, 본문) - 경로/본문의 {…} 는 DB 에서 고른 샘플 값으로 채움
+ENDPOINTS = [
+    ('trip list', 'get', '/api/trips/?page_size=20', None),
+    ('trip list by category', 'get', '/api/trips/?category={category_id}', None),
+    ('trip list by score', 'get', '/api/trips/?ordering=-recommendation_score', None),
+    ('trip list by newest', 'get', '/api/trips/?ordering=-created_at', None),
+    ('trip list search', 'get', '/api/trips/?search={keyword}', None),
+    ('trip list by distance', 'get', '/api/trips/?ordering=distance&lat={lat}&lon={lon}', None),
+    ('trip detail', 'get', '/api/trips/{trip_id}/', None),
+    ('my wishlist', 'get', '/api/trips/my/wishlist/', None),
+    ('random trips', 'get', '/api/trips/random/?category={category_id}', None),
+    ('banner random', 'get', '/api/trips/banner-random/', None),
+    ('nearby trips', 'get', '/api/trips/recommend/nearby/?lat={lat}&lon={lon}', None),
+    ('recommend by category', 'get', '/api/trips/recommend/category/?category={category_id}', None),
+    ('recommend liked', 'get', '/api/trips/recommend/liked/', None),
+    ('recommend by ai', 'get', '/api/trips/recommend/ai/?city_id={city_id}', None),
+    ('my courses (trips)', 'get', '/api/trips/courses/', None),
+    ('my courses (planner)', 'get', '/api/planner/courses/', None),
+    ('planner generate', 'post', '/api/planner/generate/', {
+        'start_date': '{start_date}', 'end_date': '{end_date}', 'num_people': 2,
+        'region_id': '{region_id}', 'city_id': '{city_id}',
+        'current_mapx': '{lon}', 'current_mapy': '{lat}',
+    }),
+]
+
+class Command(BaseCommand):
+    help = 'Run EXPLAIN QUERY PLAN on the SQL issued by each read endpoint and fail on full table scans'
+
+    # python manage.py explain_queries [--user=username] [--strict] [-v 2]
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=str,
+            default=None,
+            help='Username to authenticate as (defaults to a user with wishlists)',
+        )
+        parser.add_argument(
+            '--strict',
+            action='store_true',
+            help='Also fail when a query needs a temporary B-tree for ORDER BY / GROUP BY',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stdout.write(self.style.WARNING('EXPLAIN QUERY PLAN 검사는 SQLite 에서만 지원합니다.'))
+            return
+
+        user = self.get_user(options['user'])
+        samples = self.sample_values()
+        verbose = options['verbosity'] >= 2
+
+        client = APIClient()
+        client.force_authenticate(user)
+        host = next((h for h in settings.ALLOWED_HOSTS if h not in ('*',) and not h.startswith('.')), 'localhost')
+
+        failures = []
+        clear_city_pools()  # 플래너 시군구 후보군도 프로세스 안에 캐시됨
+        with override_settings(CACHES=NO_CACHE):
+            for name, method, path, body in ENDPOINTS:
+                path = path.format(**samples)
+                if body is not None:
+                    body = {key: value.format(**samples) if isinstance(value, str) else value for key, value in body.items()}
+
+                with CaptureQueriesContext(connection) as ctx:
+                    response = getattr(client, method)(path, body, format='json', SERVER_NAME=host)
+
+                scans, sorts = [], []
+                for query in ctx.captured_queries:
+                    plan = self.explain(query['sql'])
+                    if verbose:
+                        self.stdout.write(f"    {query['sql'][:200]}")
+                        for detail in plan:
+                            self.stdout.write(f"      {detail}")
+                    scans += [(query['sql'], detail) for detail in plan if self.is_full_scan(detail)]
+                    sorts += [(query['sql'], detail) for detail in plan if detail.startswith('USE TEMP B-TREE')]
+
+                label = f'{name} [{response.status_code}] {len(ctx.captured_queries)} queries'
+                if scans or (options['strict'] and sorts):
+                    self.stdout.write(self.style.ERROR(f'❌ {label}'))
+                    failures.append(name)
+                elif sorts:
+                    self.stdout.write(self.style.WARNING(f'⚠️ {label}'))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'✅ {label}'))
+                for sql, detail in scans + sorts:
+                    self.stdout.write(f'    {detail}\n      {sql[:300]}')
+
+        if failures:
+            raise CommandError(f'Full table scan{" or sort" if options["strict"] else ""} in {len(failures)} endpoint(s): {", ".join(failures)}')
+        self.stdout.write(self.style.SUCCESS(f'✨ {len(ENDPOINTS)}개 엔드포인트 모두 인덱스를 사용합니다.'))
+
+    def explain(self, sql):
+        # CaptureQueriesContext 의 SQL 은 파라미터가 채워진 문자열
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+
+    def is_full_scan(self, detail):
+        """SCAN <테이블> (인덱스 없이 테이블 전체를 읽는 경우만)"""
+        match = SCAN_RE.match(detail)
+        if not match:
+            return False
+        table, rest = match.groups()
+        if table in SMALL_TABLES or 'USING' in rest or 'VIRTUAL TABLE' in rest:
+            return False
+        return table in connection.introspection.table_names()
+
+    def get_user(self, username):
+        if username:
+            try:
+                return User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f'User "{username}" does not exist')
+        wishlist = Wishlist.objects.order_by('user_id').first()
+        return wishlist.user if wishlist else User.objects.order_by('id').first() or User(id=0, username='anonymous')
+
+    def sample_values(self):
+        trip = Trip.objects.filter(status='active').exclude(city__isnull=True).order_by('id').first()
+        today = date.today()
+        return {
+            'trip_id': trip.id if trip else 1,
+            'category_id': (trip.category_id if trip else None) or 1,
+            'region_id': (trip.region_id if trip else None) or 1,
+            'city_id': (trip.city_id if trip else None) or 1,
+            'lat': (trip.mapy if trip else None) or 37.5665,
+            'lon': (trip.mapx if trip else None) or 126.9780,
+            'keyword': (trip.title[:2] if trip else None) or '서울',
+            'start_date': today.isoformat(),
+            'end_date': (today + timedelta(days=1)).isoformat(),
+        }
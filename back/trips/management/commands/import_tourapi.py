@@ -1,11 +1,29 @@
-import requests
-import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from urllib.parse import unquote
 from django.core.management.base import BaseCommand
-from trips.models import Trip, TripImage, Region, City, Category, Tag, TripTag
+from django.db import transaction
+from trips.models import Trip, TripImage, Region, City, Category, Tag, TripTag, ImportCheckpoint
+from trips.geo import grid_cell
+from trips import search
+from trips.operating_hours import OperatingHoursLookup
+from trips.caching import bump_catalog_version
+from trips.tourapi import TourAPIClient, DEFAULT_BASE_URL
 from decouple import config
 from datetime import datetime
 
+PAGE_SIZE = 100
+
+# 상세 API 를 호출하지 않았을 때 기존 값을 유지해야 하는 필드
+OPTIONAL_FIELDS = ('overview', 'tel', 'homepage', 'parking', 'rest_date', 'use_time', 'open_time', 'close_time')
+
+# 일괄 upsert 시 갱신하는 필드 (created_at / 좋아요 / 조회수 등은 유지)
+TRIP_UPSERT_FIELDS = [
+    'title', 'description', 'destination', 'region', 'city', 'category', 'thumbnail_image',
+    'price', 'duration', 'status', 'recommendation_score', 'start_date', 'end_date',
+    'mapx', 'mapy', 'geo_cell', 'average_duration', 'operating_info', 'detail_meta',
+    'updated_at', *OPTIONAL_FIELDS,
+]
+
 class Command(BaseCommand):
     help = 'Import and enrich data from TourAPI (South Korea)'
 
@@ -17,6 +35,9 @@ class Command(BaseCommand):
     def _prefetch_caches(self):
         """DB에 이미 저장된 지역, 시도, 카테고리를 메모리로 미리 로드"""
         from trips.models import Region, City, Category
+
+        # 실행마다 새로 채움 (클래스 변수를 그대로 쓰면 이전 실행의 객체가 남음)
+        self._region_cache, self._city_cache, self._category_cache = {}, {}, {}
         
         # 1. 지역 캐시 (slug 기준)
         for r in Region.objects.all():
@@ -35,6 +56,9 @@ class Command(BaseCommand):
         ))
 
     # python manage.py import_tourapi --area-code=2 --full
+    # python manage.py import_tourapi --workers=16 --rate=20 --base-url=http://127.0.0.1:8080
+    # python manage.py import_tourapi --incremental          (지난 실행 이후 수정된 항목만)
+    # python manage.py import_tourapi --incremental --resume (중단된 실행 이어받기)
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -48,99 +72,94 @@ class Command(BaseCommand):
             action='store_true',
             help='Fetch detailed info (overview, tel, etc.) via additional API calls',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Number of concurrent API requests',
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=10,
+            help='Max API requests per second across all workers',
+        )
+        parser.add_argument(
+            '--base-url',
+            type=str,
+            default=None,
+            help='TourAPI base URL (e.g. a local stub server for testing)',
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only fetch items modified since the last completed run (per area/content type)',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue an interrupted run from the last saved page, skipping finished jobs',
+        )
 
     # 공통 정보 (개요, 홈페이지, 전화번호)
-    def get_detail_common(self, content_id, api_key):
-        url = "https://apis.data.go.kr/B551011/KorService2/detailCommon2"
-        params = {
-            "serviceKey": api_key,
-            "MobileOS": "ETC",
-            "MobileApp": "TMT",
-            "_type": "json",
-            "contentId": content_id,
-        }
-        try:
-            res = requests.get(url, params=params).json()
-            items = res.get("response", {}).get("body", {}).get("items", {})
-            
-            if not items: return {}
-            
-            item = items.get("item")
-            data = {}
-            
-            if isinstance(item, list) and len(item) > 0:
-                data = item[0]
-            elif isinstance(item, dict):
-                data = item
-                
-            return data 
-            
-        except:
+    def get_detail_common(self, content_id):
+        return self.client.get_item('/detailCommon2', {'contentId': content_id})
+
+    def get_detail_intro(self, content_id, content_type_id):
+        data = self.client.get_item('/detailIntro2', {
+            'contentId': content_id,
+            'contentTypeId': content_type_id,
+        })
+        if not data:
             return {}
 
-    def get_detail_intro(self, content_id, content_type_id, api_key):
-        url = "https://apis.data.go.kr/B551011/KorService2/detailIntro2"
-        params = {
-            "serviceKey": api_key,
-            "MobileOS": "ETC",
-            "MobileApp": "TMT",
-            "_type": "json",
-            "contentId": content_id,
-            "contentTypeId": content_type_id
-        }
+        # 전화번호 및 필드 통합 파싱
+        infocenter = (
+            data.get('infocenter') or data.get('infocenterfood') or 
+            data.get('infocenterlodging') or data.get('infocentershopping') or
+            data.get('infocenterculture') or data.get('infocenterleports') or ''
+        )
+
+        parking = (
+            data.get('parking') or data.get('parkingfood') or 
+            data.get('parkinglodging') or data.get('parkingshopping') or 
+            data.get('parkingculture') or data.get('parkingleports') or ''
+        )
         
-        try:
-            res = requests.get(url, params=params).json()
-            items = res.get("response", {}).get("body", {}).get("items", {})
-            
-            if not items: return {}
-
-            item = items.get("item")
-            data = {}
-            if isinstance(item, list) and len(item) > 0:
-                data = item[0]
-            elif isinstance(item, dict):
-                data = item
-            
-            # 전화번호 및 필드 통합 파싱
-            infocenter = (
-                data.get('infocenter') or data.get('infocenterfood') or 
-                data.get('infocenterlodging') or data.get('infocentershopping') or
-                data.get('infocenterculture') or data.get('infocenterleports') or ''
-            )
+        rest_date = (
+            data.get('restdate') or data.get('restdatefood') or 
+            data.get('restdateshopping') or data.get('restdateculture') or 
+            data.get('restdateleports') or ''
+        )
+        
+        use_time = (
+            data.get('usetime') or data.get('opentimefood') or 
+            data.get('opentime') or data.get('usetimeculture') or 
+            data.get('usetimeleports') or ''
+        )
+        
+        return {
+            'infocenter': infocenter,
+            'parking': parking,
+            'rest_date': rest_date,
+            'use_time': use_time,
+            # 추가 정보 (detail_meta용)
+            'first_menu': data.get('firstmenu') or data.get('treatmenu'),
+            'checkin': data.get('checkintime'),
+            'checkout': data.get('checkouttime'),
+            'stroller': data.get('chkbabycarriage') or data.get('chkbabycarriageculture') or data.get('chkbabycarriageshopping'),
+            'pet': data.get('chkpet') or data.get('chkpetculture') or data.get('chkpetleports') or data.get('chkpetshopping'),
+        }
 
-            parking = (
-                data.get('parking') or data.get('parkingfood') or 
-                data.get('parkinglodging') or data.get('parkingshopping') or 
-                data.get('parkingculture') or data.get('parkingleports') or ''
-            )
-            
-            rest_date = (
-                data.get('restdate') or data.get('restdatefood') or 
-                data.get('restdateshopping') or data.get('restdateculture') or 
-                data.get('restdateleports') or ''
-            )
-            
-            use_time = (
-                data.get('usetime') or data.get('opentimefood') or 
-                data.get('opentime') or data.get('usetimeculture') or 
-                data.get('usetimeleports') or ''
-            )
-            
-            return {
-                'infocenter': infocenter,
-                'parking': parking,
-                'rest_date': rest_date,
-                'use_time': use_time,
-                # 추가 정보 (detail_meta용)
-                'first_menu': data.get('firstmenu') or data.get('treatmenu'),
-                'checkin': data.get('checkintime'),
-                'checkout': data.get('checkouttime'),
-                'stroller': data.get('chkbabycarriage') or data.get('chkbabycarriageculture') or data.get('chkbabycarriageshopping'),
-                'pet': data.get('chkpet') or data.get('chkpetculture') or data.get('chkpetleports') or data.get('chkpetshopping'),
-            }
-        except:
-            return {}
+    def fetch_details(self, item):
+        """(공통 정보, 소개 정보) - 워커 스레드에서 실행"""
+        content_id = item.get('contentid')
+        content_type_id = item.get('contenttypeid', '12')
+        return self.get_detail_common(content_id), self.get_detail_intro(content_id, content_type_id)
+
+    def fetch_page(self, endpoint, params, page):
+        """목록 한 페이지 조회 - 워커 스레드에서 실행"""
+        return self.client.get_items(endpoint, {**params, 'numOfRows': PAGE_SIZE, 'pageNo': page})
         
     def handle(self, *args, **options):
         # 수집 시작 전 캐시 워밍업
@@ -148,11 +167,20 @@ class Command(BaseCommand):
 
         raw_key = config('TOUR_API_KEY')
         API_KEY = unquote(raw_key)
-        BASE_URL = 'https://apis.data.go.kr/B551011/KorService2'
+        BASE_URL = options.get('base_url') or config('TOUR_API_BASE_URL', default=DEFAULT_BASE_URL)
+        workers = max(1, options.get('workers') or 1)
         
         full_mode = options.get('full', False)
+        incremental = options.get('incremental', False)
+        resume = options.get('resume', False)
         today_str = datetime.now().strftime('%Y%m%d')
 
+        self.hours = OperatingHoursLookup()
+        self.client = TourAPIClient(
+            API_KEY, base_url=BASE_URL, rate=options.get('rate'), pool_size=workers,
+            log=lambda message: self.stdout.write(self.style.WARNING(message)),
+        )
+
         ALL_REGIONS = {
             '1': '서울', '2': '인천', '3': '대전', '4': '대구', '5': '광주', 
             '6': '부산', '7': '울산', '8': '세종', '31': '경기', '32': '강원', 
@@ -171,109 +199,228 @@ class Command(BaseCommand):
             '28': '레포츠', '32': '숙박', '38': '쇼핑', '39': '음식점'
         }
 
-        self.stdout.write(self.style.SUCCESS(f'Target Regions: {list(target_regions.values())}'))
+        self.stdout.write(self.style.SUCCESS(f'Target Regions: {list(target_regions.values())} (workers={workers}, rate={options.get("rate")}/s)'))
+
+        # 증분 수집은 수정일순(C)으로 받아 워터마크 이전 항목이 나오면 중단
+        arrange = 'C' if incremental else 'A'
+        checkpoints = {
+            (c.area_code, c.content_type_id): c
+            for c in ImportCheckpoint.objects.filter(area_code__in=list(target_regions))
+        }
 
+        # (지역, 콘텐츠 타입) 조합마다 독립적으로 페이지를 넘기며 수집
+        jobs = []
         for area_code, area_name in target_regions.items():
-            self.stdout.write(self.style.WARNING(f'\n\n🚀 Starting Region: {area_name} (Code: {area_code})'))
-            
             for c_id, c_name in content_types.items():
-                self.stdout.write(f'\n  Category: {c_name} (Code: {c_id})')
-                
-                page = 1
-                total_imported_in_category = 0
+                checkpoint = checkpoints.get((area_code, c_id)) or ImportCheckpoint(area_code=area_code, content_type_id=c_id)
+                if resume and checkpoint.completed:
+                    self.stdout.write(f'  -> Skip {c_name} in {area_name} (already finished)')
+                    continue
+                if resume and checkpoint.last_page and checkpoint.arrange != arrange:
+                    # 다른 정렬로 받던 페이지 번호로는 이어받을 수 없음 (건너뛰는 항목이 생김) → 처음부터
+                    self.stdout.write(self.style.WARNING(
+                        f'  -> Restart {c_name} in {area_name}: saved page {checkpoint.last_page} was '
+                        f'fetched with arrange={checkpoint.arrange or "?"}, this run uses arrange={arrange}'
+                    ))
+                    resume_job = False
+                else:
+                    resume_job = resume
+                if not resume_job:
+                    # 새 실행: 진행 상황만 초기화 (워터마크는 유지)
+                    checkpoint.last_page = 0
+                    checkpoint.run_modified = ''
+                    checkpoint.completed = False
+                checkpoint.arrange = arrange
+                checkpoint.save()
 
                 if c_id == '15':
                     endpoint = '/searchFestival2'
-                    base_params = {'eventStartDate': today_str, 'arrange': 'A'}
-                    self.stdout.write(f'   -> (Mode: Festival Search from {today_str})')
+                    base_params = {'eventStartDate': today_str, 'arrange': arrange}
                 else:
                     endpoint = '/areaBasedList2'
-                    base_params = {'arrange': 'A', 'contentTypeId': c_id}
-
-                while True:
-                    params = {
-                        'serviceKey': API_KEY,
-                        'numOfRows': 100,
-                        'pageNo': page,
-                        'MobileOS': 'ETC',
-                        'MobileApp': 'TripPlanner',
-                        'areaCode': area_code,
-                        '_type': 'json',
-                    }
-                    params.update(base_params)
-                    
-                    # 재시도(Retry)
-                    max_retries = 3  # 최대 3번까지 재시도
-                    response = None
-                    success = False
-
-                    for attempt in range(max_retries):
-                        try:
-                            response = requests.get(f'{BASE_URL}{endpoint}', params=params, timeout=30)
-                            
-                            if response.status_code == 200:
-                                success = True
-                                break 
-                            elif response.status_code == 502:
-                                # 502 에러면 잠시 쉬었다가 재시도
-                                self.stdout.write(self.style.WARNING(f'    ⚠️ 502 Bad Gateway. Retrying... ({attempt+1}/{max_retries})'))
-                                time.sleep(3) 
-                            else:
-                                self.stdout.write(self.style.ERROR(f'API Error: {response.status_code}'))
-                                break
-                        except requests.exceptions.RequestException as e:
-                            self.stdout.write(self.style.WARNING(f'    ⚠️ Connection Error. Retrying... ({attempt+1}/{max_retries})'))
-                            time.sleep(3)
-
-                    if not success or response is None or response.status_code != 200:
-                        self.stdout.write(self.style.ERROR(f'    ❌ Failed to fetch page {page} after retries. Moving to next category.'))
-                        break
-
+                    base_params = {'arrange': arrange, 'contentTypeId': c_id}
+                base_params['areaCode'] = area_code
+                jobs.append({
+                    'area_code': area_code, 'area_name': area_name, 'c_name': c_name,
+                    'endpoint': endpoint, 'params': base_params, 'total': 0,
+                    'checkpoint': checkpoint, 'failed': False,
+                    'watermark': checkpoint.watermark if incremental else '',
+                })
+
+        # HTTP 호출은 워커 스레드 풀에서 동시에, DB 쓰기는 메인 스레드 하나에서만 수행
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            self.executor = executor
+            pending = {}
+
+            def submit(job, page):
+                future = executor.submit(self.fetch_page, job['endpoint'], job['params'], page)
+                pending[future] = (job, page)
+
+            for job in jobs:
+                submit(job, job['checkpoint'].last_page + 1)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job, page = pending.pop(future)
+                    label = f"{job['area_name']} | {job['c_name']}"
+                    if job['failed']:
+                        continue
                     try:
-                        data = response.json()
-                        items = []
-                        
-                        if 'response' in data and 'body' in data['response']:
-                            body = data['response']['body']
-                            if 'items' in body and body['items']:
-                                items = body['items']['item']
-                                if not isinstance(items, list):
-                                    items = [items]
-                            
-                            if not items:
-                                break 
-                        else:
-                            break
-
-                        count = 0
-                        for item in items:
-                            if self.process_item(item, area_code, full_mode):
-                                count += 1
-                                total_imported_in_category += 1
-                        
-                        self.stdout.write(f'    - {area_name} | {c_name} | p.{page}: Saved {count} items')
-                        
-                        if len(items) < 100:
-                            break 
-                        
-                        page += 1
-                        time.sleep(0.5)
+                        items = future.result()
+                    except Exception as e:
+                        # 워커에서 잡히지 않은 예외(응답 파싱 등)는 이 작업만 멈추고 나머지는 계속 진행
+                        self.stdout.write(self.style.ERROR(f'    ❌ Error fetching {label} page {page}: {e!r}'))
+                        self._fail_job(job)
+                        continue
 
+                    if items is None:
+                        self.stdout.write(self.style.ERROR(f'    ❌ Failed to fetch {label} page {page} after retries. Moving to next category.'))
+                        self._fail_job(job)
+                        continue
+
+                    # 워터마크 이후에 수정된 항목만 저장, 이전 항목이 보이면 마지막 페이지
+                    fresh = [item for item in items if (item.get('modifiedtime') or '') > job['watermark']]
+
+                    # 다음 페이지는 현재 페이지를 저장하는 동안 미리 요청
+                    has_next = len(items) >= PAGE_SIZE and len(fresh) == len(items)
+                    if has_next:
+                        submit(job, page + 1)
+
+                    try:
+                        # 상세 API 호출/파싱은 트랜잭션 밖에서 (호출 동안 DB 쓰기 잠금을 잡지 않도록)
+                        parsed, existing = self.prepare_page(fresh, job['area_code'], full_mode)
+                        # 페이지 저장과 체크포인트 갱신만 한 트랜잭션으로
+                        with transaction.atomic():
+                            self.save_page(parsed, existing)
+                            self.hours.flush()
+                            self.save_checkpoint(job['checkpoint'], page, items)
+                        count = len(parsed)
                     except Exception as e:
                         self.stdout.write(self.style.ERROR(f'Error processing data: {str(e)}'))
-                        break
-                
-                self.stdout.write(self.style.SUCCESS(f'  -> Finished {c_name} in {area_name}: {total_imported_in_category} items'))    
+                        self._fail_job(job)
+                        continue
+                    job['total'] += count
+                    self.stdout.write(f'    - {label} | p.{page}: Saved {count} items')
+
+                    if not has_next:
+                        self._finish_job(job)
+
+        # 새로 저장한 항목이 있으면 응답 캐시 무효화
+        if any(job['total'] for job in jobs):
+            version = bump_catalog_version()
+            self.stdout.write(self.style.SUCCESS(f'🧹 응답 캐시 버전 갱신 (v{version})'))
+
+    def save_checkpoint(self, checkpoint, page, items):
+        modified = max((item.get('modifiedtime') or '' for item in items), default='')
+        checkpoint.last_page = page
+        checkpoint.run_modified = max(checkpoint.run_modified, modified)
+        checkpoint.save(update_fields=['last_page', 'run_modified', 'updated_at'])
+
+    def _finish_job(self, job):
+        # 끝까지 수집한 경우에만 워터마크 전진
+        checkpoint = job['checkpoint']
+        checkpoint.watermark = max(checkpoint.watermark, checkpoint.run_modified)
+        checkpoint.completed = True
+        checkpoint.save(update_fields=['watermark', 'completed', 'updated_at'])
+        self.stdout.write(self.style.SUCCESS(f"  -> Finished {job['c_name']} in {job['area_name']}: {job['total']} items"))
+
+    def _fail_job(self, job):
+        # 체크포인트는 마지막으로 저장한 페이지에 남겨 두고 --resume 때 이어서 수집
+        job['failed'] = True
+        self.stdout.write(self.style.WARNING(f"  -> Stopped {job['c_name']} in {job['area_name']} at page {job['checkpoint'].last_page} (resume with --resume)"))
+
+    def prepare_page(self, items, area_code, full_mode=False):
+        """한 페이지의 item 들을 저장할 (Trip, 태그 이름들) 목록과 기존 Trip 사전으로 변환 (HTTP 호출 포함, 저장은 save_page)"""
+        # 같은 페이지에 같은 contentid 가 여러 번 오면 마지막 것만 사용
+        items = list({item['contentid']: item for item in items if self.is_valid_item(item)}.values())
+        existing = Trip.objects.in_bulk([item['contentid'] for item in items], field_name='external_id')
+
+        details = {}
+        if full_mode:
+            # 상세 정보(overview)가 아직 없는 항목만 상세 API 를 동시에 호출
+            targets = [
+                item for item in items
+                if not (item['contentid'] in existing and existing[item['contentid']].overview)
+            ]
+            for item, result in zip(targets, self.executor.map(self.fetch_details, targets)):
+                details[item['contentid']] = result
+
+        # 같은 페이지의 운영 정보 문자열은 캐시에서 한 번에 조회
+        self.hours.prefetch(
+            self.hours_source(details.get(item['contentid'], ({}, {}))[1], existing.get(item['contentid']))
+            for item in items
+        )
 
-    def process_item(self, item, area_code, full_mode=False):
+        parsed = []
+        for item in items:
+            common_data, intro_data = details.get(item['contentid'], ({}, {}))
+            result = self.process_item(item, area_code, common_data, intro_data, existing.get(item['contentid']))
+            if result:
+                parsed.append(result)
+        return parsed, existing
+
+    def hours_source(self, intro_data, existing_trip):
+        """운영 정보 파싱에 쓸 (이용시간, 휴무일) 원문 - 상세 정보가 없으면 기존 값"""
+        use_time = intro_data.get('use_time') or (existing_trip.use_time if existing_trip else '') or ''
+        rest_date = intro_data.get('rest_date') or (existing_trip.rest_date if existing_trip else '') or ''
+        return use_time, rest_date
+
+    def save_page(self, parsed, existing):
+        """파싱된 (Trip, 태그 이름들) 목록을 페이지 단위로 일괄 저장 (트랜잭션은 호출하는 쪽에서 체크포인트와 함께)"""
+        if not parsed:
+            return
+        trips = [trip for trip, _ in parsed]
+
+        # 1. Trip upsert (external_id 기준)
+        Trip.objects.bulk_create(
+            trips,
+            update_conflicts=True,
+            unique_fields=['external_id'],
+            update_fields=TRIP_UPSERT_FIELDS,
+        )
+        # DB 에 따라 충돌(갱신)된 행의 pk 가 채워지지 않을 수 있으므로 한 번에 다시 매핑
+        if any(trip.pk is None for trip in trips):
+            ids = dict(Trip.objects.filter(
+                external_id__in=[trip.external_id for trip in trips]
+            ).values_list('external_id', 'id'))
+            for trip in trips:
+                trip.pk = ids[trip.external_id]
+        search.index_trips(trips)
+
+        # 2. 태그 / 여행지-태그 연결
+        tag_names = {name for _, names in parsed for name in names}
+        if tag_names:
+            Tag.objects.bulk_create([Tag(name=name) for name in tag_names], ignore_conflicts=True)
+            tag_ids = dict(Tag.objects.filter(name__in=tag_names).values_list('name', 'id'))
+            TripTag.objects.bulk_create(
+                [TripTag(trip_id=trip.pk, tag_id=tag_ids[name]) for trip, names in parsed for name in names],
+                ignore_conflicts=True,
+            )
+
+        # 3. 이미지가 없는 여행지만 대표 이미지 추가
+        has_images = set(
+            TripImage.objects.filter(trip_id__in=[trip.pk for trip in trips])
+            .values_list('trip_id', flat=True)
+        )
+        TripImage.objects.bulk_create([
+            TripImage(trip_id=trip.pk, image_url=trip.thumbnail_image, order=1)
+            for trip in trips
+            if trip.thumbnail_image and trip.pk not in has_images
+        ])
+
+    def is_valid_item(self, item):
+        # [필터링] 필수 데이터 검증: ID, 제목, 그리고 사진(firstimage)이 있어야 함
+        return bool(item.get('contentid') and item.get('title') and item.get('firstimage'))
+
+    def process_item(self, item, area_code, common_data=None, intro_data=None, existing_trip=None):
+        """item 을 저장할 Trip 인스턴스와 태그 이름 집합으로 변환 (DB 쓰기는 save_page 에서)"""
+        common_data = common_data or {}
+        intro_data = intro_data or {}
         try:
             content_id = item.get('contentid')
-            # [필터링] 필수 데이터 검증: ID, 제목, 그리고 사진(firstimage)이 있어야 함
-            if not content_id or not item.get('title') or not item.get('firstimage'):
-                return False
-            
-            # 이미 존재하는지 확인
-            existing_trip = Trip.objects.filter(external_id=content_id).first()
+            if not self.is_valid_item(item):
+                return None
             
             region = self.get_or_create_region(item.get('areacode', '1'))
             city = None
@@ -287,17 +434,6 @@ class Command(BaseCommand):
             start_date = self.parse_date(item.get('eventstartdate'))
             end_date = self.parse_date(item.get('eventenddate'))
 
-            api_key = unquote(config('TOUR_API_KEY'))
-
-            common_data = {}
-            intro_data = {}
-
-            # [핵심] full_mode가 켜져있고, 상세 정보가 없는 경우에만 API 호출
-            if full_mode:
-                if not existing_trip or not existing_trip.overview:
-                    common_data = self.get_detail_common(content_id, api_key)
-                    intro_data = self.get_detail_intro(content_id, content_type_id, api_key)
-
             # 기본 데이터 매핑 (상세 API 호출 안 할 경우 item 데이터 활용)
             update_defaults = {
                 'title': item.get('title', '')[:200],
@@ -332,10 +468,8 @@ class Command(BaseCommand):
                 update_defaults['use_time'] = intro_data.get('use_time')
 
             # [추가] 운영 및 휴무 정보 구조화 (JSON)
-            use_time_source = intro_data.get('use_time') or (existing_trip.use_time if existing_trip else '')
-            rest_date_source = intro_data.get('rest_date') or (existing_trip.rest_date if existing_trip else '')
-            
-            operating_info = self.parse_operating_hours(use_time_source, rest_date_source)
+            use_time_source, rest_date_source = self.hours_source(intro_data, existing_trip)
+            operating_info = self.hours.get_or_parse(use_time_source, rest_date_source, self.parse_operating_hours)
             update_defaults['operating_info'] = operating_info
             
             # 대표 시간 (open_time, close_time) 추출 - 필터링용
@@ -370,20 +504,19 @@ class Command(BaseCommand):
             title = item.get('title', '')
             update_defaults['average_duration'] = self.calculate_average_duration(content_type_id, cat3, title)
 
-            trip, created = Trip.objects.update_or_create(
-                external_id=content_id,
-                defaults=update_defaults
-            )
-            
-            self.create_tags(trip, item, common_data, intro_data)
+            # 상세 정보가 없는 필드는 기존 값을 유지 (일괄 upsert 는 모든 컬럼을 덮어쓰므로)
+            if existing_trip:
+                for field in OPTIONAL_FIELDS:
+                    if field not in update_defaults:
+                        update_defaults[field] = getattr(existing_trip, field)
 
-            if created or not trip.images.exists():
-                self.fetch_images(trip, item['contentid'])
-            return True
+            trip = Trip(external_id=content_id, **update_defaults)
+            trip.geo_cell = grid_cell(trip.mapy, trip.mapx)
+            return trip, self.build_tags(trip, item, common_data, intro_data)
         
         except Exception as e:
             self.stdout.write(self.style.ERROR(f"Error processing item {item.get('title')}: {str(e)}"))
-            return False
+            return None
 
     def calculate_average_duration(self, content_type_id, cat3, title):
         """장소의 성격에 따라 예상 체류 시간 및 안내 문구 유추"""
@@ -532,7 +665,7 @@ class Command(BaseCommand):
 
         return None, None
         
-    def create_tags(self, trip, item, common_data, intro_data):
+    def build_tags(self, trip, item, common_data, intro_data):
         tags_to_create = set() # 중복 방지를 위해 set 사용
 
         # 1. 지역/도시 태그
@@ -584,9 +717,7 @@ class Command(BaseCommand):
             if kw in full_text:
                 tags_to_create.add(tag)
 
-        for tag_name in tags_to_create:
-            tag, _ = Tag.objects.get_or_create(name=tag_name)
-            TripTag.objects.get_or_create(trip=trip, tag=tag)
+        return tags_to_create
 
     def get_or_create_region(self, areacode):
         AREA_MAP = {
@@ -766,9 +897,3 @@ class Command(BaseCommand):
         if item.get('overview'): score += 20
         if item.get('addr1'): score += 10
         return min(score, 100)
-
-    def fetch_images(self, trip, contentid):
-        if trip.thumbnail_image:
-            TripImage.objects.create(
-                trip=trip, image_url=trip.thumbnail_image, order=1
-            )
\ No newline at end of file
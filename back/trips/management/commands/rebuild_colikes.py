@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from trips import colikes
+
+class Command(BaseCommand):
+    help = 'Rebuild the trip co-like table (trip_co_likes) from wishlists'
+
+    # python manage.py rebuild_colikes
+
+    def handle(self, *args, **options):
+        total = colikes.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'✨ 공동 찜 테이블 재구성 완료: {total}개 쌍'))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from trips.models import Trip
+from trips import search
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index (trips_search) from the trips table'
+
+    # python manage.py rebuild_search_index
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of trips indexed per batch',
+        )
+
+    def handle(self, *args, **options):
+        if not search.is_supported():
+            self.stdout.write(self.style.WARNING('전문 검색 인덱스는 SQLite 에서만 사용합니다.'))
+            return
+
+        batch_size = options['batch_size']
+        fields = ('id', 'title', 'destination', 'overview')
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {search.SEARCH_TABLE}")
+                search.create_search_table(cursor)
+
+            batch = []
+            total = 0
+            for trip in Trip.objects.only(*fields).iterator(chunk_size=batch_size):
+                batch.append(trip)
+                if len(batch) >= batch_size:
+                    search.index_trips(batch)
+                    total += len(batch)
+                    batch = []
+            search.index_trips(batch)
+            total += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'✨ 검색 인덱스 재구성 완료: {total}개'))
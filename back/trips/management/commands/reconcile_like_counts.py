@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from trips.models import Trip, Wishlist
+
+class Command(BaseCommand):
+    help = 'Recompute Trip.like_count from wishlists and fix drifted rows'
+
+    # python manage.py reconcile_like_counts [--dry-run]
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report mismatched trips without updating them',
+        )
+
+    def handle(self, *args, **options):
+        actual = dict(
+            Wishlist.objects.values('trip_id').annotate(n=Count('id')).values_list('trip_id', 'n')
+        )
+
+        drifted = []
+        for trip_id, like_count in Trip.objects.values_list('id', 'like_count').iterator():
+            count = actual.get(trip_id, 0)
+            if like_count != count:
+                drifted.append(Trip(id=trip_id, like_count=count))
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'불일치 {len(drifted)}개 (dry-run, 변경 없음)'))
+            return
+
+        with transaction.atomic():
+            Trip.objects.bulk_update(drifted, ['like_count'], batch_size=1000)
+
+        self.stdout.write(self.style.SUCCESS(f'✨ 좋아요 수 보정 완료: {len(drifted)}개 수정'))
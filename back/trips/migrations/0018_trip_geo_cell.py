@@ -0,0 +1,43 @@
+# Generated by Django 5.2.9 on 2026-10-18 11:45
+
+import math
+
+from django.db import migrations, models
+
+# 이 시점의 trips.geo 격자 설정을 고정해 둔 사본 (셀 크기를 바꾸면 새 마이그레이션에서 다시 채울 것)
+GRID_CELL_DEG = 0.05
+GRID_COLS = int(round(360 / GRID_CELL_DEG))
+
+
+def grid_cell(lat, lon):
+    if not lat or not lon:
+        return None
+    row = int(math.floor((float(lat) + 90.0) / GRID_CELL_DEG))
+    col = int(math.floor((float(lon) + 180.0) / GRID_CELL_DEG))
+    return row * GRID_COLS + col
+
+
+def fill_geo_cell(apps, schema_editor):
+    Trip = apps.get_model("trips", "Trip")
+    trips = list(Trip.objects.only("id", "mapx", "mapy"))
+    for trip in trips:
+        trip.geo_cell = grid_cell(trip.mapy, trip.mapx)
+    Trip.objects.bulk_update(trips, ["geo_cell"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trips", "0017_trip_detail_meta"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="trip",
+            name="geo_cell",
+            field=models.IntegerField(
+                blank=True, db_index=True, null=True, verbose_name="위치 격자 셀"
+            ),
+        ),
+        migrations.RunPython(fill_geo_cell, migrations.RunPython.noop),
+    ]
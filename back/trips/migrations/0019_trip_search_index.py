@@ -0,0 +1,62 @@
+# Generated by Django 5.2.9 on 2026-10-18 11:47
+
+import re
+
+from django.db import migrations
+
+# 이 시점의 trips.search 인덱스 형식을 고정해 둔 사본 (형식을 바꾸면 새 마이그레이션에서 다시 만들 것)
+SEARCH_TABLE = "trips_search"
+SEARCH_RANK = "bm25(10.0, 3.0, 1.0)"
+
+
+def ngrams(text):
+    tokens = []
+    for word in re.findall(r"\w+", (text or "").lower()):
+        if len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return " ".join(tokens)
+
+
+def create_search_table(cursor):
+    cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(title, destination, overview)")
+    cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rank) VALUES ('rank', %s)", [SEARCH_RANK])
+
+
+def create_search_index(apps, schema_editor):
+    # FTS5 가상 테이블은 SQLite 전용 (다른 DB 에서는 기본 LIKE 검색 사용)
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    Trip = apps.get_model("trips", "Trip")
+    with schema_editor.connection.cursor() as cursor:
+        create_search_table(cursor)
+        rows = [
+            (pk, ngrams(title), ngrams(destination), ngrams(overview))
+            for pk, title, destination, overview in Trip.objects.values_list(
+                "id", "title", "destination", "overview"
+            ).iterator()
+        ]
+        cursor.executemany(
+            f"INSERT INTO {SEARCH_TABLE}(rowid, title, destination, overview) VALUES (%s, %s, %s, %s)",
+            rows,
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trips", "0018_trip_geo_cell"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
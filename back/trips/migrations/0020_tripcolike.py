@@ -0,0 +1,53 @@
+# Generated by Django 5.2.9 on 2026-10-18 11:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from trips.colikes import REBUILD_SQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trips", "0019_trip_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TripCoLike",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "other_trip",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="trips.trip",
+                    ),
+                ),
+                (
+                    "trip",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="co_likes",
+                        to="trips.trip",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "trip_co_likes",
+                "unique_together": {("trip", "other_trip")},
+            },
+        ),
+        # 기존 찜 데이터로 공동 찜 테이블 초기화 (rebuild_colikes 와 같은 SQL)
+        migrations.RunSQL(REBUILD_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.9 on 2026-10-18 11:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trips", "0020_tripcolike"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("area_code", models.CharField(max_length=10)),
+                ("content_type_id", models.CharField(max_length=10)),
+                (
+                    "last_page",
+                    models.IntegerField(
+                        default=0, verbose_name="마지막으로 저장한 페이지"
+                    ),
+                ),
+                (
+                    "run_modified",
+                    models.CharField(
+                        blank=True,
+                        max_length=14,
+                        verbose_name="이번 실행에서 본 최대 modifiedtime",
+                    ),
+                ),
+                (
+                    "watermark",
+                    models.CharField(
+                        blank=True,
+                        max_length=14,
+                        verbose_name="마지막 완료 실행의 modifiedtime",
+                    ),
+                ),
+                ("completed", models.BooleanField(default=False)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "import_checkpoints",
+                "unique_together": {("area_code", "content_type_id")},
+            },
+        ),
+    ]
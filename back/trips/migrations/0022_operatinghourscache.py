@@ -0,0 +1,44 @@
+# Generated by Django 5.2.9 on 2026-10-18 11:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trips", "0021_importcheckpoint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OperatingHoursCache",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=64, unique=True)),
+                ("use_time", models.TextField(blank=True)),
+                ("rest_date", models.TextField(blank=True)),
+                ("operating_info", models.JSONField(default=dict)),
+                (
+                    "source",
+                    models.CharField(
+                        choices=[("regex", "정규식"), ("ai", "AI")],
+                        default="regex",
+                        max_length=10,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "operating_hours_cache",
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.9 on 2026-10-18 11:59
+
+from django.db import migrations, models
+
+# 기존 찜 데이터로 like_count 채우기
+FILL_LIKE_COUNTS_SQL = """
+UPDATE trips
+SET like_count = (SELECT COUNT(*) FROM wishlists WHERE wishlists.trip_id = trips.id)
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trips", "0022_operatinghourscache"),
+    ]
+
+    operations = [
+        migrations.RunSQL(FILL_LIKE_COUNTS_SQL, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(
+                fields=["status", "-like_count", "-recommendation_score", "-id"],
+                name="trip_popular_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.9 on 2026-10-18 12:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trips", "0023_trip_like_count_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(
+                fields=[
+                    "status",
+                    "category",
+                    "-like_count",
+                    "-recommendation_score",
+                    "-id",
+                ],
+                name="trip_category_popular_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(
+                fields=["status", "region", "city"], name="trip_region_city_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(fields=["status", "city"], name="trip_city_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(
+                fields=["status", "-recommendation_score"], name="trip_score_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(
+                fields=["status", "-created_at"], name="trip_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tripimage",
+            index=models.Index(fields=["trip", "order"], name="tripimage_order_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="wishlist",
+            index=models.Index(
+                fields=["user", "-created_at"], name="wishlist_user_created_idx"
+            ),
+        ),
+    ]
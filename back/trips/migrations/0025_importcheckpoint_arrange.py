@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-18 12:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trips", "0024_query_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="importcheckpoint",
+            name="arrange",
+            field=models.CharField(blank=True, max_length=1, verbose_name="정렬 기준"),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from users.models import User
 from django.conf import settings
+from .geo import grid_cell
+from . import search, caching
 
 class Region(models.Model):
     name = models.CharField(max_length=50)
@@ -53,7 +55,7 @@ class Trip(models.Model):
     
     status = models.CharField(max_length=20, default='active')
     view_count = models.IntegerField(default=0)
-    like_count = models.IntegerField(default=0)
+    like_count = models.IntegerField(default=0) # 찜 수 (TripLikeView 에서 함께 갱신, reconcile_like_counts 로 보정)
     
     is_ai_recommended = models.BooleanField(default=False)
     is_featured = models.BooleanField(default=False)
@@ -68,6 +70,7 @@ class Trip(models.Model):
 
     mapx = models.FloatField(default=0.0) # 경도
     mapy = models.FloatField(default=0.0) # 위도
+    geo_cell = models.IntegerField(null=True, blank=True, db_index=True, verbose_name="위치 격자 셀") # trips/geo.py 참고
 
     overview = models.TextField(blank=True, null=True, verbose_name="상세 설명")
     tel = models.CharField(max_length=100, blank=True, null=True, verbose_name="연락처")
@@ -92,6 +95,37 @@ class Trip(models.Model):
 
     class Meta:
         db_table = 'trips'
+        indexes = [
+            # 목록 기본 정렬 (좋아요순 -> 추천점수순 -> 최신순)
+            models.Index(fields=['status', '-like_count', '-recommendation_score', '-id'], name='trip_popular_idx'),
+            # 카테고리 필터 + 기본 정렬 (목록, 카테고리 추천, 랜덤 샘플러 id 풀)
+            models.Index(fields=['status', 'category', '-like_count', '-recommendation_score', '-id'], name='trip_category_popular_idx'),
+            # 플래너 후보 (지역 + 시군구)
+            models.Index(fields=['status', 'region', 'city'], name='trip_region_city_idx'),
+            # AI 추천 (시군구 고정)
+            models.Index(fields=['status', 'city'], name='trip_city_idx'),
+            # ordering=recommendation_score / created_at (역방향 스캔으로 오름차순도 처리)
+            models.Index(fields=['status', '-recommendation_score'], name='trip_score_idx'),
+            models.Index(fields=['status', '-created_at'], name='trip_created_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # 좌표가 바뀌면 격자 셀도 항상 함께 갱신
+        self.geo_cell = grid_cell(self.mapy, self.mapx)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'mapx', 'mapy'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'geo_cell'}
+        super().save(*args, **kwargs)
+        search.index_trips([self])
+        # 캐시된 목록/상세 응답 무효화
+        caching.bump_catalog_version()
+
+    def delete(self, *args, **kwargs):
+        trip_id = self.id
+        result = super().delete(*args, **kwargs)
+        search.remove_trips([trip_id])
+        caching.bump_catalog_version()
+        return result
 
 class TripImage(models.Model):
     trip = models.ForeignKey(Trip, on_delete=models.CASCADE, related_name='images')
@@ -102,6 +136,10 @@ class TripImage(models.Model):
     class Meta:
         db_table = 'trip_images'
         ordering = ['order']
+        indexes = [
+            # 여행지별 이미지 (순서대로)
+            models.Index(fields=['trip', 'order'], name='tripimage_order_idx'),
+        ]
 
 class Tag(models.Model):
     name = models.CharField(max_length=50, unique=True)
@@ -128,9 +166,68 @@ class Wishlist(models.Model):
 
     class Meta:
         db_table = 'wishlists'
+        indexes = [
+            # 내 찜 목록 (최근 찜한 순)
+            models.Index(fields=['user', '-created_at'], name='wishlist_user_created_idx'),
+        ]
         unique_together = ('user', 'trip')
         ordering = ['-created_at']
 
     def __str__(self):
         return f"{self.user.email} - {self.trip.title}"
-    
\ No newline at end of file
+    
+class TripCoLike(models.Model):
+    """같은 유저가 함께 찜한 여행지 쌍과 그 유저 수 (협업 필터링용, 양방향으로 저장)"""
+    trip = models.ForeignKey(Trip, on_delete=models.CASCADE, related_name='co_likes')
+    other_trip = models.ForeignKey(Trip, on_delete=models.CASCADE, related_name='+')
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'trip_co_likes'
+        unique_together = ('trip', 'other_trip')
+
+class ImportCheckpoint(models.Model):
+    """TourAPI 수집 진행 상황 ((지역, 콘텐츠 타입) 조합별) - 증분 수집/이어받기에 사용"""
+    area_code = models.CharField(max_length=10)
+    content_type_id = models.CharField(max_length=10)
+    arrange = models.CharField(max_length=1, blank=True, verbose_name="정렬 기준") # last_page 를 만든 목록 정렬 (A: 제목순, C: 수정일순)
+    last_page = models.IntegerField(default=0, verbose_name="마지막으로 저장한 페이지")
+    run_modified = models.CharField(max_length=14, blank=True, verbose_name="이번 실행에서 본 최대 modifiedtime")
+    watermark = models.CharField(max_length=14, blank=True, verbose_name="마지막 완료 실행의 modifiedtime") # YYYYMMDDHHMMSS
+    completed = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'import_checkpoints'
+        unique_together = ('area_code', 'content_type_id')
+
+    def __str__(self):
+        return f"{self.area_code}/{self.content_type_id} p.{self.last_page} ({self.watermark or '-'})"
+
+class CatalogVersion(models.Model):
+    """응답 캐시 무효화용 카탈로그 버전 (행 하나 - 웹 워커와 관리 명령이 모두 같은 값을 봄, trips/caching.py 참고)"""
+    SINGLETON_ID = 1
+
+    version = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'catalog_version'
+
+    def __str__(self):
+        return f"v{self.version}"
+
+class OperatingHoursCache(models.Model):
+    """정규화한 (이용시간, 휴무일) 문자열별 operating_info 파싱 결과 (trips/operating_hours.py 참고)"""
+    SOURCE_CHOICES = [('regex', '정규식'), ('ai', 'AI')]
+
+    key = models.CharField(max_length=64, unique=True) # sha256(정규화된 use_time + rest_date)
+    use_time = models.TextField(blank=True)
+    rest_date = models.TextField(blank=True)
+    operating_info = models.JSONField(default=dict)
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES, default='regex')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'operating_hours_cache'
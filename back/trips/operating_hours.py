@@ -0,0 +1,82 @@
+import hashlib
+import re
+
+from .models import OperatingHoursCache
+
+# --- 운영 정보 파싱 결과 캐시 ---
+# 같은 (이용시간, 휴무일) 문자열은 정규화한 뒤 해시 키 하나로 묶어
+# 정규식/AI 파싱 결과를 한 번만 계산하고 DB 에 보관한다.
+
+SOURCE_PRIORITY = {'regex': 0, 'ai': 1}  # AI 결과가 정규식 결과보다 우선
+
+BR_RE = re.compile(r'<\s*br\s*/?\s*>', re.I)
+SPACE_RE = re.compile(r'[ \t\u00a0\u3000]+')
+
+
+def normalize(text):
+    """<br> 표기와 공백을 통일 (정규식 파싱도 정규화한 문자열로 수행)"""
+    text = BR_RE.sub('<br>', text or '')
+    text = SPACE_RE.sub(' ', text)
+    return '\n'.join(line.strip() for line in text.strip().splitlines())
+
+
+def hours_key(use_time, rest_date):
+    raw = f"{normalize(use_time)}\x1f{normalize(rest_date)}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class OperatingHoursLookup:
+    """한 번의 명령 실행 동안 쓰는 캐시 창구 (메모리 + DB, 새 결과는 flush 로 일괄 저장)"""
+
+    def __init__(self):
+        self.memo = {}     # key -> (operating_info, source)
+        self.pending = {}  # key -> OperatingHoursCache
+
+    def prefetch(self, pairs):
+        keys = {hours_key(use_time, rest_date) for use_time, rest_date in pairs} - self.memo.keys()
+        if not keys:
+            return
+        for key, info, source in OperatingHoursCache.objects.filter(key__in=keys).values_list('key', 'operating_info', 'source'):
+            self.memo[key] = (info, source)
+
+    def get(self, use_time, rest_date, source=None):
+        """캐시된 operating_info (raw 는 이 레코드의 원문으로 채움), 없으면 None"""
+        cached = self.memo.get(hours_key(use_time, rest_date))
+        if cached is None or (source and cached[1] != source):
+            return None
+        return {**cached[0], "raw": {"use_time": use_time, "rest_date": rest_date}}
+
+    def put(self, use_time, rest_date, info, source):
+        key = hours_key(use_time, rest_date)
+        cached = self.memo.get(key)
+        if cached and SOURCE_PRIORITY[cached[1]] > SOURCE_PRIORITY[source]:
+            return
+        info = {k: v for k, v in info.items() if k != 'raw'}
+        self.memo[key] = (info, source)
+        self.pending[key] = OperatingHoursCache(
+            key=key, use_time=normalize(use_time), rest_date=normalize(rest_date),
+            operating_info=info, source=source,
+        )
+
+    def get_or_parse(self, use_time, rest_date, parse):
+        info = self.get(use_time, rest_date)
+        if info is None:
+            info = parse(normalize(use_time), normalize(rest_date))
+            self.put(use_time, rest_date, info, 'regex')
+            info = {**info, "raw": {"use_time": use_time, "rest_date": rest_date}}
+        return info
+
+    def flush(self):
+        if not self.pending:
+            return
+        entries = list(self.pending.values())
+        self.pending = {}
+        # 정규식 결과는 기존 행을 덮어쓰지 않고, AI 결과는 덮어씀
+        OperatingHoursCache.objects.bulk_create(
+            [entry for entry in entries if entry.source == 'regex'], ignore_conflicts=True,
+        )
+        OperatingHoursCache.objects.bulk_create(
+            [entry for entry in entries if entry.source == 'ai'],
+            update_conflicts=True, unique_fields=['key'],
+            update_fields=['operating_info', 'source', 'updated_at'],
+        )
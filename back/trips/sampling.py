@@ -0,0 +1,61 @@
+import random
+from array import array
+from django.core.cache import cache
+
+from .caching import catalog_version
+from .models import Trip
+
+# --- 랜덤 추천용 샘플러 ---
+# ORDER BY RANDOM() 은 조건에 맞는 행 전체를 정렬하므로, 활성 여행지 id 배열을
+# (카테고리, 썸네일 여부) 별로 캐시해두고 그 안에서 k 개만 뽑아 pk 로 조회한다.
+
+ID_POOL_TTL = 60 * 10  # 10분
+RESAMPLE_ROUNDS = 3
+
+
+def _pool_key(category_id, with_thumbnail):
+    return f"trips:id_pool:{category_id or 'all'}:{int(with_thumbnail)}"
+
+
+def active_trip_ids(category_id=None, with_thumbnail=False):
+    """조건에 맞는 활성 여행지 id 배열 (캐시)"""
+    key = _pool_key(category_id, with_thumbnail)
+    version = catalog_version()  # 수집/저장으로 카탈로그가 바뀌면 새로 계산
+    ids = cache.get(key, version=version)
+    if ids is None:
+        queryset = Trip.objects.filter(status='active')
+        if category_id:
+            queryset = queryset.filter(category_id=category_id)
+        if with_thumbnail:
+            queryset = queryset.filter(thumbnail_image__isnull=False).exclude(thumbnail_image='')
+        ids = array('q', queryset.values_list('id', flat=True))
+        cache.set(key, ids, ID_POOL_TTL, version=version)
+    return ids
+
+
+def sample_from_ids(queryset, ids, k):
+    """
+    ids 중 k 개를 무작위로 골라 queryset 에서 조회한 뒤, 뽑힌 순서대로 반환.
+    캐시 이후 비활성화/삭제된 id 는 queryset 조건에서 걸러지므로, 모자란 만큼 최대 RESAMPLE_ROUNDS 번
+    다시 뽑아 채운다 (카탈로그 크기와 무관하게 매번 k 에 비례하는 비용, 그래도 모자라면 적게 반환).
+    """
+    k = max(0, min(k, len(ids)))
+    picked = random.sample(ids, k)
+    found = queryset.in_bulk(picked)
+    tried = set(picked)
+
+    for _ in range(RESAMPLE_ROUNDS):
+        missing = k - len(found)
+        if missing <= 0:
+            break
+        extra = [pk for pk in random.sample(ids, min(len(ids), missing * 2)) if pk not in tried]
+        tried.update(extra)
+        found.update(queryset.in_bulk(extra))
+        picked += extra
+
+    result = [found[pk] for pk in picked if pk in found]
+    return result[:k]
+
+
+def sample_trips(queryset, k, category_id=None, with_thumbnail=False):
+    return sample_from_ids(queryset, active_trip_ids(category_id, with_thumbnail), k)
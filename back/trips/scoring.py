@@ -0,0 +1,70 @@
+import numpy as np
+
+from .geo import distances_km
+
+# --- AI 추천 점수 계산 엔진 ---
+# 후보 여행지의 점수 계산에 필요한 컬럼만 배열로 가져와 한 번에 점수를 매기고,
+# 상위 후보만 골라낸다. (Trip 인스턴스는 최종 선택된 행만 조회)
+
+SCORING_FIELDS = ('id', 'category_id', 'city_id', 'recommendation_score', 'mapx', 'mapy')
+
+CATEGORY_WEIGHT = 200
+CITY_WEIGHT = 100
+COLLAB_WEIGHT = 10
+MIN_SCORE = 30
+NEAR_KM = 1
+AROUND_KM = 2
+
+
+def load_columns(queryset):
+    """queryset 을 SCORING_FIELDS 순서의 float 배열들로 변환 (NULL 은 nan)"""
+    rows = list(queryset.values_list(*SCORING_FIELDS))
+    if not rows:
+        return [np.empty(0) for _ in SCORING_FIELDS]
+    return [np.array(column, dtype=np.float64) for column in zip(*rows)]
+
+
+def counter_lookup(values, counter):
+    """values 각각에 대한 counter[value] (없으면 0) 를 벡터로 조회"""
+    if not counter:
+        return np.zeros(len(values))
+    keys = np.fromiter(counter.keys(), dtype=np.float64, count=len(counter))
+    counts = np.fromiter(counter.values(), dtype=np.float64, count=len(counter))
+    order = np.argsort(keys)
+    keys, counts = keys[order], counts[order]
+
+    pos = np.clip(np.searchsorted(keys, values), 0, len(keys) - 1)
+    return np.where(keys[pos] == values, counts[pos], 0)
+
+
+def score_candidates(queryset, category_counter, city_counter, collab_counter, target=None):
+    """후보 전체의 (id 배열, 점수 배열) 반환"""
+    ids, category_ids, city_ids, rec_scores, xs, ys = load_columns(queryset)
+
+    scores = (
+        counter_lookup(category_ids, category_counter) * CATEGORY_WEIGHT
+        + counter_lookup(city_ids, city_counter) * CITY_WEIGHT
+        + counter_lookup(ids, collab_counter) * COLLAB_WEIGHT
+        + rec_scores
+    )
+
+    # 근접 장소 우선 추천
+    if target:
+        target_lat, target_lng = target
+        has_location = (np.nan_to_num(xs) != 0) & (np.nan_to_num(ys) != 0)
+        dist = distances_km(target_lat, target_lng, np.nan_to_num(ys), np.nan_to_num(xs))
+        scores += np.where(has_location & (dist < NEAR_KM), 500, 0)  # 1km 반경
+        scores += np.where(has_location & (dist >= NEAR_KM) & (dist < AROUND_KM), 200, 0)  # 2km 반경
+
+    return ids.astype(np.int64), scores
+
+
+def top_k_ids(ids, scores, k, min_score=MIN_SCORE):
+    """min_score 를 넘는 후보 중 점수 상위 k 개 id (점수 내림차순)"""
+    passed = np.flatnonzero(scores > min_score)
+    if len(passed) == 0 or k <= 0:
+        return []
+    k = min(k, len(passed))
+    top = passed[np.argpartition(-scores[passed], k - 1)[:k]]
+    top = top[np.argsort(-scores[top], kind='stable')]
+    return ids[top].tolist()
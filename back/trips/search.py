@@ -0,0 +1,95 @@
+import re
+from django.db import connection
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+# --- 여행지 전문 검색(Full-text) 인덱스 ---
+# SQLite FTS5 가상 테이블에 제목/주소/개요를 2-gram 으로 쪼개 저장한다.
+# 한국어는 띄어쓰기 단위 토큰만으로는 부분 검색이 안 되므로, 단어를 2글자씩 겹쳐 나눈 뒤
+# 검색어도 같은 방식으로 나눠 연속된 구(phrase)로 찾으면 LIKE '%검색어%' 와 같은 결과를
+# 인덱스로 얻을 수 있다. (rowid = trips.id)
+
+SEARCH_TABLE = 'trips_search'
+SEARCH_COLUMNS = ('title', 'destination', 'overview')
+SEARCH_RANK = 'bm25(10.0, 3.0, 1.0)'  # 제목 > 주소 > 개요 순으로 가중치
+
+
+def is_supported():
+    return connection.vendor == 'sqlite'
+
+
+def ngrams(text):
+    """'서울숲 공원' -> '서울 울숲 공원'"""
+    tokens = []
+    for word in re.findall(r'\w+', (text or '').lower()):
+        if len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return ' '.join(tokens)
+
+
+def build_match_query(terms):
+    """검색어 목록을 FTS5 MATCH 구문으로 변환 (한 글자 단어가 있으면 None)"""
+    phrases = []
+    for term in terms:
+        for word in re.findall(r'\w+', term.lower()):
+            if len(word) < 2:
+                return None
+            phrases.append(f'"{ngrams(word)}"')
+    return ' AND '.join(phrases) or None
+
+
+def create_search_table(cursor):
+    columns = ', '.join(SEARCH_COLUMNS)
+    cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5({columns})")
+    cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rank) VALUES ('rank', %s)", [SEARCH_RANK])
+
+
+def index_trips(trips):
+    """여행지들의 검색 인덱스를 추가/갱신"""
+    if not is_supported():
+        return
+    rows = [
+        (trip.id, ngrams(trip.title), ngrams(trip.destination), ngrams(trip.overview))
+        for trip in trips
+    ]
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {SEARCH_TABLE}(rowid, title, destination, overview) VALUES (%s, %s, %s, %s)",
+            rows,
+        )
+
+
+def remove_trips(trip_ids):
+    if not is_supported() or not trip_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [(pk,) for pk in trip_ids])
+
+
+class TripSearchFilter(filters.SearchFilter):
+    """
+    ?search= 를 전문 검색 인덱스로 조회하고 관련도순(search_rank)으로 정렬.
+    인덱스를 쓸 수 없는 경우(한 글자 검색어, SQLite 외 DB)는 기본 SearchFilter(LIKE)로 처리.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        match = build_match_query(terms)
+        if match is None or not is_supported():
+            return super().filter_queryset(request, queryset, view)
+
+        table = queryset.model._meta.db_table
+        matched = RawSQL(f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s", [match])
+        rank = RawSQL(
+            f'SELECT rank FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s AND rowid = "{table}"."id"',
+            [match], output_field=FloatField(),
+        )
+        return queryset.filter(id__in=matched).annotate(search_rank=rank).order_by('search_rank')
@@ -1,11 +1,22 @@
+from django.db import transaction
 from rest_framework import serializers
-from .models import Trip, TripImage, Category
+from .models import Trip, TripImage, Category, Wishlist
 from planner.models import Course as PlannerCourse, CourseDetail
+from planner.courses import add_details, load_course
 
 class TripImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = TripImage
         fields = ['image_url', 'order']
+
+def get_liked_trip_ids(request):
+    """요청 유저가 찜한 여행지 id 집합 (목록 직렬화 시 is_liked 를 한 번에 판단하기 위함)"""
+    if request and request.user.is_authenticated:
+        return set(Wishlist.objects.filter(user=request.user).values_list('trip_id', flat=True))
+    return set()
+
+def trip_list_context(request):
+    return {'request': request, 'liked_trip_ids': get_liked_trip_ids(request)}
         
 class TripListSerializer(serializers.ModelSerializer):
     region_name = serializers.ReadOnlyField(source='region.name')
@@ -33,11 +44,23 @@ class TripListSerializer(serializers.ModelSerializer):
         ]
 
     def get_is_liked(self, obj):
+        # 목록 뷰에서는 미리 구해둔 찜 id 집합으로 판단 (행마다 쿼리 X)
+        liked_ids = self.context.get('liked_trip_ids')
+        if liked_ids is not None:
+            return obj.id in liked_ids
+
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.wishlists.filter(user=request.user).exists()
         return False
 
+class TripDistanceSerializer(TripListSerializer):
+    """거리순 조회용 - 기준 좌표로부터의 대권 거리(km) 포함"""
+    distance = serializers.FloatField(read_only=True)
+
+    class Meta(TripListSerializer.Meta):
+        fields = TripListSerializer.Meta.fields + ['distance']
+
 class TripDetailSerializer(serializers.ModelSerializer):
     region_name = serializers.ReadOnlyField(source='region.name')
     city_name = serializers.ReadOnlyField(source='city.name')
@@ -99,19 +122,12 @@ class PlannerCourseSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         trip_ids = validated_data.pop('trip_ids', [])
-        user = self.context['request'].user
-        
-        course = PlannerCourse.objects.create(user=user, **validated_data)
-        
-        for index, trip_id in enumerate(trip_ids):
-            if Trip.objects.filter(id=trip_id).exists():
-                CourseDetail.objects.create(
-                    course=course,
-                    trip_id=trip_id,
-                    day=1,
-                    order=index
-                )
-        return course
+        user = validated_data.pop('user', None) or self.context['request'].user  # perform_create 에서 넘긴 user 우선
+
+        with transaction.atomic():
+            course = PlannerCourse.objects.create(user=user, **validated_data)
+            add_details(course, [(trip_id, 1, index) for index, trip_id in enumerate(trip_ids)])
+        return load_course(course)
 
     def update(self, instance, validated_data):
         trip_ids = validated_data.pop('trip_ids', None)
@@ -120,18 +136,10 @@ class PlannerCourseSerializer(serializers.ModelSerializer):
         instance.region = validated_data.get('region', instance.region)
         instance.start_date = validated_data.get('start_date', instance.start_date)
         instance.end_date = validated_data.get('end_date', instance.end_date)
-        instance.save()
-
-        if trip_ids is not None:
-            instance.details.all().delete()
-            
-            for index, trip_id in enumerate(trip_ids):
-                if Trip.objects.filter(id=trip_id).exists():
-                    CourseDetail.objects.create(
-                        course=instance,
-                        trip_id=trip_id,
-                        day=1,
-                        order=index
-                    )
-        
-        return instance
\ No newline at end of file
+
+        with transaction.atomic():
+            instance.save()
+            if trip_ids is not None:
+                instance.details.all().delete()
+                add_details(instance, [(trip_id, 1, index) for index, trip_id in enumerate(trip_ids)])
+        return load_course(instance)
\ No newline at end of file
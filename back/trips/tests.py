@@ -1,3 +1,766 @@
-from django.test import TestCase
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from users.models import User
+from .management.commands.import_tourapi import Command as ImportCommand
+from .geo import (
+    GRID_CELL_DEG, DistanceOrderedTrips, HaversineKm, distance_matrix_km, distances_km, grid_cell,
+    haversine_km, nearest_trips, within_radius_q,
+)
+from . import colikes
+from .caching import bump_catalog_version
+from .models import Trip, TripCoLike, Region, City, Category, Wishlist, ImportCheckpoint
+from .sampling import active_trip_ids, sample_from_ids
+from .scoring import score_candidates
+from .tourapi import RateLimiter, TourAPIClient
+
+
+class TripListQueryCountTest(TestCase):
+    """목록 API 의 쿼리 수가 페이지 크기와 무관하게 일정한지 확인 (N+1 회귀 방지)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        region = Region.objects.create(name='서울', slug='seoul')
+        city = City.objects.create(region=region, name='강남구', external_code='1_1')
+        category = Category.objects.create(name='관광지')
+
+        cls.trips = [
+            Trip.objects.create(
+                title=f'여행지 {i}', region=region, city=city, category=category,
+                mapy=37.5 + i * 0.001, mapx=127.0 + i * 0.001, recommendation_score=i,
+            )
+            for i in range(30)
+        ]
+        cls.user = User.objects.create_user(username='tester', password='pw')
+        for trip in cls.trips[::3]:
+            Wishlist.objects.create(user=cls.user, trip=trip)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.json()
+
+    def test_trip_list_constant_queries(self):
+        small, _ = self.count_queries('/api/trips/?page_size=5')
+        large, data = self.count_queries('/api/trips/?page_size=30')
+        self.assertEqual(small, large)
+
+        liked_ids = {t.id for t in self.trips[::3]}
+        for item in data['results']:
+            self.assertEqual(item['is_liked'], item['id'] in liked_ids)
+
+    def test_wishlist_constant_queries(self):
+        queries, data = self.count_queries('/api/trips/my/wishlist/')
+        self.assertEqual(len(data), 10)
+        self.assertTrue(all(item['is_liked'] for item in data))
+
+        Wishlist.objects.create(user=self.user, trip=self.trips[1])
+        more_queries, _ = self.count_queries('/api/trips/my/wishlist/')
+        self.assertEqual(queries, more_queries)
+
+
+class TripLikeCountTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.trips = [Trip.objects.create(title=f'여행지 {i}', recommendation_score=i) for i in range(3)]
+        cls.users = [User.objects.create_user(username=f'user{i}', password='pw') for i in range(2)]
+
+    def like(self, user, trip):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.post(f'/api/trips/{trip.id}/like/')
+
+    def test_like_and_unlike_update_count(self):
+        trip = self.trips[0]
+        self.like(self.users[0], trip)
+        self.like(self.users[1], trip)
+        trip.refresh_from_db()
+        self.assertEqual(trip.like_count, 2)
+
+        self.like(self.users[0], trip)
+        trip.refresh_from_db()
+        self.assertEqual(trip.like_count, 1)
+
+        # 목록은 좋아요 수가 많은 순
+        data = APIClient().get('/api/trips/').json()
+        self.assertEqual(data['results'][0]['id'], trip.id)
+
+    def test_reconcile_fixes_drift(self):
+        Wishlist.objects.create(user=self.users[0], trip=self.trips[1])
+        Trip.objects.filter(pk=self.trips[2].pk).update(like_count=5)
+
+        call_command('reconcile_like_counts', stdout=StringIO())
+        counts = dict(Trip.objects.values_list('id', 'like_count'))
+        self.assertEqual([counts[t.id] for t in self.trips], [0, 1, 0])
+
+
+class CoLikeTest(TestCase):
+    """찜/찜 취소 때의 공동 찜 증분 갱신이 전체 재계산(rebuild_colikes)과 같은 결과인지 확인"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.trips = [Trip.objects.create(title=f'여행지 {i}') for i in range(5)]
+        cls.users = [User.objects.create_user(username=f'user{i}', password='pw') for i in range(3)]
+
+    def toggle(self, user, trip):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.post(f'/api/trips/{trip.id}/like/')
+
+    def snapshot(self):
+        return set(TripCoLike.objects.values_list('trip_id', 'other_trip_id', 'count'))
+
+    def test_incremental_matches_rebuild(self):
+        t = self.trips
+        for user, trip in [
+            (0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (2, 1), (2, 3),
+            (0, 1), (2, 0), (1, 4), (2, 3),  # 뒤쪽은 찜 취소 포함
+        ]:
+            self.toggle(self.users[user], t[trip])
+
+        incremental = self.snapshot()
+        self.assertIn((t[0].id, t[1].id, 2), incremental)
+        self.assertFalse(any(count <= 0 for _, _, count in incremental))
+
+        call_command('rebuild_colikes', stdout=StringIO())
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_like_adds_to_existing_pair(self):
+        Wishlist.objects.create(user=self.users[0], trip=self.trips[0])
+        TripCoLike.objects.create(trip=self.trips[0], other_trip=self.trips[1], count=1)  # 다른 요청이 먼저 만든 쌍
+
+        Wishlist.objects.create(user=self.users[0], trip=self.trips[1])
+        colikes.record_like(self.users[0].id, self.trips[1].id)
+        self.assertEqual(self.snapshot(), {(self.trips[0].id, self.trips[1].id, 2), (self.trips[1].id, self.trips[0].id, 1)})
+
+    def test_neighbour_counts(self):
+        t = self.trips
+        for user, trips in ((0, (0, 1, 2)), (1, (0, 2)), (2, (1, 3))):
+            for trip in trips:
+                self.toggle(self.users[user], t[trip])
+
+        self.assertEqual(colikes.neighbour_counts([t[0].id]), {t[1].id: 1, t[2].id: 2})
+        self.assertEqual(colikes.neighbour_counts([t[0].id, t[2].id]), {t[1].id: 2})
+        self.assertEqual(colikes.neighbour_counts([]), {})
+
+    def test_neighbour_counts_weight_by_shared_pairs(self):
+        # 후보 3 은 내 여행지 셋을 모두 찜한 유저 한 명, 후보 4 는 여행지 0 만 찜한 유저 두 명이 찜함
+        t = self.trips
+        for user, trips in ((0, (0, 1, 2, 3)), (1, (0, 4)), (2, (0, 4))):
+            for trip in trips:
+                self.toggle(self.users[user], t[trip])
+
+        counts = colikes.neighbour_counts([t[0].id, t[1].id, t[2].id])
+        self.assertEqual(counts, {t[3].id: 3, t[4].id: 2})  # 유저 수(1 대 2)가 아니라 공동 찜 쌍 수로 순위
+        self.assertEqual([trip_id for trip_id, _ in counts.most_common()], [t[3].id, t[4].id])
+
+
+class TripSearchTest(TestCase):
+    """?search= 가 FTS5 2-gram 인덱스로 관련도순 검색되고, 저장/삭제/수집 때 인덱스가 갱신되는지 확인"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.forest = Trip.objects.create(title='서울숲 공원', destination='서울 성동구')
+        cls.river = Trip.objects.create(title='뚝섬 한강공원', destination='서울 광진구', overview='서울숲에서 걸어갈 수 있는 공원')
+        cls.other = Trip.objects.create(title='해운대', destination='부산 해운대구')
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, query):
+        response = APIClient().get('/api/trips/', {'search': query})
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.json()['results']]
+
+    def test_title_match_ranks_first(self):
+        self.assertEqual(self.search('서울숲'), [self.forest.id, self.river.id])
+
+    def test_partial_korean_word(self):
+        self.assertEqual(self.search('울숲'), [self.forest.id, self.river.id])
+        self.assertEqual(self.search('한강 공원'), [self.river.id])
+
+    def test_single_character_falls_back_to_like(self):
+        self.assertEqual(set(self.search('숲')), {self.forest.id, self.river.id})
+
+    def test_save_and_delete_reindex(self):
+        self.other.title = '광안리 해수욕장'
+        self.other.save()
+        self.assertEqual(self.search('광안'), [self.other.id])
+        self.assertEqual(self.search('해운'), [self.other.id])  # 주소에는 남아 있음
+
+        self.forest.delete()
+        self.assertEqual(self.search('서울숲'), [self.river.id])
+
+    def test_import_page_is_indexed(self):
+        from trips.management.commands.import_tourapi import Command
+
+        Command().save_page([(Trip(external_id='126508', title='남산서울타워', destination='서울 용산구'), set())], {})
+        self.assertEqual(self.search('산서'), [Trip.objects.get(external_id='126508').id])
+
+
+class RandomSamplingTest(TestCase):
+    """랜덤/배너/카테고리 추천이 캐시된 id 풀에서 조건에 맞게 뽑는지 확인"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.spot, cls.food = Category.objects.create(name='관광지'), Category.objects.create(name='음식점')
+        cls.spots = [
+            Trip.objects.create(title=f'관광지 {i}', category=cls.spot, thumbnail_image=f'http://img/{i}.jpg' if i % 2 else '')
+            for i in range(8)
+        ]
+        cls.foods = [Trip.objects.create(title=f'음식점 {i}', category=cls.food) for i in range(4)]
+        Trip.objects.create(title='비활성', category=cls.spot, status='inactive', thumbnail_image='http://img/x.jpg')
+
+    def setUp(self):
+        cache.clear()
+
+    def ids(self, url):
+        response = APIClient().get(url)
+        self.assertEqual(response.status_code, 200)
+        return {item['id'] for item in response.json()}
+
+    def test_endpoints_honour_filters(self):
+        spot_ids = {t.id for t in self.spots}
+        with_thumbnail = {t.id for t in self.spots if t.thumbnail_image}
+
+        self.assertEqual(self.ids(f'/api/trips/random/?category={self.spot.id}&count=20'), spot_ids)
+        self.assertEqual(self.ids(f'/api/trips/recommend/category/?category={self.food.id}'), {t.id for t in self.foods})
+        self.assertEqual(self.ids('/api/trips/banner-random/'), with_thumbnail)
+
+    def test_pool_follows_catalog_version(self):
+        before = active_trip_ids(self.food.id)
+        new = Trip.objects.create(title='새 음식점', category=self.food)  # 저장 시 카탈로그 버전이 올라감
+        after = active_trip_ids(self.food.id)
+        self.assertNotIn(new.id, before)
+        self.assertIn(new.id, after)
+
+    def test_stale_ids_are_resampled_within_bound(self):
+        ids = active_trip_ids()
+        Trip.objects.filter(id__in=[t.id for t in self.spots[:6]]).update(status='inactive')  # 풀에는 남아 있음
+
+        picked = sample_from_ids(Trip.objects.filter(status='active'), ids, 3)
+        self.assertLessEqual(len(picked), 3)
+        self.assertTrue(all(t.status == 'active' for t in picked))
+        self.assertEqual(len({t.id for t in picked}), len(picked))
+
+
+class ResponseCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.trips = [Trip.objects.create(title=f'여행지 {i}', recommendation_score=i) for i in range(3)]
+        cls.user = User.objects.create_user(username='tester', password='pw')
+        Wishlist.objects.create(user=cls.user, trip=cls.trips[1])
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, url, user=None):
+        client = APIClient()
+        if user:
+            client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.json()
+
+    def test_detail_cached_with_liked_overlay(self):
+        url = f'/api/trips/{self.trips[1].id}/'
+        self.get(url)
+        queries, data = self.get(url)
+        self.assertEqual(queries, 2)  # 수정 시각 + 카탈로그 버전만 조회
+        self.assertFalse(data['is_liked'])
+
+        queries, data = self.get(url, self.user)
+        self.assertEqual(queries, 3)  # + 찜 여부
+        self.assertTrue(data['is_liked'])
+
+    def test_list_cached_with_liked_overlay(self):
+        self.get('/api/trips/')
+        queries, data = self.get('/api/trips/', self.user)
+        self.assertEqual(queries, 2)  # 카탈로그 버전 + 찜 목록
+        self.assertEqual({item['id'] for item in data['results'] if item['is_liked']}, {self.trips[1].id})
+
+    def test_liked_overlay_varies_on_auth_headers(self):
+        client = APIClient()
+        for url in (f'/api/trips/{self.trips[1].id}/', '/api/trips/'):
+            vary = {header.strip() for header in client.get(url)['Vary'].split(',')}
+            self.assertTrue({'Authorization', 'Cookie'} <= vary, url)
+
+    def test_trip_save_invalidates(self):
+        trip = self.trips[0]
+        self.get(f'/api/trips/{trip.id}/')
+        self.get('/api/trips/categories/')
+
+        trip.title = '바뀐 이름'
+        trip.save()
+        _, data = self.get(f'/api/trips/{trip.id}/')
+        self.assertEqual(data['title'], '바뀐 이름')
+        queries, _ = self.get('/api/trips/categories/')
+        self.assertEqual(queries, 2)  # 버전 + 카테고리 (다시 계산)
+
+    def test_version_bumped_in_another_process_invalidates(self):
+        url = '/api/trips/categories/'
+        self.get(url)
+        Category.objects.create(name='새 카테고리')  # 카테고리 추가만으로는 버전이 오르지 않음
+
+        # import_tourapi 처럼 자기만의 캐시를 가진 다른 프로세스에서 버전을 올림
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'another-process',
+        }}):
+            bump_catalog_version()
+
+        _, data = self.get(url)
+        self.assertIn('새 카테고리', json.dumps(data, ensure_ascii=False))
+
+    def test_etag_not_modified(self):
+        trip = self.trips[0]
+        client = APIClient()
+        for url in (f'/api/trips/{trip.id}/', '/api/trips/categories/', '/api/planner/locations/'):
+            etag = client.get(url)['ETag']
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b'')
+
+        # 찜 여부가 다르면 다른 ETag, 수정되면 다시 200
+        url = f'/api/trips/{trip.id}/'
+        etag = client.get(url)['ETag']
+        client.force_authenticate(self.user)
+        Wishlist.objects.create(user=self.user, trip=trip)
+        self.assertEqual(client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        etag = client.get(url)['ETag']
+        trip.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class GridIndexTest(TestCase):
+    """격자 셀 1차 필터 + 반경/거리순 조회 (셀 경계를 넘는 경우 포함)"""
+
+    # 37.5 / 127.0 은 위도/경도 모두 셀 경계 - 기준점을 경계 바로 안쪽에 둠
+    LAT, LON = 37.5 - 0.001, 127.0 - 0.001
+
+    @classmethod
+    def setUpTestData(cls):
+        def at(title, lat, lon):
+            return Trip.objects.create(title=title, mapy=lat, mapx=lon)
+
+        cls.same_cell = at('같은 셀', cls.LAT - 0.003, cls.LON)        # 약 0.3km
+        cls.north = at('북쪽 셀', 37.5 + 0.001, cls.LON)           # 약 0.2km, 경계 너머
+        cls.east = at('동쪽 셀', cls.LAT, 127.0 + 0.004)             # 약 0.4km, 경계 너머
+        cls.diagonal = at('대각선 셀', 37.5 + 0.01, 127.0 + 0.01)     # 약 1.6km, 두 경계 너머
+        cls.far = at('먼 곳', cls.LAT, cls.LON + 0.3)                  # 약 26km, 여러 셀 너머
+        cls.nowhere = at('좌표 없음', 0, 0)
+
+    def test_cells_split_at_boundary(self):
+        self.assertNotEqual(self.same_cell.geo_cell, self.north.geo_cell)
+        self.assertNotEqual(self.same_cell.geo_cell, self.east.geo_cell)
+        self.assertEqual(grid_cell(self.LAT, self.LON), self.same_cell.geo_cell)
+        self.assertIsNone(self.nowhere.geo_cell)
+        self.assertEqual(grid_cell(37.5, 127.0) - grid_cell(37.5 - GRID_CELL_DEG, 127.0), round(360 / GRID_CELL_DEG))
+
+    def test_radius_includes_neighbouring_cells(self):
+        ids = set(Trip.objects.filter(within_radius_q(self.LAT, self.LON, 2)).values_list('id', flat=True))
+        self.assertEqual(ids, {self.same_cell.id, self.north.id, self.east.id, self.diagonal.id})
+
+        ids = set(Trip.objects.filter(within_radius_q(self.LAT, self.LON, 0.5)).values_list('id', flat=True))
+        self.assertNotIn(self.far.id, ids)
+        self.assertIn(self.east.id, ids)
+
+    def test_nearest_across_cells_and_widening_radius(self):
+        result = nearest_trips(Trip.objects.all(), self.LAT, self.LON, 5)
+        self.assertEqual(
+            [t.id for t in result],
+            [self.north.id, self.same_cell.id, self.east.id, self.diagonal.id, self.far.id],
+        )
+        self.assertTrue(all(a.distance <= b.distance for a, b in zip(result, result[1:])))
+
+    def test_distance_ordered_pages_skip_missing_location(self):
+        ordered = DistanceOrderedTrips(Trip.objects.all(), self.LAT, self.LON)
+        self.assertEqual(len(ordered), 5)
+        self.assertEqual([t.id for t in ordered[3:5]], [self.diagonal.id, self.far.id])
+
+
+class GeoDistanceTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # 기준점에서 동쪽으로 0.5, 1.5, 3, 6km (경도 1도 ≈ 88.2km)
+        cls.trips = [
+            Trip.objects.create(title=f'여행지 {km}', mapy=37.5, mapx=127.0 + km / 88.2)
+            for km in (6, 0.5, 3, 1.5)
+        ]
+
+    def test_sql_and_numpy_haversine_agree(self):
+        annotated = dict(Trip.objects.annotate(d=HaversineKm(37.5, 127.0)).values_list('id', 'd'))
+        expected = distances_km(37.5, 127.0, [t.mapy for t in self.trips], [t.mapx for t in self.trips])
+        for trip, km in zip(self.trips, expected):
+            self.assertAlmostEqual(annotated[trip.id], km, places=6)
+            self.assertAlmostEqual(km, haversine_km(37.5, 127.0, trip.mapy, trip.mapx), places=9)
+
+        matrix = distance_matrix_km([37.5], [127.0], [t.mapy for t in self.trips], [t.mapx for t in self.trips])
+        self.assertEqual(matrix.shape, (1, 4))
+        self.assertAlmostEqual(matrix[0, 1], 0.5, places=2)
+
+    def test_nearest_trips_orders_by_distance(self):
+        result = nearest_trips(Trip.objects.all(), 37.5, 127.0, 3)
+        self.assertEqual([t.id for t in result], [self.trips[1].id, self.trips[3].id, self.trips[2].id])
+        self.assertAlmostEqual(result[0].distance, 0.5, places=2)
+
+    def test_ai_scoring_uses_km_radius(self):
+        ids, scores = score_candidates(Trip.objects.all(), {}, {}, {}, target=(37.5, 127.0))
+        bonus = dict(zip(ids.tolist(), scores.tolist()))
+        self.assertEqual([bonus[t.id] for t in self.trips], [0, 500, 0, 200])
+
+
+class FakeGeminiClient:
+    """프롬프트의 [데이터] 배열을 읽어 정해진 운영 정보를 돌려주는 가짜 모델 클라이언트"""
+
+    def __init__(self, quota_errors=0):
+        self.calls = 0
+        self.quota_errors = quota_errors
+        self.models = self
+
+    def generate_content(self, model, contents, config=None):
+        self.calls += 1
+        if self.quota_errors:
+            self.quota_errors -= 1
+            raise Exception('429 RESOURCE_EXHAUSTED')
+        items = json.loads(contents.split('[데이터]:')[1])
+        results = [
+            {'id': item['id'], 'open': '09:00', 'close': '24:00',
+             'closed_days': ['Mon'] if '월' in item['rest_date'] else []}
+            for item in items
+        ]
+        return SimpleNamespace(text=json.dumps(results))
+
+
+class EnrichWithAITest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.trips = [
+            Trip.objects.create(title=f'여행지 {i}', use_time=f'09:00~1{i}:00', rest_date='월요일' if i % 2 else '연중무휴')
+            for i in range(5)
+        ]
+        Trip.objects.create(title='이용시간 없음')
+
+    def run_command(self, client, **options):
+        from .management.commands.enrich_with_ai import Command
+        command = Command()
+        command.client = client
+        out = StringIO()
+        call_command(command, stdout=out, rpm=60000, **options)
+        return out.getvalue()
+
+    def test_batches_and_bulk_updates(self):
+        client = FakeGeminiClient()
+        self.run_command(client, limit=10, batch_size=2)
+
+        self.assertEqual(client.calls, 3)
+        for trip in Trip.objects.filter(id__in=[t.id for t in self.trips]):
+            self.assertEqual(trip.operating_info['source'], 'ai')
+            self.assertEqual(str(trip.close_time), '23:59:00')
+            self.assertEqual(trip.operating_info['weekly']['Mon']['is_closed'], '월' in trip.rest_date)
+
+        # 이미 가공된 여행지는 다시 요청하지 않음
+        self.run_command(client, limit=10, batch_size=2)
+        self.assertEqual(client.calls, 3)
+
+    def test_retries_after_quota_error(self):
+        client = FakeGeminiClient(quota_errors=2)
+        out = self.run_command(client, limit=10, batch_size=10, max_retries=2)
+
+        self.assertEqual(client.calls, 3)
+        self.assertIn('(2/3)', out)  # 첫 요청 + 재시도 2번
+        self.assertFalse(Trip.objects.filter(id__in=[t.id for t in self.trips], open_time__isnull=True).exists())
+
+    def test_identical_hours_share_one_request(self):
+        Trip.objects.filter(id__in=[t.id for t in self.trips]).update(use_time='09:00~18:00', rest_date='월요일')
+        client = FakeGeminiClient()
+        self.run_command(client, limit=10)
+        self.assertEqual(client.calls, 1)
+
+        # 공백만 다른 새 여행지는 캐시된 AI 결과를 그대로 사용
+        trip = Trip.objects.create(title='새 여행지', use_time=' 09:00~18:00 ', rest_date='월요일')
+        self.run_command(client, limit=10)
+        self.assertEqual(client.calls, 1)
+        trip.refresh_from_db()
+        self.assertEqual(trip.operating_info['source'], 'ai')
+        self.assertEqual(trip.operating_info['raw']['use_time'], ' 09:00~18:00 ')
+
+
+class ExplainQueriesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        region = Region.objects.create(name='서울', slug='seoul')
+        city = City.objects.create(region=region, name='강남구', external_code='1_1')
+        cls.trip = Trip.objects.create(
+            title='서울숲', region=region, city=city, category=Category.objects.create(name='관광지'),
+            mapy=37.5, mapx=127.0, thumbnail_image='http://img/1.jpg',
+        )
+        User.objects.create_user(username='tester', password='pw')
+
+    def test_full_scan_is_detected(self):
+        from .management.commands.explain_queries import Command
+        command = Command()
+
+        unindexed = command.explain("SELECT id FROM trips WHERE overview = 'x'")
+        self.assertTrue(any(command.is_full_scan(detail) for detail in unindexed))
+        by_pk = command.explain('SELECT id FROM trips WHERE id = 1')
+        self.assertFalse(any(command.is_full_scan(detail) for detail in by_pk))
+        small = command.explain("SELECT id FROM regions WHERE name = 'x'")
+        self.assertFalse(any(command.is_full_scan(detail) for detail in small))
+
+    def test_replay_ignores_warm_caches(self):
+        def replay():
+            out = StringIO()
+            call_command('explain_queries', stdout=out)
+            return [line for line in out.getvalue().splitlines() if 'queries' in line]
+
+        cache.clear()
+        cold = replay()
+        self.assertEqual(replay(), cold)  # 두 번째 실행도 캐시 없이 같은 SQL 을 검사
+        self.assertTrue(all(' 0 queries' not in line for line in cold))
+
+
+class StubTourAPI(ThreadingHTTPServer):
+    """
+    로컬 가짜 TourAPI 서버 (import_tourapi --base-url 용).
+    items[content_type_id] 목록을 numOfRows/pageNo 로 나눠 주고, arrange=C 면 수정일 내림차순.
+    failures[(content_type_id, page)] 에 상태 코드를 넣으면 그 페이지는 해당 코드로 응답한다.
+    """
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubTourAPIHandler)
+        self.items = {}
+        self.failures = {}
+        self.requests = []
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self.server_port}'
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+    def add_items(self, content_type_id, count, area_code='1', modified=lambda i: f'20260101{i:06d}', prefix='S'):
+        self.items[content_type_id] = [
+            {
+                'contentid': f'{prefix}{content_type_id}-{i}', 'title': f'테스트 {i}', 'firstimage': 'http://img/1.jpg',
+                'addr1': '서울 어딘가', 'areacode': area_code, 'sigungucode': '1', 'contenttypeid': content_type_id,
+                'mapx': '127.0', 'mapy': '37.5', 'modifiedtime': modified(i),
+            }
+            for i in range(count)
+        ]
+
+    def list_pages(self, content_type_id):
+        return sorted(page for path, query in self.requests if query.get('contentTypeId', '15') == content_type_id
+                      and path.endswith(('areaBasedList2', 'searchFestival2')) for page in [int(query['pageNo'])])
+
+
+class StubTourAPIHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        with self.server.lock:
+            self.server.requests.append((url.path, query))
+
+        if url.path.endswith(('areaBasedList2', 'searchFestival2')):
+            content_type_id = query.get('contentTypeId', '15')
+            page, size = int(query['pageNo']), int(query['numOfRows'])
+            status = self.server.failures.get((content_type_id, page))
+            if status:
+                self.send_response(status)
+                self.end_headers()
+                return
+            items = list(self.server.items.get(content_type_id, []))
+            if query.get('arrange') == 'C':
+                items.sort(key=lambda item: item['modifiedtime'], reverse=True)
+            items = items[(page - 1) * size:page * size]
+        elif url.path.endswith('detailCommon2'):
+            items = {'overview': f"{query['contentId']} 개요"}  # 상세는 item 하나가 dict 로 옴
+        else:
+            items = [{'usetime': '09:00~18:00', 'restdate': '월요일'}]
+
+        body = json.dumps({'response': {'body': {'items': {'item': items} if items else ''}}}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@mock.patch.dict(os.environ, {'TOUR_API_KEY': 'test-key'})
+class ImportTourAPITest(TestCase):
+    """import_tourapi 를 로컬 가짜 서버에 대고 실행"""
+
+    def run_import(self, server, *args):
+        out = StringIO()
+        call_command('import_tourapi', '--area-code=1', '--rate=0', '--workers=4', f'--base-url={server.base_url}', *args, stdout=out)
+        return out.getvalue()
+
+    def test_pages_are_saved_and_jobs_finish(self):
+        with StubTourAPI() as server:
+            server.add_items('12', 130)
+            server.add_items('39', 3)
+            self.run_import(server, '--full')
+
+        self.assertEqual(Trip.objects.filter(external_id__startswith='S12-').count(), 130)
+        self.assertEqual(Trip.objects.get(external_id='S39-2').overview, 'S39-2 개요')
+        self.assertEqual(server.list_pages('12'), [1, 2])
+        checkpoint = ImportCheckpoint.objects.get(area_code='1', content_type_id='12')
+        self.assertEqual((checkpoint.last_page, checkpoint.completed), (2, True))
+        self.assertEqual(ImportCheckpoint.objects.filter(area_code='1', completed=True).count(), 7)
+
+    def test_failed_page_stops_only_its_job(self):
+        with StubTourAPI() as server:
+            server.add_items('12', 250)
+            server.add_items('14', 120)
+            server.failures[('12', 2)] = 500
+            out = self.run_import(server)
+
+        self.assertIn('Stopped 관광지', out)
+        self.assertEqual(server.list_pages('12'), [1, 2])  # 실패한 뒤 3페이지는 요청하지 않음
+        self.assertEqual(Trip.objects.filter(external_id__startswith='S12-').count(), 100)
+        self.assertEqual(Trip.objects.filter(external_id__startswith='S14-').count(), 120)
+
+        stopped = ImportCheckpoint.objects.get(area_code='1', content_type_id='12')
+        finished = ImportCheckpoint.objects.get(area_code='1', content_type_id='14')
+        self.assertEqual((stopped.last_page, stopped.completed), (1, False))
+        self.assertEqual((finished.last_page, finished.completed), (2, True))
+
+    def test_worker_exception_stops_only_its_job(self):
+        fetch_page = ImportCommand.fetch_page
+
+        def broken_second_page(command, endpoint, params, page):
+            if params.get('contentTypeId') == '12' and page == 2:
+                raise KeyError('items')
+            return fetch_page(command, endpoint, params, page)
+
+        version = bump_catalog_version()
+        with StubTourAPI() as server, mock.patch.object(ImportCommand, 'fetch_page', broken_second_page):
+            server.add_items('12', 250)
+            server.add_items('14', 120)
+            out = self.run_import(server)
+
+        self.assertIn('Stopped 관광지', out)
+        self.assertEqual(Trip.objects.filter(external_id__startswith='S12-').count(), 100)
+        self.assertEqual(Trip.objects.filter(external_id__startswith='S14-').count(), 120)
+        self.assertEqual((self.checkpoint().last_page, self.checkpoint().completed), (1, False))
+        self.assertTrue(self.checkpoint('14').completed)
+        self.assertGreater(bump_catalog_version(), version + 1)  # 마지막 캐시 버전 갱신까지 실행됨
+
+    def checkpoint(self, content_type_id='12'):
+        return ImportCheckpoint.objects.get(area_code='1', content_type_id=content_type_id)
+
+    def test_incremental_stops_at_watermark(self):
+        ImportCheckpoint.objects.create(area_code='1', content_type_id='12', watermark='20260101000100', completed=True)
+        with StubTourAPI() as server:
+            server.add_items('12', 250)
+            self.run_import(server, '--incremental')
+
+        # 수정일 내림차순 2페이지에서 워터마크 이전 항목이 보이면 거기서 중단
+        self.assertEqual(server.list_pages('12'), [1, 2])
+        saved = set(Trip.objects.filter(external_id__startswith='S12-').values_list('external_id', flat=True))
+        self.assertEqual(saved, {f'S12-{i}' for i in range(101, 250)})
+        self.assertEqual((self.checkpoint().watermark, self.checkpoint().completed), ('20260101000249', True))
+
+    def test_resume_continues_after_failed_page(self):
+        with StubTourAPI() as server:
+            server.add_items('12', 250)
+            server.failures[('12', 2)] = 500
+            self.run_import(server)
+            self.assertEqual((self.checkpoint().last_page, self.checkpoint().watermark), (1, ''))
+
+            del server.failures[('12', 2)]
+            server.requests.clear()
+            self.run_import(server, '--resume')
+
+        self.assertEqual(server.list_pages('12'), [2, 3])
+        self.assertEqual(server.list_pages('14'), [])  # 끝난 작업은 건너뜀
+        self.assertEqual(Trip.objects.filter(external_id__startswith='S12-').count(), 250)
+        self.assertEqual((self.checkpoint().completed, self.checkpoint().watermark), (True, '20260101000249'))
+
+    def test_resume_restarts_when_arrange_differs(self):
+        with StubTourAPI() as server:
+            server.add_items('12', 250)
+            server.failures[('12', 2)] = 500
+            self.run_import(server, '--incremental')
+            self.assertEqual((self.checkpoint().last_page, self.checkpoint().arrange), (1, 'C'))
+
+            del server.failures[('12', 2)]
+            server.requests.clear()
+            out = self.run_import(server, '--resume')
+
+        self.assertIn('Restart 관광지', out)
+        self.assertEqual(server.list_pages('12'), [1, 2, 3])
+        self.assertEqual((self.checkpoint().arrange, self.checkpoint().completed), ('A', True))
+
+
+class TourAPIClientTest(TestCase):
+    def test_get_items_accepts_single_item_or_list(self):
+        with StubTourAPI() as server:
+            server.add_items('12', 2)
+            client = TourAPIClient('key', base_url=server.base_url, rate=0)
+
+            self.assertEqual(client.get_item('/detailCommon2', {'contentId': '1'}), {'overview': '1 개요'})
+            self.assertEqual(len(client.get_items('/areaBasedList2', {'contentTypeId': '12', 'numOfRows': 10, 'pageNo': 1})), 2)
+            self.assertEqual(client.get_items('/areaBasedList2', {'contentTypeId': '12', 'numOfRows': 10, 'pageNo': 9}), [])
+
+    def test_retries_bad_gateway_only(self):
+        with StubTourAPI() as server:
+            server.add_items('12', 1)
+            server.failures[('12', 1)] = 502
+            server.failures[('12', 2)] = 500
+            logs = []
+            client = TourAPIClient('key', base_url=server.base_url, rate=0, max_retries=3, retry_delay=0, log=logs.append)
+
+            self.assertIsNone(client.get_items('/areaBasedList2', {'contentTypeId': '12', 'numOfRows': 10, 'pageNo': 1}))
+            self.assertIsNone(client.get_items('/areaBasedList2', {'contentTypeId': '12', 'numOfRows': 10, 'pageNo': 2}))
+
+            self.assertEqual(server.list_pages('12'), [1, 1, 1, 2])
+            self.assertEqual(sum('502' in message for message in logs), 3)
+
+            del server.failures[('12', 1)]
+            self.assertEqual(len(client.get_items('/areaBasedList2', {'contentTypeId': '12', 'numOfRows': 10, 'pageNo': 1})), 1)
+
+    def test_rate_limiter_spaces_calls(self):
+        limiter = RateLimiter(rate=50, burst=1)
+        started = time.monotonic()
+        for _ in range(6):
+            limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 5 / 50 * 0.9)  # 첫 호출 뒤 5번은 1/50초 간격
+
+        burst = RateLimiter(rate=50, burst=5)
+        started = time.monotonic()
+        for _ in range(5):
+            burst.acquire()
+        self.assertLess(time.monotonic() - started, 0.05)
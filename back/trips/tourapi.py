@@ -0,0 +1,103 @@
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+# --- TourAPI HTTP 클라이언트 ---
+# 여러 스레드에서 동시에 호출할 수 있도록 스레드마다 keep-alive 세션을 두고,
+# 고정 sleep 대신 토큰 버킷으로 전체 호출 속도를 제한한다.
+
+DEFAULT_BASE_URL = 'https://apis.data.go.kr/B551011/KorService2'
+
+
+class RateLimiter:
+    """토큰 버킷: 초당 rate 개의 토큰이 채워지고, 최대 burst 개까지 몰아서 사용 가능"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class TourAPIClient:
+    def __init__(self, api_key, base_url=DEFAULT_BASE_URL, rate=10, pool_size=8,
+                 timeout=30, max_retries=3, retry_delay=3, log=None):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.limiter = RateLimiter(rate)
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.log = log or (lambda message: None)
+        self._local = threading.local()
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._local.session = session
+        return session
+
+    def get(self, endpoint, params):
+        """JSON 응답(dict) 반환, 재시도 후에도 실패하면 None"""
+        query = {
+            'serviceKey': self.api_key,
+            'MobileOS': 'ETC',
+            'MobileApp': 'TripPlanner',
+            '_type': 'json',
+        }
+        query.update(params)
+
+        for attempt in range(self.max_retries):
+            self.limiter.acquire()
+            try:
+                response = self._session().get(f'{self.base_url}{endpoint}', params=query, timeout=self.timeout)
+                if response.status_code == 200:
+                    return response.json()
+                if response.status_code != 502:
+                    self.log(f'API Error: {response.status_code} ({endpoint})')
+                    return None
+                # 502 에러면 잠시 쉬었다가 재시도
+                self.log(f'    ⚠️ 502 Bad Gateway. Retrying... ({attempt+1}/{self.max_retries})')
+            except (requests.exceptions.RequestException, ValueError):
+                self.log(f'    ⚠️ Connection Error. Retrying... ({attempt+1}/{self.max_retries})')
+            time.sleep(self.retry_delay)
+        return None
+
+    def get_items(self, endpoint, params):
+        """목록 API 의 item 리스트 반환 (빈 페이지는 [], 호출 실패는 None)"""
+        data = self.get(endpoint, params)
+        if data is None:
+            return None
+
+        body = data.get('response', {}).get('body', {})
+        items = body.get('items') if isinstance(body, dict) else None
+        if not items:
+            return []
+        items = items.get('item') or []
+        return items if isinstance(items, list) else [items]
+
+    def get_item(self, endpoint, params):
+        """상세 API 의 첫 번째 item (없으면 {})"""
+        items = self.get_items(endpoint, params)
+        return items[0] if items else {}
@@ -6,40 +6,51 @@ from rest_framework.generics import ListAPIView
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotFound
+from django.db import transaction
 from django.db.models import Q, F, FloatField, ExpressionWrapper, Count
 from django_filters.rest_framework import DjangoFilterBackend
 from collections import Counter
 import random
 
 from .models import Trip, Wishlist, Category
-from .serializers import TripListSerializer, TripDetailSerializer, CategorySerializer, PlannerCourseSerializer
+from .serializers import TripListSerializer, TripDistanceSerializer, TripDetailSerializer, CategorySerializer, PlannerCourseSerializer, get_liked_trip_ids, trip_list_context
+from .geo import nearest_trips, DistanceOrderedTrips
+from .sampling import sample_trips, sample_from_ids
+from .search import TripSearchFilter
+from .scoring import score_candidates, top_k_ids
+from . import colikes, caching
 from planner.models import Course as PlannerCourse, CourseDetail
+from planner.courses import with_details
 
 class TripPagination(PageNumberPagination):
     page_size = 10 
     page_size_query_param = 'page_size'  
     max_page_size = 150 
 
+class TripListContextMixin:
+    """목록 뷰에서 유저의 찜 id 집합을 한 번만 조회해 serializer context 로 넘김"""
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['liked_trip_ids'] = get_liked_trip_ids(self.request)
+        return context
+
 # 여행지 목록 조회 (필터링, 검색, 정렬 포함)
 class TripListView(ListAPIView):
     serializer_class = TripListSerializer
     pagination_class = TripPagination
 
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [TripSearchFilter, filters.OrderingFilter]
     search_fields = ['title', 'overview', 'destination']
     ordering_fields = ['recommendation_score', 'created_at']
 
     def get_queryset(self):
-        queryset = Trip.objects.filter(status='active')
-        queryset = queryset.annotate(total_likes=Count('wishlists'))
+        queryset = Trip.objects.filter(status='active').select_related('region', 'city', 'category')
 
         area_name = self.request.query_params.get('area', None)
         category_id = self.request.query_params.get('category', None)
         ordering_param = self.request.query_params.get('ordering', None)
 
-        lat = self.request.query_params.get('lat', None)
-        lon = self.request.query_params.get('lon', None)
-        
         if area_name and area_name != '전체':
             queryset = queryset.filter(
                 Q(destination__contains=area_name) | 
@@ -50,32 +61,77 @@ class TripListView(ListAPIView):
         if category_id:
             queryset = queryset.filter(category_id=category_id)
 
-        if ordering_param == 'distance' and lat and lon:
-            try:
-                current_lat = float(lat)
-                current_lon = float(lon)
-                queryset = queryset.annotate(
-                    distance_diff=ExpressionWrapper(
-                        (F('mapy') - current_lat) ** 2 + (F('mapx') - current_lon) ** 2,
-                        output_field=FloatField()
-                    )
-                ).order_by('distance_diff')
-            except ValueError:
-                queryset = queryset.order_by('-total_likes', '-recommendation_score')
-
+        if ordering_param == 'distance':
+            # 거리순 정렬은 filter_queryset 에서 격자 인덱스로 처리
+            queryset = queryset.order_by('-like_count', '-recommendation_score')
         elif ordering_param:
             queryset = queryset.order_by(ordering_param)
         else:
-            # 1순위: 좋아요순, 2순위: 추천점수순, 3순위: 그래도 같으면 랜덤
-            queryset = queryset.order_by('-total_likes', '-recommendation_score', '?')
+            # 1순위: 좋아요순, 2순위: 추천점수순, 3순위: 최신 등록순
+            # (랜덤 정렬은 전체 정렬 비용이 크고 페이지 간 중복/누락이 생겨 고정 기준 사용)
+            # like_count 는 찜/찜 해제 때 함께 갱신되는 컬럼이라 인덱스(trip_popular_idx)로 바로 정렬
+            queryset = queryset.order_by('-like_count', '-recommendation_score', '-id')
 
         return queryset
 
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+
+        origin = self._get_distance_origin()
+        if origin:
+            return DistanceOrderedTrips(queryset, *origin)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        # 페이지는 익명 기준으로 캐시하고 로그인 유저는 찜 여부만 덮어씀
+        data = caching.cached_data(
+            'trip_list', caching.url_key(request),
+            lambda: super(TripListView, self).list(request, *args, **kwargs).data,
+        )
+        if request.user.is_authenticated:
+            data = {**data, 'results': caching.overlay_liked(data['results'], get_liked_trip_ids(request))}
+        return caching.vary_on_user(Response(data))
+
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), 'liked_trip_ids': set()}
+
+    def get_serializer_class(self):
+        if self._get_distance_origin():
+            return TripDistanceSerializer
+        return super().get_serializer_class()
+
+    def _get_distance_origin(self):
+        """ordering=distance 이고 좌표가 올바르면 (lat, lon), 아니면 None"""
+        params = self.request.query_params
+        if params.get('ordering') != 'distance':
+            return None
+        try:
+            return float(params.get('lat')), float(params.get('lon'))
+        except (TypeError, ValueError):
+            return None
+
 # 여행지 상세 조회
 class TripDetailView(generics.RetrieveAPIView):
-    queryset = Trip.objects.filter(status='active')
+    queryset = Trip.objects.filter(status='active').select_related('region', 'city', 'category')
     serializer_class = TripDetailSerializer
 
+    def retrieve(self, request, *args, **kwargs):
+        # ETag 는 수정 시각과 찜 여부로 만들고, 맞으면 직렬화 없이 304
+        pk = self.kwargs['pk']
+        updated_at = self.get_queryset().filter(pk=pk).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            raise NotFound()
+        is_liked = request.user.is_authenticated and Wishlist.objects.filter(user=request.user, trip_id=pk).exists()
+        version = f'{pk}-{updated_at.timestamp():.6f}'
+
+        def build():
+            # 상세는 익명 기준으로 (수정 시각별) 캐시하고 찜 여부만 덮어씀
+            data = caching.cached_data('trip_detail', version, lambda: TripDetailSerializer(self.get_object()).data)
+            return {**data, 'is_liked': is_liked}
+
+        response = caching.conditional_response(request, f'"trip-{version}-{int(is_liked)}"', build)
+        return caching.vary_on_user(response)
+
 # 찜하기 (좋아요) 토글 기능
 class TripLikeView(APIView):
     permission_classes = [permissions.IsAuthenticated] 
@@ -84,16 +140,25 @@ class TripLikeView(APIView):
         trip = get_object_or_404(Trip, pk=pk)
         user = request.user
 
-        wishlist, created = Wishlist.objects.get_or_create(user=user, trip=trip)
+        with transaction.atomic():
+            wishlist, created = Wishlist.objects.get_or_create(user=user, trip=trip)
+
+            # 좋아요 수와 공동 찜 테이블도 함께 갱신 (협업 필터링용)
+            if not created:
+                wishlist.delete()
+                Trip.objects.filter(pk=trip.pk, like_count__gt=0).update(like_count=F('like_count') - 1)
+                colikes.record_unlike(user.id, trip.id)
+            else:
+                Trip.objects.filter(pk=trip.pk).update(like_count=F('like_count') + 1)
+                colikes.record_like(user.id, trip.id)
 
         if not created:
-            wishlist.delete()
             return Response({'status': 'unliked', 'is_liked': False}, status=status.HTTP_200_OK)
         else:
             return Response({'status': 'liked', 'is_liked': True}, status=status.HTTP_201_CREATED)
 
 # 내 찜 목록 보기 
-class MyWishlistView(ListAPIView):
+class MyWishlistView(TripListContextMixin, ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = TripListSerializer
 
@@ -101,19 +166,12 @@ class MyWishlistView(ListAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        return Trip.objects.filter(wishlists__user=user, status='active').order_by('-wishlists__created_at')
-
-    def get_serializer_context(self):
-        context = super().get_serializer_context()
-        context.update({"request": self.request})
-        return context
+        return Trip.objects.filter(wishlists__user=user, status='active').select_related('region', 'city', 'category').order_by('-wishlists__created_at')
 
 # 카테고리 목록 
 @api_view(['GET'])
 def category_list(request):
-    categories = Category.objects.all()
-    serializer = CategorySerializer(categories, many=True)
-    return Response(serializer.data)
+    return caching.cached_response(request, 'categories', 'all', lambda: CategorySerializer(Category.objects.all(), many=True).data)
 
 # 카테고리별 랜덤 추천 API
 class RandomTripView(APIView):
@@ -125,38 +183,38 @@ class RandomTripView(APIView):
         except ValueError:
             count = 4
         
-        queryset = Trip.objects.filter(status='active')
+        queryset = Trip.objects.filter(status='active').select_related('region', 'city', 'category')
 
         if category_id:
             queryset = queryset.filter(category_id=category_id)
             
-        random_trips = queryset.order_by('?')[:count]
+        random_trips = sample_trips(queryset, count, category_id=category_id)
         
-        serializer = TripListSerializer(random_trips, many=True, context={'request': request})
+        serializer = TripListSerializer(random_trips, many=True, context=trip_list_context(request))
         return Response(serializer.data)
 
 # 코스 생성 및 내 코스 목록 조회
-class CourseListCreateView(generics.ListCreateAPIView):
+class CourseListCreateView(TripListContextMixin, generics.ListCreateAPIView):
     serializer_class = PlannerCourseSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return PlannerCourse.objects.filter(user=self.request.user).order_by('-created_at')
+        return with_details(PlannerCourse.objects.filter(user=self.request.user)).order_by('-created_at')
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
 # 코스 상세 조회, 순서변경, 삭제
-class CourseDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CourseDetailView(TripListContextMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = PlannerCourseSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return PlannerCourse.objects.filter(user=self.request.user)
+        return with_details(PlannerCourse.objects.filter(user=self.request.user))
 
 # 내 위치 중심 주변 여행지 추천
-class NearbyTripView(generics.ListAPIView):
-    serializer_class = TripListSerializer
+class NearbyTripView(TripListContextMixin, generics.ListAPIView):
+    serializer_class = TripDistanceSerializer
     pagination_class = None 
 
     def get_queryset(self):
@@ -184,30 +242,23 @@ class NearbyTripView(generics.ListAPIView):
         except ValueError:
             return Trip.objects.none()
 
-        queryset = Trip.objects.filter(status='active')
+        queryset = Trip.objects.filter(status='active').select_related('region', 'city', 'category')
 
         if exclude_id:
             queryset = queryset.exclude(id=exclude_id)
 
-        queryset = queryset.annotate(
-            distance_diff=ExpressionWrapper(
-                (F('mapy') - lat) ** 2 + (F('mapx') - lon) ** 2,
-                output_field=FloatField()
-            )
-        ).order_by('distance_diff')
-
-        return queryset[:10]
+        return nearest_trips(queryset, lat, lon, 10)
     
 class BannerRandomView(APIView):
     def get(self, request):
         queryset = Trip.objects.filter(
             status='active',
             thumbnail_image__isnull=False
-        ).exclude(thumbnail_image='')
+        ).exclude(thumbnail_image='').select_related('region', 'city', 'category')
 
-        random_trips = queryset.order_by('?')[:10]
+        random_trips = sample_trips(queryset, 10, with_thumbnail=True)
 
-        serializer = TripListSerializer(random_trips, many=True, context={'request': request})
+        serializer = TripListSerializer(random_trips, many=True, context=trip_list_context(request))
         return Response(serializer.data)
 
 # 카테고리 별 추천
@@ -219,9 +270,10 @@ def recommend_by_category(request):
     if not category_code:
         return Response({'message': '카테고리를 선택해주세요.'}, status=400)
 
-    trips = Trip.objects.filter(category_id=category_code).order_by('?')[:10]
+    queryset = Trip.objects.filter(status='active', category_id=category_code).select_related('region', 'city', 'category')
+    trips = sample_trips(queryset, 10, category_id=category_code)
     
-    serializer = TripListSerializer(trips, many=True, context={'request': request})
+    serializer = TripListSerializer(trips, many=True, context=trip_list_context(request))
     return Response(serializer.data)
 
 # 2. 내가 찜한 장소 (단순 랜덤)
@@ -229,9 +281,11 @@ def recommend_by_category(request):
 @permission_classes([IsAuthenticated])
 def recommend_liked_places(request):
     user = request.user
-    liked_trips = Trip.objects.filter(wishlists__user=user, status='active').order_by('?')[:10]
+    liked_ids = list(Wishlist.objects.filter(user=user).values_list('trip_id', flat=True))
+    queryset = Trip.objects.filter(status='active').select_related('region', 'city', 'category')
+    liked_trips = sample_from_ids(queryset, liked_ids, 10)
     
-    serializer = TripListSerializer(liked_trips, many=True, context={'request': request})
+    serializer = TripListSerializer(liked_trips, many=True, context={'request': request, 'liked_trip_ids': set(liked_ids)})
     return Response(serializer.data)
 
 # 3. AI 추천 장소 (가중치 알고리즘)
@@ -258,9 +312,8 @@ def recommend_by_ai(request):
     city_counter = Counter(liked_city_ids)
     category_counter = Counter(liked_category_ids)
 
-    # 협업 필터링 (가중치 낮게 유지)
-    similar_user_ids = Wishlist.objects.filter(trip_id__in=my_liked_trip_ids).exclude(user=user).values_list('user_id', flat=True)
-    collab_counter = Counter(Wishlist.objects.filter(user_id__in=similar_user_ids).exclude(trip_id__in=my_liked_trip_ids).values_list('trip_id', flat=True))
+    # 협업 필터링 (가중치 낮게 유지) - 미리 집계된 공동 찜 테이블에서 한 번에 조회
+    collab_counter = colikes.neighbour_counts(my_liked_trip_ids)
 
     candidates = Trip.objects.filter(status='active').exclude(id__in=my_liked_trip_ids)
     
@@ -272,41 +325,17 @@ def recommend_by_ai(request):
     if category_name:
         candidates = candidates.filter(category__name__contains=category_name)
 
-    scored_trips = []
-    
-    target_lat = float(lat) if lat else None
-    target_lng = float(lng) if lng else None
-
-    for trip in candidates:
-        score = 0
-        if trip.category_id in category_counter:
-            score += category_counter[trip.category_id] * 200
-        if trip.city_id in city_counter:
-            score += city_counter[trip.city_id] * 100
-        if trip.id in collab_counter:
-            score += collab_counter[trip.id] * 10
-            
-        score += trip.recommendation_score
-        
-        # 사용자 요구사항: 근접 장소 우선 추천
-        if target_lat and target_lng and trip.mapy and trip.mapx:
-            dist_sq = (trip.mapy - target_lat)**2 + (trip.mapx - target_lng)**2
-            # 거리가 가까울수록 가점 (단위가 크므로 적절히 조정)
-            if dist_sq < 0.01: # 약 1km 반경 근처 (매우 대략적)
-                score += 500
-            elif dist_sq < 0.04: # 약 2km 반경
-                score += 200
-
-        if score > 30:
-            scored_trips.append((score, trip))
-
-    scored_trips.sort(key=lambda x: x[0], reverse=True)
+    target = (float(lat), float(lng)) if lat and lng else None
+    candidate_ids, scores = score_candidates(candidates, category_counter, city_counter, collab_counter, target)
     
     # 상위 후보군 중 랜덤하게 섞어서 다양성 확보 (리롤 대응)
-    pool_size = min(len(scored_trips), count * 3)
-    top_candidates = [t for s, t in scored_trips[:pool_size]]
-    
-    final_trips = random.sample(top_candidates, min(len(top_candidates), count))
+    top_ids = top_k_ids(candidate_ids, scores, count * 3)
+    final_ids = random.sample(top_ids, min(len(top_ids), count))
+
+    # 최종 선택된 행만 조회
+    trips = Trip.objects.select_related('region', 'city', 'category').in_bulk(final_ids)
+    final_trips = [trips[pk] for pk in final_ids if pk in trips]
 
-    serializer = TripListSerializer(final_trips, many=True, context={'request': request})
+    # 후보군에서 찜한 장소는 이미 제외했으므로 모두 is_liked=False
+    serializer = TripListSerializer(final_trips, many=True, context={'request': request, 'liked_trip_ids': my_liked_trip_ids})
     return Response(serializer.data)
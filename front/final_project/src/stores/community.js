@@ -11,14 +11,28 @@ export const useCommunityStore = defineStore('community', () => {
   
   const articles = ref([])
   const article = ref(null)
+  const nextArticlesUrl = ref(null)   // 커서 페이지네이션 다음 페이지 주소 (없으면 null)
 
   const API_URL = 'http://127.0.0.1:8000/api/community'
 
-  // 게시글 목록 조회
+  // 게시글 목록 조회 (첫 페이지)
   const getArticles = async (params = {}) => {
     try {
       const res = await axios.get(`${API_URL}/articles/`, { params })
-      articles.value = res.data
+      articles.value = res.data.results
+      nextArticlesUrl.value = res.data.next
+    } catch (error) {
+      console.error('게시글 목록 로드 실패:', error)
+    }
+  }
+
+  // 게시글 목록 더보기 (다음 페이지를 이어 붙임)
+  const loadMoreArticles = async () => {
+    if (!nextArticlesUrl.value) return
+    try {
+      const res = await axios.get(nextArticlesUrl.value)
+      articles.value = [...articles.value, ...res.data.results]
+      nextArticlesUrl.value = res.data.next
     } catch (error) {
       console.error('게시글 목록 로드 실패:', error)
     }
@@ -165,7 +179,9 @@ export const useCommunityStore = defineStore('community', () => {
   return { 
     articles, 
     article, 
+    nextArticlesUrl,
     getArticles, 
+    loadMoreArticles,
     getArticleDetail, 
     deleteArticle,
     createArticle,
@@ -20,6 +20,27 @@ export const usePlannerStore = defineStore('planner', () => {
     }
   }
 
+  // 응답의 일정 항목은 trip_id 로 여행지를 가리키므로, trips 사전에서 찾아 data 로 붙여 둔다
+  const attachTrips = (schedule, trips) => {
+    schedule.forEach(item => {
+      item.data = trips[item.trip_id]
+    })
+  }
+
+  const handleGenerateError = (status, data) => {
+    if (status === 401) {
+      alert("인증 세션이 만료되었습니다. 다시 로그인해주세요.")
+      accountStore.logOut()
+    } else if (status >= 500 || typeof data === 'string') {
+      alert("서버에서 오류가 발생했습니다. 잠시 후 다시 시도해주세요.")
+    } else {
+      // 상세 에러가 있는 경우 친절하게 표시
+      const msg = data?.detail || data?.message || "정보가 올바르지 않습니다."
+      alert(`플랜 생성 실패: ${msg}`)
+    }
+  }
+
+  // NDJSON 스트리밍 - 요약 줄을 받으면 바로 플랜을 띄우고, 이후 하루치가 올 때마다 추가
   const generatePlan = async (payload) => {
     if (!accountStore.token) {
       alert('로그인이 필요합니다.')
@@ -27,31 +48,74 @@ export const usePlannerStore = defineStore('planner', () => {
     }
 
     try {
-      const res = await axios.post(`${API_URL}/generate/`, payload, {
+      const res = await fetch(`${API_URL}/generate/?stream=1`, {
+        method: 'POST',
         headers: {
+          'Content-Type': 'application/json',
+          Accept: 'application/x-ndjson',
           Authorization: `Bearer ${accountStore.token}`
-        }
+        },
+        body: JSON.stringify(payload)
       })
 
-      generatedPlan.value = res.data
-      return res.data
-    } catch (error) {
-      console.error('플랜 생성 실패:', error)
+      if (!res.ok) {
+        const text = await res.text()
+        let data = text
+        try { data = JSON.parse(text) } catch (e) { /* HTML 에러 페이지 등 */ }
+        console.error('플랜 생성 실패:', data)
+        handleGenerateError(res.status, data)
+        return null
+      }
 
-      if (error.response) {
-        if (error.response.status === 401) {
-          alert("인증 세션이 만료되었습니다. 다시 로그인해주세요.")
-          accountStore.logOut()
-        } else if (error.response.status >= 500 || typeof error.response.data === 'string') {
-          alert("서버에서 오류가 발생했습니다. 잠시 후 다시 시도해주세요.")
-        } else {
-          // 상세 에러가 있는 경우 친절하게 표시
-          const msg = error.response.data?.detail || "정보가 올바르지 않습니다."
-          alert(`플랜 생성 실패: ${msg}`)
+      const trips = {}
+      const reader = res.body.getReader()
+      const decoder = new TextDecoder()
+      let buffer = ''
+      let status = null  // 마지막 줄 종류 - 'end' 를 받아야 완성된 일정
+
+      const handleLine = (line) => {
+        if (!line.trim()) return
+        const message = JSON.parse(line)
+        Object.assign(trips, message.trips)
+
+        if (message.type === 'summary') {
+          const { type, ...summary } = message
+          generatedPlan.value = {
+            ...summary,
+            trips,
+            recommended_accommodation: trips[summary.recommended_accommodation_id] || null,
+            plan: []
+          }
+        } else if (message.type === 'day') {
+          attachTrips(message.day.schedule, trips)
+          generatedPlan.value.plan.push(message.day)
+        } else if (message.type === 'end' || message.type === 'error') {
+          status = message
         }
-      } else {
-        alert("네트워크 오류가 발생했습니다.")
       }
+
+      while (true) {
+        const { done, value } = await reader.read()
+        if (done) break
+        buffer += decoder.decode(value, { stream: true })
+        const lines = buffer.split('\n')
+        buffer = lines.pop()
+        lines.forEach(handleLine)
+      }
+      handleLine(buffer)
+
+      // 서버가 중간에 실패했거나(error) 응답이 끊겨 end 가 없으면 일부만 받은 일정은 버림
+      if (status?.type !== 'end') {
+        console.error('플랜 생성 실패:', status || '응답이 중간에 끊겼습니다.')
+        generatedPlan.value = null
+        alert(status?.message || "서버에서 오류가 발생했습니다. 잠시 후 다시 시도해주세요.")
+        return null
+      }
+      return generatedPlan.value
+    } catch (error) {
+      console.error('플랜 생성 실패:', error)
+      generatedPlan.value = null
+      alert("네트워크 오류가 발생했습니다.")
       return null
     }
   }
@@ -75,7 +139,11 @@ export const usePlannerStore = defineStore('planner', () => {
       region: regionName,
       start_date: formData.start_date,
       end_date: formData.end_date,
-      plan: generatedPlan.value.plan
+      // 서버에는 여행지 정보 대신 trip_id 만 보냄 (숙소 교체/추천 장소 추가로 data 가 바뀌었을 수 있어 data.id 우선)
+      plan: generatedPlan.value.plan.map(day => ({
+        ...day,
+        schedule: day.schedule.map(({ data, ...item }) => ({ ...item, trip_id: data?.id ?? item.trip_id }))
+      }))
     }
 
     try {